@@ -7,7 +7,7 @@ from fastapi import Depends, Request
 from pybotx import Bot
 
 from app.settings import settings
-from app.worker.worker import queue
+from app.worker.worker import get_queue
 
 
 async def check_db_connection(request: Request) -> Optional[str]:
@@ -39,7 +39,7 @@ check_redis_connection_dependency = Depends(check_redis_connection)
 
 
 async def check_worker_status() -> Optional[str]:
-    job = await queue.enqueue("healthcheck")
+    job = await get_queue().enqueue("healthcheck")
 
     try:
         await job.refresh(settings.WORKER_TIMEOUT_SEC)
@@ -16,7 +16,10 @@ from pybotx.constants import BOT_API_VERSION
 
 from app.api.dependencies.bot import bot_dependency
 from app.logger import logger
+from app.services.bot_commands import validate_raw_bot_command
+from app.services.command_admission import CommandAdmission
 from app.settings import settings
+from app.worker.worker import enqueue_bot_command
 
 router = APIRouter()
 
@@ -26,8 +29,10 @@ async def command_handler(request: Request, bot: Bot = bot_dependency) -> JSONRe
     """Receive commands from users. Max timeout - 5 seconds."""
 
     try:
-        bot.async_execute_raw_bot_command(
-            await request.json(),
+        raw_bot_command = await request.json()
+        bot_command = validate_raw_bot_command(
+            bot,
+            raw_bot_command,
             request_headers=request.headers,
             verify_request=settings.VERIFY_SSL,
         )
@@ -63,6 +68,30 @@ async def command_handler(request: Request, bot: Bot = bot_dependency) -> JSONRe
             status_code=HTTPStatus.SERVICE_UNAVAILABLE,
         )
 
+    command_admission: CommandAdmission = bot.state.command_admission
+    if not await command_admission.acquire():
+        if command_admission.is_draining:
+            error_label = "Bot is shutting down, retry later"
+        else:
+            error_label = "Too many commands in progress, retry later"
+
+        logger.warning(error_label)
+
+        return JSONResponse(
+            build_bot_disabled_response(error_label),
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(settings.BOTX_COMMANDS_RETRY_AFTER_SEC)},
+        )
+
+    if settings.BOTX_COMMANDS_QUEUE_ENABLED:
+        try:
+            await enqueue_bot_command(raw_bot_command)
+        finally:
+            command_admission.release()
+    else:
+        handler_task = bot.async_execute_bot_command(bot_command)
+        handler_task.add_done_callback(lambda _: command_admission.release())
+
     return JSONResponse(
         build_command_accepted_response(), status_code=HTTPStatus.ACCEPTED
     )
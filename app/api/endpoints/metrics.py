@@ -0,0 +1,27 @@
+"""Endpoint with process metrics."""
+
+from typing import Any, Dict
+
+from fastapi import APIRouter
+from pybotx import Bot
+
+from app.api.dependencies.bot import bot_dependency
+from app.caching.near_cache_redis_repo import NearCacheRedisRepo
+from app.caching.redis_client import get_redis_pools_stats
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics(bot: Bot = bot_dependency) -> Dict[str, Any]:
+    """Show metrics of the process that handled request."""
+
+    process_metrics: Dict[str, Any] = {
+        "redis_pools": get_redis_pools_stats(),
+        "botx_commands": bot.state.command_admission.stats,
+    }
+
+    if isinstance(bot.state.redis_repo, NearCacheRedisRepo):
+        process_metrics["redis_near_cache"] = bot.state.redis_repo.stats
+
+    return process_metrics
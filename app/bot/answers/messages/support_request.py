@@ -1,5 +1,7 @@
 """Provide service bot messages for support request."""
 
+from uuid import UUID
+
 from pybotx import IncomingMessage, OutgoingMessage
 
 from app.bot.answers.bubbles.common import get_default_bubbles
@@ -21,9 +23,11 @@ from app.schemas.support_request import (
     SupportRequestInCreation,
     SupportRequestInUpdating,
 )
+from app.services.answer_delivery import fire_and_forget
 from app.settings import settings
 
 
+@fire_and_forget
 def build_enter_description_message(message: IncomingMessage) -> OutgoingMessage:
     return OutgoingMessage(
         bot_id=message.bot.id,
@@ -33,6 +37,7 @@ def build_enter_description_message(message: IncomingMessage) -> OutgoingMessage
     )
 
 
+@fire_and_forget
 def build_description_max_length_exceeded_message(
     message: IncomingMessage,
 ) -> OutgoingMessage:
@@ -48,6 +53,7 @@ def build_description_max_length_exceeded_message(
     )
 
 
+@fire_and_forget
 def build_invalid_attachment_message(message: IncomingMessage) -> OutgoingMessage:
     return OutgoingMessage(
         bot_id=message.bot.id,
@@ -58,6 +64,26 @@ def build_invalid_attachment_message(message: IncomingMessage) -> OutgoingMessag
     )
 
 
+@fire_and_forget
+def build_storage_overloaded_message(message: IncomingMessage) -> OutgoingMessage:
+    return OutgoingMessage(
+        bot_id=message.bot.id,
+        chat_id=message.chat.id,
+        body=strings.STORAGE_OVERLOADED_MESSAGE,
+        keyboard=get_invalid_attachment_keyboard(),
+        silent_response=True,
+    )
+
+
+def build_request_expiring_message(bot_id: UUID, chat_id: UUID) -> OutgoingMessage:
+    return OutgoingMessage(
+        bot_id=bot_id,
+        chat_id=chat_id,
+        body=strings.REQUEST_EXPIRING_MESSAGE,
+        keyboard=get_cancel_keyboard(),
+    )
+
+
 def build_confirm_request_message(
     message: IncomingMessage,
     request: SupportRequestInCreation | SupportRequestInUpdating,
@@ -72,6 +98,7 @@ def build_confirm_request_message(
     )
 
 
+@fire_and_forget
 def build_confirm_attachment_addition_message(
     message: IncomingMessage,
 ) -> OutgoingMessage:
@@ -102,6 +129,7 @@ def build_cancel_message(message: IncomingMessage) -> OutgoingMessage:
     )
 
 
+@fire_and_forget
 def build_add_attachment_message(message: IncomingMessage) -> OutgoingMessage:
     return OutgoingMessage(
         bot_id=message.bot.id,
@@ -130,6 +158,7 @@ def build_existing_attachments_message(
     )
 
 
+@fire_and_forget
 def build_text_instead_attachment_message(message: IncomingMessage) -> OutgoingMessage:
     return OutgoingMessage(
         bot_id=message.bot.id,
@@ -141,6 +170,7 @@ def build_text_instead_attachment_message(message: IncomingMessage) -> OutgoingM
     )
 
 
+@fire_and_forget
 def build_select_updating_attribute_message(
     message: IncomingMessage,
 ) -> OutgoingMessage:
@@ -153,6 +183,7 @@ def build_select_updating_attribute_message(
     )
 
 
+@fire_and_forget
 def build_enter_new_description_message(message: IncomingMessage) -> OutgoingMessage:
     return OutgoingMessage(
         bot_id=message.bot.id,
@@ -171,6 +202,7 @@ def build_success_send_message(message: IncomingMessage) -> OutgoingMessage:
     )
 
 
+@fire_and_forget
 def build_not_confirm_command_message(message: IncomingMessage) -> OutgoingMessage:
     return OutgoingMessage(
         bot_id=message.bot.id,
@@ -3,6 +3,7 @@
 from httpx import AsyncClient, Limits
 from pybotx import Bot, CallbackRepoProto
 from pybotx_fsm import FSMMiddleware
+from pybotx_fsm.fsm import FSMStateData
 
 from app.bot.commands import common
 from app.bot.commands.support_request import (
@@ -12,6 +13,21 @@ from app.bot.commands.support_request import (
 from app.bot.error_handlers.internal_error import internal_error_handler
 from app.bot.middlewares.answer_error import answer_error_middleware
 from app.bot.middlewares.smart_logger import smart_logger_middleware
+from app.bot.middlewares.user_lock import user_lock_middleware
+from app.bot.states.support_request import (
+    CreateSupportRequestStates,
+    UpdateSupportRequestStates,
+)
+from app.caching.callback_redis_repo import CallbackRedisRepo
+from app.caching.callback_stream_redis_repo import CallbackStreamRedisRepo
+from app.caching.redis_client import RedisClient
+from app.caching.redis_repo import SchemaCodec
+from app.resources import strings
+from app.schemas.support_request import (
+    SupportRequestInCreation,
+    SupportRequestInUpdating,
+    SupportRequestToSend,
+)
 from app.settings import settings
 
 BOTX_CALLBACK_TIMEOUT = 30
@@ -43,6 +59,8 @@ def get_bot(callback_repo: CallbackRepoProto, raise_exceptions: bool) -> Bot:
         middlewares=[
             smart_logger_middleware,
             answer_error_middleware,
+            # FSM state is loaded under user lock to see changes of previous message
+            user_lock_middleware,
             FSMMiddleware(
                 [
                     create_support_request.fsm,
@@ -53,3 +71,32 @@ def get_bot(callback_repo: CallbackRepoProto, raise_exceptions: bool) -> Bot:
         ],
         callback_repo=callback_repo,
     )
+
+
+def build_callback_repo(redis_client: RedisClient) -> CallbackRedisRepo:
+    """Build repository delivering BotX callbacks between processes."""
+
+    if settings.BOTX_CALLBACKS_DELIVERY == "stream":
+        return CallbackStreamRedisRepo(
+            redis_client,
+            prefix=strings.BOT_PROJECT_NAME,
+            retention=settings.BOTX_CALLBACKS_RETENTION_SEC,
+        )
+
+    return CallbackRedisRepo(redis_client, prefix=strings.BOT_PROJECT_NAME)
+
+
+def get_state_codec(dumps_schemas: bool = True) -> SchemaCodec:
+    """Build codec for FSM states stored in redis."""
+
+    state_codec = SchemaCodec(dumps_schemas=dumps_schemas)
+    state_codec.register(
+        FSMStateData,
+        CreateSupportRequestStates,
+        UpdateSupportRequestStates,
+        SupportRequestInCreation,
+        SupportRequestInUpdating,
+        SupportRequestToSend,
+    )
+
+    return state_codec
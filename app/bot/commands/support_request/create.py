@@ -13,6 +13,7 @@ from app.bot.answers.messages.support_request import (  # noqa: WPS235
     build_invalid_attachment_message,
     build_not_confirm_command_message,
     build_select_updating_attribute_message,
+    build_storage_overloaded_message,
     build_text_instead_attachment_message,
 )
 from app.bot.commands.listing import HiddenCommands, PublicCommands
@@ -29,7 +30,10 @@ from app.schemas.support_request import (
     SupportRequestInUpdating,
     SupportRequestToSend,
 )
+from app.services.answer_delivery import send_answer
+from app.services.botx_user_search import prefetch_user
 from app.settings import settings
+from app.worker.worker import enqueue_attachments_cleanup
 
 collector = HandlerCollector()
 fsm = FSMCollector(CreateSupportRequestStates, middlewares=[confirm_cancel_middleware])
@@ -42,8 +46,18 @@ fsm = FSMCollector(CreateSupportRequestStates, middlewares=[confirm_cancel_middl
 async def create_support_request_handler(message: IncomingMessage, bot: Bot) -> None:
     """Starts support request creation process (FSM)."""  # noqa: D401
 
+    # Sender is needed only when request is sent, so the sender is searched meanwhile
+    await prefetch_user(
+        bot,
+        huid=message.sender.huid,  # type: ignore
+        user_search_repo=bot.state.user_search_repo,
+        origin_bot_id=message.bot.id,
+    )
+
     await ServiceDeskRepo(
-        sender_huid=message.sender.huid, attachment=message.file  # type: ignore
+        sender_huid=message.sender.huid,
+        attachment=message.file,  # type: ignore
+        storage_usage_repo=bot.state.storage_usage_repo,
     ).delete_user_attachments()
 
     subject = strings.SUBJECT_TEMPLATE.format(
@@ -53,7 +67,7 @@ async def create_support_request_handler(message: IncomingMessage, bot: Bot) ->
     )
     support_request = SupportRequestInCreation(subject=subject)
 
-    await bot.send(message=build_enter_description_message(message))
+    await send_answer(bot, build_enter_description_message(message))
     await message.state.fsm.change_state(
         state=CreateSupportRequestStates.ENTER_DESCRIPTION,
         support_request=support_request,
@@ -69,15 +83,17 @@ async def enter_support_request_description_handler(
     description = message.body
 
     if not description:
-        await bot.send(message=build_enter_description_message(message))
+        await send_answer(bot, build_enter_description_message(message))
         return
 
     if len(description) > settings.MAX_DESCRIPTION_LENGTH:
-        await bot.send(message=build_description_max_length_exceeded_message(message))
+        await send_answer(bot, build_description_max_length_exceeded_message(message))
         return
 
     service_desk_repo = ServiceDeskRepo(
-        sender_huid=message.sender.huid, attachment=message.file  # type: ignore
+        sender_huid=message.sender.huid,
+        attachment=message.file,  # type: ignore
+        storage_usage_repo=bot.state.storage_usage_repo,
     )
     support_request: SupportRequestInCreation = (
         message.state.fsm_storage.support_request
@@ -88,24 +104,30 @@ async def enter_support_request_description_handler(
 
     if attachment:
         if not service_desk_repo.is_valid_attachment():
-            await bot.send(message=build_invalid_attachment_message(message))
+            await send_answer(bot, build_invalid_attachment_message(message))
             return
 
-        service_desk_repo.add_user_attachment(
-            user_attachment=attachment  # type: ignore
+        if not await service_desk_repo.reserve_storage():
+            await enqueue_attachments_cleanup()
+            await send_answer(bot, build_storage_overloaded_message(message))
+            return
+
+        attachment_name = await service_desk_repo.add_user_attachment(
+            user_attachment=attachment,  # type: ignore
+            attachments_names=support_request.attachments_names,
         )
-        support_request.attachments_names = (
-            service_desk_repo.get_user_attachments_names()
+        support_request.attachments_names = sorted(
+            [*support_request.attachments_names, attachment_name]
         )
-        await bot.send(
-            message=build_confirm_request_message(message, request=support_request)
+        await send_answer(
+            bot, build_confirm_request_message(message, request=support_request)
         )
         await message.state.fsm.change_state(
             CreateSupportRequestStates.CONFIRM_REQUEST, support_request=support_request
         )
         return
 
-    await bot.send(message=build_confirm_attachment_addition_message(message))
+    await send_answer(bot, build_confirm_attachment_addition_message(message))
     await message.state.fsm.change_state(
         CreateSupportRequestStates.WAIT_DECISION_ON_ATTACHMENT,
         support_request=support_request,
@@ -119,28 +141,30 @@ async def wait_decision_on_attachment_handler(
     """Wait decision on attachment addition and switch to next state (FSM)."""
 
     if not message.body:
-        await bot.send(message=build_confirm_attachment_addition_message(message))
+        await send_answer(bot, build_confirm_attachment_addition_message(message))
         return
 
     support_request: SupportRequestInCreation = (
         message.state.fsm_storage.support_request
     )
     service_desk_repo = ServiceDeskRepo(
-        sender_huid=message.sender.huid, attachment=message.file  # type: ignore
+        sender_huid=message.sender.huid,
+        attachment=message.file,  # type: ignore
+        storage_usage_repo=bot.state.storage_usage_repo,
     )
 
     if message.body == HiddenCommands.CONFIRM_ATTACHMENT_ADDITION_COMMAND.command:
-        attachments_names = service_desk_repo.get_user_attachments_names()
-        support_request.attachments_names = attachments_names
+        attachments_names = support_request.attachments_names
 
         if attachments_names:
-            await bot.send(
-                message=build_existing_attachments_message(
+            await send_answer(
+                bot,
+                build_existing_attachments_message(
                     message, attachments_names=attachments_names
-                )
+                ),
             )
         else:
-            await bot.send(message=build_add_attachment_message(message))
+            await send_answer(bot, build_add_attachment_message(message))
 
         await message.state.fsm.change_state(
             CreateSupportRequestStates.ADD_ATTACHMENT, support_request=support_request
@@ -150,15 +174,15 @@ async def wait_decision_on_attachment_handler(
         await service_desk_repo.delete_user_attachments()
 
         support_request.attachments_names = []
-        await bot.send(
-            message=build_confirm_request_message(message, request=support_request)
+        await send_answer(
+            bot, build_confirm_request_message(message, request=support_request)
         )
         await message.state.fsm.change_state(
             CreateSupportRequestStates.CONFIRM_REQUEST, support_request=support_request
         )
         return
     else:
-        await bot.send(message=build_confirm_attachment_addition_message(message))
+        await send_answer(bot, build_confirm_attachment_addition_message(message))
 
 
 @fsm.on(CreateSupportRequestStates.ADD_ATTACHMENT)
@@ -168,7 +192,9 @@ async def add_attachment_handler(message: IncomingMessage, bot: Bot) -> None:
     command = message.body
     attachment = message.file
     service_desk_repo = ServiceDeskRepo(
-        sender_huid=message.sender.huid, attachment=message.file  # type: ignore
+        sender_huid=message.sender.huid,
+        attachment=message.file,  # type: ignore
+        storage_usage_repo=bot.state.storage_usage_repo,
     )
     support_request: SupportRequestInCreation = (
         message.state.fsm_storage.support_request
@@ -180,12 +206,10 @@ async def add_attachment_handler(message: IncomingMessage, bot: Bot) -> None:
     }:
         if command == HiddenCommands.SKIP_COMMAND.command:
             await service_desk_repo.delete_user_attachments()
+            support_request.attachments_names = []
 
-        support_request.attachments_names = (
-            service_desk_repo.get_user_attachments_names()
-        )
-        await bot.send(
-            message=build_confirm_request_message(message, request=support_request)
+        await send_answer(
+            bot, build_confirm_request_message(message, request=support_request)
         )
         await message.state.fsm.change_state(
             CreateSupportRequestStates.CONFIRM_REQUEST, support_request=support_request
@@ -193,20 +217,30 @@ async def add_attachment_handler(message: IncomingMessage, bot: Bot) -> None:
         return
 
     if not attachment:
-        await bot.send(message=build_text_instead_attachment_message(message))
+        await send_answer(bot, build_text_instead_attachment_message(message))
         return
 
     if not service_desk_repo.is_valid_attachment():
-        await bot.send(message=build_invalid_attachment_message(message))
+        await send_answer(bot, build_invalid_attachment_message(message))
         return
 
-    service_desk_repo.add_user_attachment(user_attachment=attachment)  # type: ignore
-    attachments_names = service_desk_repo.get_user_attachments_names()
+    if not await service_desk_repo.reserve_storage():
+        await enqueue_attachments_cleanup()
+        await send_answer(bot, build_storage_overloaded_message(message))
+        return
+
+    attachment_name = await service_desk_repo.add_user_attachment(
+        user_attachment=attachment,  # type: ignore
+        attachments_names=support_request.attachments_names,
+    )
+    # Names are kept in state to not list attachments directory on every message
+    attachments_names = sorted([*support_request.attachments_names, attachment_name])
     support_request.attachments_names = attachments_names
-    await bot.send(
-        message=build_existing_attachments_message(
+    await send_answer(
+        bot,
+        build_existing_attachments_message(
             message, attachments_names=attachments_names
-        )
+        ),
     )
     await message.state.fsm.change_state(
         CreateSupportRequestStates.ADD_ATTACHMENT, support_request=support_request
@@ -223,7 +257,7 @@ async def add_confirm_request_handler(message: IncomingMessage, bot: Bot) -> Non
         HiddenCommands.SEND_REQUEST_COMMAND.command,
         HiddenCommands.UPDATE_SUPPORT_REQUEST_COMMAND.command,
     }:
-        await bot.send(message=build_not_confirm_command_message(message))
+        await send_answer(bot, build_not_confirm_command_message(message))
         return
 
     support_request: SupportRequestInCreation = (
@@ -240,7 +274,7 @@ async def add_confirm_request_handler(message: IncomingMessage, bot: Bot) -> Non
     else:
         support_request_in_updating = SupportRequestInUpdating(**support_request.dict())
 
-        await bot.send(message=build_select_updating_attribute_message(message))
+        await send_answer(bot, build_select_updating_attribute_message(message))
         await message.state.fsm.change_state(
             state=UpdateSupportRequestStates.SELECT_ATTRIBUTE,
             support_request=support_request_in_updating,
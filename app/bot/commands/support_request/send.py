@@ -6,39 +6,103 @@ from pybotx.models.enums import ClientPlatforms
 from app.bot.answers.messages.support_request import build_success_send_message
 from app.db.repositories.exchange import ExchangeRepo, get_ews_account
 from app.db.repositories.service_desk import ServiceDeskRepo
+from app.logger import logger
 from app.resources import strings
 from app.schemas.support_request import SupportRequestToSend
-from app.services.botx_user_search import search_user_on_each_cts
+from app.services.answer_delivery import send_answer
+from app.services.answer_error import AnswerMessageError
+from app.services.botx_user_search import search_user_with_cache
 from app.services.exchange import convert_to_ews_html
+from app.services.timed_steps import TimedSteps, gather_cancelling
 from app.settings import settings
 
 
-async def send_support_request(  # noqa: WPS210
+async def send_support_request(
     message: IncomingMessage,
     bot: Bot,
     support_request: SupportRequestToSend,
 ) -> None:
-    """Send support request by email."""
+    """Send support request by email.
 
-    user, cts = await search_user_on_each_cts(
-        bot, huid=message.sender.huid  # type: ignore
-    )
+    Mail body, attachments and exchange account are prepared concurrently.
+    """
 
-    user_platform = (
-        str(message.sender.device.platform).split(".")[1]
-        if message.sender.device.platform
-        else "-"
-    )
+    steps = TimedSteps("Support request sending")
 
     support_request.description = support_request.description.replace("\n", "<br>")
 
     service_desk_repo = ServiceDeskRepo(
-        sender_huid=message.sender.huid, attachment=message.file  # type: ignore
+        sender_huid=message.sender.huid,
+        attachment=message.file,  # type: ignore
+        storage_usage_repo=bot.state.storage_usage_repo,
     )
 
-    user_attachments = await service_desk_repo.get_user_attachments()
+    try:
+        body, user_attachments, ews_account = await gather_cancelling(
+            steps.run("body", _build_mail_body(message, bot, support_request, steps)),
+            steps.run("attachments", service_desk_repo.get_user_attachments()),
+            steps.run(
+                "ews_account",
+                get_ews_account(
+                    credential_username=settings.MAIL_USERNAME,
+                    credential_password=settings.MAIL_PASSWORD,
+                    sender_email=settings.SENDER_EMAIL,
+                    server=settings.MAIL_SERVER,
+                ),
+            ),
+        )
+
+        # Request mustn't be sent without attachments, which user has added to it
+        stored_names = {user_attachment.name for user_attachment in user_attachments}
+        missing_names = set(support_request.attachments_names) - stored_names
+        if missing_names:
+            logger.warning(
+                f"Attachments {sorted(missing_names)} of request are missing"
+            )
+            await service_desk_repo.delete_user_attachments_in_background()
+            raise AnswerMessageError(strings.ATTACHMENTS_NOT_FOUND_MESSAGE)
 
-    body = strings.MAIL_BODY_TEMPLATE.format(
+        exchange_repo = ExchangeRepo(account=ews_account)
+        await steps.run(
+            "send_mail",
+            exchange_repo.send_mail(
+                subject=support_request.subject,
+                body=convert_to_ews_html(body),
+                user_attachments=user_attachments,
+            ),
+        )
+
+        await service_desk_repo.delete_user_attachments_in_background()
+
+        await send_answer(bot, build_success_send_message(message))
+    finally:
+        # Timings of failed sending show which step failed or was slow
+        steps.log_timings()
+
+
+async def _build_mail_body(
+    message: IncomingMessage,
+    bot: Bot,
+    support_request: SupportRequestToSend,
+    steps: TimedSteps,
+) -> str:
+    user, cts = await steps.run(  # type: ignore
+        "user_search",
+        search_user_with_cache(
+            bot,
+            huid=message.sender.huid,  # type: ignore
+            user_search_repo=bot.state.user_search_repo,
+            origin_bot_id=message.bot.id,
+        ),
+    )
+
+    user_platform = (
+        str(message.sender.device.platform).split(".")[1]
+        if message.sender.device.platform
+        else "-"
+    )
+
+    return strings.MAIL_BODY_TEMPLATE.format(
         request=support_request,
         message=message,
         user=user,
@@ -48,20 +112,3 @@ async def send_support_request(  # noqa: WPS210
         host=cts.host,
         show_sender_phone_in_email_body=settings.SHOW_SENDER_PHONE_IN_EMAIL_BODY,
     )
-
-    ews_account = await get_ews_account(
-        credential_username=settings.MAIL_USERNAME,
-        credential_password=settings.MAIL_PASSWORD,
-        sender_email=settings.SENDER_EMAIL,
-        server=settings.MAIL_SERVER,
-    )
-    exchange_repo = ExchangeRepo(account=ews_account)
-    await exchange_repo.send_mail(
-        subject=support_request.subject,
-        body=convert_to_ews_html(body),
-        user_attachments=user_attachments,
-    )
-
-    await service_desk_repo.delete_user_attachments()
-
-    await bot.send(message=build_success_send_message(message))
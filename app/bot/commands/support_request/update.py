@@ -11,6 +11,7 @@ from app.bot.answers.messages.support_request import (
     build_existing_attachments_message,
     build_invalid_attachment_message,
     build_select_updating_attribute_message,
+    build_storage_overloaded_message,
     build_text_instead_attachment_message,
 )
 from app.bot.commands.listing import HiddenCommands
@@ -21,7 +22,9 @@ from app.bot.states.support_request import (
 )
 from app.db.repositories.service_desk import ServiceDeskRepo
 from app.schemas.support_request import SupportRequestInUpdating
+from app.services.answer_delivery import send_answer
 from app.settings import settings
+from app.worker.worker import enqueue_attachments_cleanup
 
 fsm = FSMCollector(UpdateSupportRequestStates, middlewares=[confirm_cancel_middleware])
 
@@ -37,7 +40,9 @@ async def select_updating_attribute_handler(  # noqa: WPS213
         message.state.fsm_storage.support_request
     )
     service_desk_repo = ServiceDeskRepo(
-        sender_huid=message.sender.huid, attachment=message.file  # type: ignore
+        sender_huid=message.sender.huid,
+        attachment=message.file,  # type: ignore
+        storage_usage_repo=bot.state.storage_usage_repo,
     )
 
     if not command or command not in {  # noqa: WPS337
@@ -45,7 +50,7 @@ async def select_updating_attribute_handler(  # noqa: WPS213
         HiddenCommands.UPDATE_ATTACHMENT_COMMAND.command,
         HiddenCommands.BACK_COMMAND.command,
     }:
-        await bot.send(message=build_select_updating_attribute_message(message))
+        await send_answer(bot, build_select_updating_attribute_message(message))
         await message.state.fsm.change_state(
             state=UpdateSupportRequestStates.SELECT_ATTRIBUTE,
             support_request=support_request,
@@ -53,15 +58,16 @@ async def select_updating_attribute_handler(  # noqa: WPS213
         return
 
     if command == HiddenCommands.UPDATE_DESCRIPTION_COMMAND.command:
-        await bot.send(message=build_enter_new_description_message(message))
+        await send_answer(bot, build_enter_new_description_message(message))
         await message.state.fsm.change_state(
             state=UpdateSupportRequestStates.ENTER_DESCRIPTION,
             support_request=support_request,
         )
     elif command == HiddenCommands.UPDATE_ATTACHMENT_COMMAND.command:
         await service_desk_repo.delete_user_attachments()
+        support_request.attachments_names = []
 
-        await bot.send(message=build_add_attachment_message(message))
+        await send_answer(bot, build_add_attachment_message(message))
         await message.state.fsm.change_state(
             state=UpdateSupportRequestStates.ADD_ATTACHMENT,
             support_request=support_request,
@@ -69,8 +75,8 @@ async def select_updating_attribute_handler(  # noqa: WPS213
     else:
         await message.state.fsm.drop_state()
 
-        await bot.send(
-            message=build_confirm_request_message(message, request=support_request)
+        await send_answer(
+            bot, build_confirm_request_message(message, request=support_request)
         )
         await message.state.fsm.change_state(
             state=CreateSupportRequestStates.CONFIRM_REQUEST,
@@ -85,11 +91,11 @@ async def enter_new_description_handler(message: IncomingMessage, bot: Bot) -> N
     new_description = message.body
 
     if not new_description:
-        await bot.send(message=build_enter_new_description_message(message))
+        await send_answer(bot, build_enter_new_description_message(message))
         return
 
     if len(new_description) > settings.MAX_DESCRIPTION_LENGTH:
-        await bot.send(message=build_description_max_length_exceeded_message(message))
+        await send_answer(bot, build_description_max_length_exceeded_message(message))
         return
 
     support_request: SupportRequestInUpdating = (
@@ -98,8 +104,8 @@ async def enter_new_description_handler(message: IncomingMessage, bot: Bot) -> N
     support_request.description = new_description
     await message.state.fsm.drop_state()
 
-    await bot.send(
-        message=build_confirm_request_message(message, request=support_request)
+    await send_answer(
+        bot, build_confirm_request_message(message, request=support_request)
     )
     await message.state.fsm.change_state(
         CreateSupportRequestStates.CONFIRM_REQUEST, support_request=support_request
@@ -115,7 +121,9 @@ async def add_new_attachment_handler(  # noqa: WPS213
     command = message.body
     attachment = message.file
     service_desk_repo = ServiceDeskRepo(
-        sender_huid=message.sender.huid, attachment=message.file  # type: ignore
+        sender_huid=message.sender.huid,
+        attachment=message.file,  # type: ignore
+        storage_usage_repo=bot.state.storage_usage_repo,
     )
     support_request: SupportRequestInUpdating = (
         message.state.fsm_storage.support_request
@@ -127,14 +135,12 @@ async def add_new_attachment_handler(  # noqa: WPS213
     }:
         if command == HiddenCommands.SKIP_COMMAND.command:
             await service_desk_repo.delete_user_attachments()
+            support_request.attachments_names = []
 
-        support_request.attachments_names = (
-            service_desk_repo.get_user_attachments_names()
-        )
         await message.state.fsm.drop_state()
 
-        await bot.send(
-            message=build_confirm_request_message(message, request=support_request)
+        await send_answer(
+            bot, build_confirm_request_message(message, request=support_request)
         )
         await message.state.fsm.change_state(
             CreateSupportRequestStates.CONFIRM_REQUEST, support_request=support_request
@@ -142,20 +148,30 @@ async def add_new_attachment_handler(  # noqa: WPS213
         return
 
     if not attachment:
-        await bot.send(message=build_text_instead_attachment_message(message))
+        await send_answer(bot, build_text_instead_attachment_message(message))
         return
 
     if not service_desk_repo.is_valid_attachment():
-        await bot.send(message=build_invalid_attachment_message(message))
+        await send_answer(bot, build_invalid_attachment_message(message))
+        return
+
+    if not await service_desk_repo.reserve_storage():
+        await enqueue_attachments_cleanup()
+        await send_answer(bot, build_storage_overloaded_message(message))
         return
 
-    service_desk_repo.add_user_attachment(user_attachment=attachment)  # type: ignore
-    attachments_names = service_desk_repo.get_user_attachments_names()
+    attachment_name = await service_desk_repo.add_user_attachment(
+        user_attachment=attachment,  # type: ignore
+        attachments_names=support_request.attachments_names,
+    )
+    # Names are kept in state to not list attachments directory on every message
+    attachments_names = sorted([*support_request.attachments_names, attachment_name])
     support_request.attachments_names = attachments_names
-    await bot.send(
-        message=build_existing_attachments_message(
+    await send_answer(
+        bot,
+        build_existing_attachments_message(
             message, attachments_names=attachments_names
-        )
+        ),
     )
     await message.state.fsm.change_state(
         UpdateSupportRequestStates.ADD_ATTACHMENT, support_request=support_request
@@ -20,6 +20,7 @@ from app.bot.states.support_request import (
 )
 from app.db.repositories.service_desk import ServiceDeskRepo
 from app.schemas.support_request import SupportRequestInCreation
+from app.services.answer_delivery import send_answer
 
 STATE_MESSAGES = {  # noqa: WPS407
     CreateSupportRequestStates.ENTER_DESCRIPTION: build_enter_description_message,
@@ -39,14 +40,16 @@ async def confirm_cancel_middleware(
     command = message.body
 
     if command == HiddenCommands.CANCEL_COMMAND.command:
-        await bot.send(message=build_confirm_cancel_message(message))
+        await send_answer(bot, build_confirm_cancel_message(message))
         return
     elif command == HiddenCommands.CONFIRM_CANCEL_COMMAND.command:
         await ServiceDeskRepo(
-            sender_huid=message.sender.huid, attachment=message.file  # type: ignore
+            sender_huid=message.sender.huid,
+            attachment=message.file,  # type: ignore
+            storage_usage_repo=bot.state.storage_usage_repo,
         ).delete_user_attachments()
 
-        await bot.send(message=build_cancel_message(message))
+        await send_answer(bot, build_cancel_message(message))
         await message.state.fsm.drop_state()
         return
     elif command == HiddenCommands.REFUSE_CANCEL_COMMAND.command:
@@ -65,24 +68,23 @@ async def _send_current_state_message(message: IncomingMessage, bot: Bot) -> Non
         support_request: SupportRequestInCreation = (
             message.state.fsm_storage.support_request
         )
-        await bot.send(
-            message=build_confirm_request_message(message, request=support_request)
+        await send_answer(
+            bot, build_confirm_request_message(message, request=support_request)
         )
     elif current_state in {  # noqa: WPS337
         CreateSupportRequestStates.ADD_ATTACHMENT,
         UpdateSupportRequestStates.ADD_ATTACHMENT,
     }:
-        attachments_names = ServiceDeskRepo(
-            sender_huid=message.sender.huid, attachment=message.file  # type: ignore
-        ).get_user_attachments_names()
+        attachments_names = message.state.fsm_storage.support_request.attachments_names
 
         if attachments_names:
-            await bot.send(
-                message=build_existing_attachments_message(
+            await send_answer(
+                bot,
+                build_existing_attachments_message(
                     message, attachments_names=attachments_names
-                )
+                ),
             )
         else:
-            await bot.send(message=build_add_attachment_message(message))
+            await send_answer(bot, build_add_attachment_message(message))
     else:
-        await bot.send(message=STATE_MESSAGES[current_state](message))
+        await send_answer(bot, STATE_MESSAGES[current_state](message))
@@ -0,0 +1,25 @@
+"""Middleware to handle messages of the same user one by one."""
+
+from pybotx import Bot, IncomingMessage, IncomingMessageHandlerFunc
+
+from app.resources import strings
+from app.services.answer_error import AnswerMessageError
+from app.services.user_locks import UserLocks, UserLockTimeoutError
+
+
+async def user_lock_middleware(
+    message: IncomingMessage, bot: Bot, call_next: IncomingMessageHandlerFunc
+) -> None:
+    # Bot middlewares are called again for handlers of included collectors
+    if getattr(message.state, "is_user_locked", False):
+        await call_next(message, bot)
+        return
+
+    user_locks: UserLocks = bot.state.user_locks
+
+    try:
+        async with user_locks.lock(message.sender.huid):
+            message.state.is_user_locked = True
+            await call_next(message, bot)
+    except UserLockTimeoutError:
+        raise AnswerMessageError(strings.PREVIOUS_MESSAGE_IN_PROGRESS_MESSAGE)
@@ -1,77 +1,120 @@
 """Repository for work callbacks with redis."""
 
 import asyncio
+import math
 import pickle  # noqa: S403
-from typing import Dict, Optional
-from uuid import UUID
+import time
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
 
 from pybotx import CallbackNotReceivedError, CallbackRepoProto
 from pybotx.bot.exceptions import BotShuttingDownError, BotXMethodCallbackNotFoundError
 from pybotx.models.method_callbacks import BotXMethodCallback
-from redis import asyncio as aioredis
+from redis.asyncio.client import PubSub
+
+from app.caching.redis_client import RedisClient, get_node_client
+from app.logger import logger
+
+RESUBSCRIBE_DELAY_SEC = 0.5
+SUBSCRIBE_TIMEOUT_SEC = 5
+
+# Callbacks are waited or popped by timeout alarm much earlier
+MAX_CALLBACK_AGE_SEC = 5 * 60
+SWEEP_INTERVAL_SEC = 60
 
 
 class CallbackRedisRepo(CallbackRepoProto):
+    """Repository to deliver BotX callbacks between processes.
+
+    Every process waiting for callbacks listens to its own channel in background
+    and claims callbacks it creates, storing its channel in redis. Process which
+    received callback publishes it to the channel of the process waiting for it,
+    so other processes don't receive it. Callback which nobody waits, e.g. because
+    it came before creation or its process is stopped, is rejected.
+    Callbacks waited by the process which received them are resolved directly.
+    Listener is subscribed on start, before the process sends any message, and
+    resubscribed at once when it fails. Callbacks published while the listener
+    is resubscribing are lost.
+
+    Futures are evicted when they are waited or popped. Futures which were
+    neither waited nor popped are evicted by sweeper after `max_callback_age`.
+    """
+
     def __init__(
         self,
-        redis: aioredis.Redis,
+        redis: RedisClient,
         prefix: Optional[str] = None,
+        max_callback_age: float = MAX_CALLBACK_AGE_SEC,
+        sweep_interval: float = SWEEP_INTERVAL_SEC,
     ):
         self._redis = redis
         self._prefix = prefix or ""
-        self._pubsubs: Dict[UUID, aioredis.client.PubSub] = {}
+        self._channel = f"{self._prefix}:botx-callbacks:{uuid4().hex}"
+        self._max_callback_age = max_callback_age
+        self._sweep_interval = sweep_interval
         self._futures: Dict[UUID, asyncio.Future] = {}
+        # Insertion ordered, so the oldest callbacks go first
+        self._creation_times: Dict[UUID, float] = {}
+        self._background_tasks: List["asyncio.Task[None]"] = []
+        self._pubsub: Optional[PubSub] = None
+
+    async def start_callbacks_waiting(self) -> None:
+        """Subscribe to callbacks and start listening them in background."""
+
+        if self._background_tasks:
+            return
+
+        await self._subscribe()
+        self._background_tasks = [
+            asyncio.create_task(self._listen_callbacks()),
+            asyncio.create_task(self._sweep_callbacks_periodically()),
+        ]
 
     async def create_botx_method_callback(
         self,
         sync_id: UUID,
     ) -> None:
-        pubsub = self._redis.pubsub()
-        await pubsub.subscribe(f"{self._prefix}:{sync_id}")
         self._futures[sync_id] = asyncio.Future()
-        self._pubsubs[sync_id] = pubsub
+        self._creation_times[sync_id] = time.monotonic()
+        await self._claim_callback(sync_id)
 
     async def set_botx_method_callback_result(
         self,
         callback: BotXMethodCallback,
     ) -> None:
-        dump = pickle.dumps(callback)
-        status_code = await self._redis.publish(
-            f"{self._prefix}:{callback.sync_id}", dump
-        )
-        if status_code != 1:
-            raise BotXMethodCallbackNotFoundError(sync_id=callback.sync_id)
+        if not self._resolve_callback(callback):
+            await self._publish_callback(callback)
 
     async def wait_botx_method_callback(
         self,
         sync_id: UUID,
         timeout: float,
     ) -> BotXMethodCallback:
-        channel = self._get_pubsub(sync_id)
+        future = self._get_future(sync_id)
+
         try:
-            callback = await asyncio.wait_for(
-                self._get_callback(channel), timeout=timeout
-            )
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
         except asyncio.TimeoutError:
             raise CallbackNotReceivedError(sync_id) from None
-
-        future = self._futures[sync_id]
-        if future.done():
-            future.result()
-        else:
-            future.set_result(callback)
-
-        return callback
+        finally:
+            self._evict_callback(sync_id)
 
     async def pop_botx_method_callback(
         self,
         sync_id: UUID,
     ) -> "asyncio.Future[BotXMethodCallback]":
-        return self._futures[sync_id]
+        future = self._get_future(sync_id)
+        self._evict_callback(sync_id)
+
+        return future
 
     async def stop_callbacks_waiting(self) -> None:
-        for pubsub in self._pubsubs.values():
-            await pubsub.unsubscribe()
+        for background_task in self._background_tasks:
+            background_task.cancel()
+
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._background_tasks = []
+        await self._unsubscribe()
 
         for sync_id, future in self._futures.items():
             if not future.done():
@@ -81,17 +124,127 @@ class CallbackRedisRepo(CallbackRepoProto):
                     ),
                 )
 
-    def _get_pubsub(self, sync_id: UUID) -> aioredis.client.PubSub:
+    def sweep_expired_callbacks(self) -> None:
+        expired_before = time.monotonic() - self._max_callback_age
+
+        for sync_id, creation_time in list(self._creation_times.items()):
+            if creation_time > expired_before:
+                break
+
+            self._evict_callback(sync_id)
+
+    def _get_future(self, sync_id: UUID) -> asyncio.Future:
         try:
-            return self._pubsubs[sync_id]
+            return self._futures[sync_id]
         except KeyError:
             raise BotXMethodCallbackNotFoundError(sync_id) from None
 
-    @classmethod
-    async def _get_callback(  # type: ignore
-        cls,
-        channel: aioredis.client.PubSub,
-    ) -> BotXMethodCallback:
-        async for message in channel.listen():
+    def _evict_callback(self, sync_id: UUID) -> None:
+        self._futures.pop(sync_id, None)
+        self._creation_times.pop(sync_id, None)
+
+    def _owner_key(self, sync_id: UUID) -> str:
+        return f"{self._prefix}:botx-callback-owner:{sync_id}"
+
+    async def _claim_callback(self, sync_id: UUID) -> None:
+        await self._redis.set(
+            self._owner_key(sync_id),
+            self._channel,
+            ex=max(math.ceil(self._max_callback_age), 1),
+        )
+
+    async def _publish_callback(self, callback: BotXMethodCallback) -> None:
+        owner_channel = await self._redis.get(self._owner_key(callback.sync_id))
+        if owner_channel is None:
+            raise BotXMethodCallbackNotFoundError(sync_id=callback.sync_id)
+
+        owner_channel = _to_str(owner_channel)
+        pubsub_redis = await get_node_client(self._redis, owner_channel)
+
+        listeners_count = await pubsub_redis.publish(
+            owner_channel, pickle.dumps(callback)
+        )
+        if not listeners_count:
+            raise BotXMethodCallbackNotFoundError(sync_id=callback.sync_id)
+
+    async def _sweep_callbacks_periodically(self) -> None:
+        while True:  # noqa: WPS457
+            await asyncio.sleep(self._sweep_interval)
+            self.sweep_expired_callbacks()
+
+    async def _listen_callbacks(self) -> None:
+        while True:  # noqa: WPS457
+            try:
+                await self._receive_callbacks()
+            except Exception:
+                logger.exception("BotX callbacks listener failed")
+            finally:
+                await self._unsubscribe()
+
+            logger.warning(
+                f"Resubscribing to BotX callbacks, {len(self._futures)} "
+                "callbacks are pending"
+            )
+            await self._resubscribe()
+
+    async def _resubscribe(self) -> None:
+        while True:  # noqa: WPS457
+            try:
+                await self._subscribe()
+            except Exception:
+                logger.exception("Failed to resubscribe to BotX callbacks")
+            else:
+                return
+
+            # After sentinel failover connection is made to the new master
+            await asyncio.sleep(RESUBSCRIBE_DELAY_SEC)
+
+    async def _subscribe(self) -> None:
+        pubsub_redis = await get_node_client(self._redis, self._channel)
+        pubsub = pubsub_redis.pubsub()
+
+        try:
+            await pubsub.subscribe(self._channel)
+
+            # Callbacks published before confirmation aren't received
+            while True:  # noqa: WPS457
+                message = await pubsub.get_message(timeout=SUBSCRIBE_TIMEOUT_SEC)
+                if message is None:
+                    raise TimeoutError("BotX callbacks subscription isn't confirmed")
+                if message["type"] == "subscribe":
+                    break
+        except BaseException:
+            await pubsub.reset()
+            raise
+
+        self._pubsub = pubsub
+
+    async def _unsubscribe(self) -> None:
+        if self._pubsub is not None:
+            pubsub, self._pubsub = self._pubsub, None
+            await pubsub.reset()
+
+    async def _receive_callbacks(self) -> None:
+        assert self._pubsub is not None, "Listener isn't subscribed"
+
+        async for message in self._pubsub.listen():
             if message["type"] == "message":
-                return pickle.loads(message["data"])  # noqa: S301
+                self._resolve_callback(pickle.loads(message["data"]))  # noqa: S301
+
+    def _resolve_callback(self, callback: BotXMethodCallback) -> bool:
+        # Callback could be evicted after it was claimed
+        future = self._futures.get(callback.sync_id)
+        if future is None:
+            return False
+
+        if not future.done():
+            future.set_result(callback)
+
+        return True
+
+
+def _to_str(raw_value: bytes | str) -> str:
+    if isinstance(raw_value, bytes):
+        return raw_value.decode()
+
+    return raw_value
@@ -0,0 +1,115 @@
+"""Repository for work callbacks with redis stream."""
+
+import pickle  # noqa: S403
+import time
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from pybotx.models.method_callbacks import BotXMethodCallback
+
+from app.caching.callback_redis_repo import (
+    MAX_CALLBACK_AGE_SEC,
+    SWEEP_INTERVAL_SEC,
+    CallbackRedisRepo,
+)
+from app.caching.redis_client import RedisClient
+
+CALLBACK_RETENTION_SEC = 60
+CALLBACK_FIELD = b"callback"
+
+# Must be shorter than socket timeout, which limits blocking reads too
+READ_BLOCK_MS = 1000
+READ_COUNT = 100
+
+
+class CallbackStreamRedisRepo(CallbackRedisRepo):
+    """Repository to deliver BotX callbacks between processes with redis stream.
+
+    Unlike channel, stream keeps callbacks for `retention`, so they aren't lost
+    when published before listener is (re)connected. Listener reads callbacks
+    published during the last `retention` on start, and callbacks received
+    before their creation are kept to resolve them on creation.
+    """
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        prefix: Optional[str] = None,
+        max_callback_age: float = MAX_CALLBACK_AGE_SEC,
+        sweep_interval: float = SWEEP_INTERVAL_SEC,
+        retention: float = CALLBACK_RETENTION_SEC,
+    ):
+        super().__init__(redis, prefix, max_callback_age, sweep_interval)
+        self._stream = f"{self._prefix}:botx-callbacks-stream"
+        self._retention = retention
+        self._last_entry_id: Optional[str] = None
+        # Insertion ordered, so the oldest callbacks go first
+        self._early_callbacks: Dict[UUID, Tuple[BotXMethodCallback, float]] = {}
+
+    async def create_botx_method_callback(
+        self,
+        sync_id: UUID,
+    ) -> None:
+        await super().create_botx_method_callback(sync_id)
+
+        early_callback = self._early_callbacks.pop(sync_id, None)
+        if early_callback is not None:
+            self._resolve_callback(early_callback[0])
+
+    def sweep_expired_callbacks(self) -> None:
+        super().sweep_expired_callbacks()
+
+        expired_before = time.monotonic() - self._retention
+
+        for sync_id, (_, receiving_time) in list(self._early_callbacks.items()):
+            if receiving_time > expired_before:
+                break
+
+            self._early_callbacks.pop(sync_id)
+
+    async def _claim_callback(self, sync_id: UUID) -> None:
+        """Stream is read by all processes, so callbacks aren't routed."""
+
+    async def _publish_callback(self, callback: BotXMethodCallback) -> None:
+        retention_ms = int(self._retention * 1000)
+        min_entry_id = int(time.time() * 1000) - retention_ms
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.xadd(
+                self._stream,
+                {CALLBACK_FIELD: pickle.dumps(callback)},
+                minid=min_entry_id,
+                approximate=True,
+            )
+            # Stream of idle bot disappears with its last callback
+            pipe.pexpire(self._stream, retention_ms)
+            await pipe.execute()
+
+    async def _subscribe(self) -> None:
+        """Stream is read from the last received entry, no subscription needed."""
+
+    async def _receive_callbacks(self) -> None:
+        if self._last_entry_id is None:
+            start_ms = int((time.time() - self._retention) * 1000)
+            self._last_entry_id = f"{start_ms}-0"
+
+        while True:  # noqa: WPS457
+            streams = await self._redis.xread(
+                {self._stream: self._last_entry_id},
+                count=READ_COUNT,
+                block=READ_BLOCK_MS,
+            )
+
+            for _, entries in streams:
+                for entry_id, fields in entries:
+                    self._last_entry_id = entry_id
+                    self._receive_callback(
+                        pickle.loads(fields[CALLBACK_FIELD])  # noqa: S301
+                    )
+
+    def _receive_callback(self, callback: BotXMethodCallback) -> None:
+        if self._resolve_callback(callback):
+            return
+
+        # Callbacks waited by other processes are kept too, they can't be told apart
+        self._early_callbacks[callback.sync_id] = (callback, time.monotonic())
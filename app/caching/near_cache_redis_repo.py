@@ -0,0 +1,246 @@
+"""Redis repository with in-process near cache."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from app.caching.redis_client import RedisClient, get_node_client
+from app.caching.redis_repo import RedisCodecProto, RedisRepo
+from app.logger import logger
+
+RESUBSCRIBE_DELAY_SEC = 1
+VERSION_SIZE = 32
+# Version expires before value, so expired value can't be served from memory
+VERSION_EXPIRE_ADVANCE_MS = 100
+
+
+class NearCache:
+    """Bounded LRU cache with TTL for raw redis values and their versions."""
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, redis_key: str) -> Optional[bytes]:
+        entry = self._entries.get(redis_key)
+        if entry is None:
+            return None
+
+        expires_at, dump = entry
+        if expires_at < time.monotonic():
+            del self._entries[redis_key]  # noqa: WPS420
+            return None
+
+        self._entries.move_to_end(redis_key)
+        return dump
+
+    def set(self, redis_key: str, dump: bytes) -> None:  # noqa: WPS125
+        self._entries[redis_key] = (time.monotonic() + self._ttl, dump)
+        self._entries.move_to_end(redis_key)
+
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, redis_key: str) -> None:
+        self._entries.pop(redis_key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class NearCacheRedisRepo(RedisRepo):
+    """Redis repository which serves repeated reads from process memory.
+
+    Raw values are cached, so every hit returns a fresh object. Each write
+    stores random version of the value next to it, and hit is served only if
+    cached version is still current, so the value is not transferred again.
+    Invalidation channel evicts changed keys from near caches of other processes
+    to keep memory clean. While invalidations can't be received, reads go
+    straight to redis.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        redis: RedisClient,
+        prefix: Optional[str] = None,
+        expire: Optional[int] = None,
+        codec: Optional[RedisCodecProto] = None,
+        read_legacy_keys: bool = False,
+        expiration_notice: Optional[int] = None,
+        hash_tag_keys: bool = False,
+        *,
+        max_size: int,
+        ttl: float,
+    ) -> None:
+        super().__init__(
+            redis,
+            prefix,
+            expire,
+            codec,
+            read_legacy_keys,
+            expiration_notice,
+            hash_tag_keys,
+        )
+
+        self._near_cache = NearCache(max_size=max_size, ttl=ttl)
+        self._instance_id = uuid4().hex
+        self._invalidation_channel = f"{prefix or ''}:near-cache-invalidations"
+        self._invalidations_count = 0
+        self._is_subscribed = False
+        self._listener_task: Optional["asyncio.Task[None]"] = None
+
+        self._hits = 0
+        self._misses = 0
+
+    async def start(self) -> None:
+        self._listener_task = asyncio.create_task(self._listen_invalidations())
+
+    async def stop(self) -> None:
+        if self._listener_task is None:
+            return
+
+        self._listener_task.cancel()
+        try:
+            await self._listener_task
+        except asyncio.CancelledError:
+            pass  # noqa: WPS420
+
+        self._listener_task = None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        requests_count = self._hits + self._misses
+
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": self._hits / requests_count if requests_count else 0,
+            "size": len(self._near_cache),
+            "is_subscribed": self._is_subscribed,
+        }
+
+    async def delete(self, key: Hashable) -> None:
+        await super().delete(key)
+        await self._publish_invalidations([self._key(key)])
+
+    async def rget(self, key: Hashable, default: Any = None) -> Any:
+        storage_value = await super().rget(key, default)
+
+        redis_key = self._key(key)
+        await self._redis.delete(self._version_key(redis_key))
+        await self._publish_invalidations([redis_key])
+
+        return storage_value
+
+    def _version_key(self, redis_key: str) -> str:
+        # Hash tag of the value key is kept, so both keys are on the same node
+        return f"{self._prefix or ''}:near-cache-version:{redis_key}"
+
+    def _redis_keys(self, key: Hashable) -> List[str]:
+        redis_keys = super()._redis_keys(key)
+        redis_keys.append(self._version_key(self._key(key)))
+        return redis_keys
+
+    async def _get_dump(self, key: Hashable) -> Optional[bytes]:
+        if not self._is_subscribed:
+            return await super()._get_dump(key)
+
+        redis_key = self._key(key)
+        # Version is read before value, so cached value is never older than version
+        version = await self._redis.get(self._version_key(redis_key))
+
+        cached_entry = self._near_cache.get(redis_key)
+        if cached_entry is not None and cached_entry[:VERSION_SIZE] == version:
+            self._hits += 1
+            return cached_entry[VERSION_SIZE:]
+
+        self._misses += 1
+
+        # Value read from redis could be outdated by invalidation received meanwhile
+        invalidations_count = self._invalidations_count
+        cached_data = await super()._get_dump(key)
+
+        if (
+            cached_data is not None
+            and version is not None  # noqa: W503
+            and invalidations_count == self._invalidations_count  # noqa: W503
+        ):
+            self._near_cache.set(redis_key, version + cached_data)
+
+        return cached_data
+
+    async def _set_dump(
+        self, key: Hashable, dump: bytes, expire: Optional[int]
+    ) -> None:
+        redis_key = self._key(key)
+        version = uuid4().hex.encode()
+        version_expire_ms = (
+            expire * 1000 - VERSION_EXPIRE_ADVANCE_MS if expire is not None else None
+        )
+
+        # Version is written after value, so it never accompanies older value
+        async with self._redis.pipeline(transaction=False) as pipe:
+            self._add_set_commands(pipe, redis_key, dump, expire)
+            pipe.set(self._version_key(redis_key), version, px=version_expire_ms)
+            await pipe.execute()
+
+        await self._publish_invalidations([redis_key])
+
+        if self._is_subscribed:
+            self._near_cache.set(redis_key, version + dump)
+
+    async def _publish_invalidations(self, redis_keys: Iterable[str]) -> None:
+        pubsub_redis = await get_node_client(self._redis, self._invalidation_channel)
+
+        async with pubsub_redis.pipeline(transaction=False) as pipe:
+            for redis_key in redis_keys:
+                self._invalidate(redis_key)
+                pipe.publish(
+                    self._invalidation_channel, f"{self._instance_id}:{redis_key}"
+                )
+            await pipe.execute()
+
+    def _invalidate(self, redis_key: str) -> None:
+        self._invalidations_count += 1
+        self._near_cache.invalidate(redis_key)
+
+    async def _listen_invalidations(self) -> None:
+        while True:  # noqa: WPS457
+            try:
+                await self._receive_invalidations()
+            except Exception:
+                logger.exception("Near cache invalidations listener failed")
+            finally:
+                self._is_subscribed = False
+                self._near_cache.clear()
+
+            await asyncio.sleep(RESUBSCRIBE_DELAY_SEC)
+
+    async def _receive_invalidations(self) -> None:
+        pubsub_redis = await get_node_client(self._redis, self._invalidation_channel)
+        pubsub = pubsub_redis.pubsub()
+
+        try:
+            await pubsub.subscribe(self._invalidation_channel)
+
+            async for message in pubsub.listen():
+                if message["type"] == "subscribe":
+                    # Any key could be changed while invalidations weren't received
+                    self._near_cache.clear()
+                    self._is_subscribed = True
+                elif message["type"] == "message":
+                    self._handle_invalidation(message["data"])
+        finally:
+            await pubsub.reset()
+
+    def _handle_invalidation(self, invalidation: bytes) -> None:
+        instance_id, redis_key = invalidation.decode().split(":", 1)
+
+        if instance_id != self._instance_id:
+            self._invalidate(redis_key)
@@ -0,0 +1,291 @@
+"""Redis clients for standalone, sentinel and cluster deployments."""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import unquote
+
+from redis import asyncio as aioredis
+from redis.asyncio.cluster import ClusterNode, RedisCluster
+from redis.asyncio.sentinel import Sentinel, SentinelConnectionPool
+
+from app.settings import settings
+
+SENTINEL_SCHEMES = ("redis+sentinel", "rediss+sentinel")
+CLUSTER_SCHEMES = ("redis+cluster", "rediss+cluster")
+DEFAULT_SENTINEL_PORT = 26379
+DEFAULT_REDIS_PORT = 6379
+
+RedisClient = Union[aioredis.Redis, RedisCluster]
+
+
+class InvalidRedisDSNError(Exception):
+    """Error for raising when redis DSN can't be parsed."""
+
+
+class BlockingSentinelConnectionPool(
+    SentinelConnectionPool, aioredis.BlockingConnectionPool
+):
+    """Sentinel pool which waits for free connection, when all of them are used."""
+
+
+def build_redis_client(
+    dsn: str, pool_timeout: float | None = None, **kwargs: Any
+) -> RedisClient:
+    """Build redis client by DSN.
+
+    Besides usual `redis://`, `rediss://` and `unix://` DSNs, the following are
+    supported:
+
+    * `redis+sentinel://[:password@]host:port[,host:port]/service_name[/db]`
+    * `redis+cluster://[:password@]host:port[,host:port]`
+
+    If `max_connections` is passed, standalone and sentinel clients wait
+    `pool_timeout` seconds (forever if it's None) for free connection, when all
+    of them are used. Cluster client has no such pool and fails at once.
+    """
+
+    scheme, _, location = dsn.partition("://")
+
+    if scheme in SENTINEL_SCHEMES:
+        return _build_sentinel_client(scheme, location, pool_timeout, **kwargs)
+
+    if scheme in CLUSTER_SCHEMES:
+        return _build_cluster_client(scheme, location, **kwargs)
+
+    if "max_connections" not in kwargs:
+        return aioredis.from_url(dsn, **kwargs)
+
+    return aioredis.Redis(
+        connection_pool=aioredis.BlockingConnectionPool.from_url(
+            dsn, timeout=pool_timeout, **kwargs
+        )
+    )
+
+
+_redis_clients: Dict[str, RedisClient] = {}
+_cluster_node_clients: Dict[str, aioredis.Redis] = {}
+
+
+def get_redis_client(dsn: Optional[str] = None) -> RedisClient:
+    """Get redis client shared by the whole process.
+
+    Client is created on the first call for `dsn` (`REDIS_DSN` by default) and
+    no connections are opened until it's used.
+    """
+
+    dsn = dsn or settings.REDIS_DSN
+
+    redis_client = _redis_clients.get(dsn)
+    if redis_client is None:
+        redis_client = build_redis_client(
+            dsn, pool_timeout=settings.REDIS_POOL_TIMEOUT_SEC, **_get_pool_kwargs()
+        )
+        _redis_clients[dsn] = redis_client
+
+    return redis_client
+
+
+async def close_redis_clients() -> None:
+    """Close shared clients, new ones are created on the next use."""
+
+    for redis_client in (*_redis_clients.values(), *_cluster_node_clients.values()):
+        await redis_client.close()
+
+    _redis_clients.clear()
+    _cluster_node_clients.clear()
+
+
+def get_redis_pools_stats() -> Dict[str, Dict[str, Any]]:
+    """Get connections count of each pool of shared clients."""
+
+    pools_stats = {}
+
+    for redis_client in _redis_clients.values():
+        if isinstance(redis_client, RedisCluster):
+            for node in redis_client.get_nodes():
+                pools_stats[f"cluster:{node.name}"] = {
+                    "created": len(node._connections),  # noqa: WPS437
+                    "available": len(node._free),  # noqa: WPS437
+                    "max": node.max_connections,
+                }
+        else:
+            pool = redis_client.connection_pool
+            pools_stats[_get_pool_name(pool)] = _get_pool_stats(pool)
+
+    for node_name, node_client in _cluster_node_clients.items():
+        pools_stats[f"pubsub:{node_name}"] = _get_pool_stats(
+            node_client.connection_pool
+        )
+
+    return pools_stats
+
+
+def is_cluster(redis: RedisClient) -> bool:
+    return isinstance(redis, RedisCluster)
+
+
+async def get_node_client(redis: RedisClient, key: str) -> aioredis.Redis:
+    """Get client of the node serving `key`.
+
+    Cluster client can't be used for pub/sub, so channels are served by node
+    owning their slot. This way publisher and subscribers of the channel meet at
+    the same node and publish result counts all subscribers.
+    """
+
+    if not isinstance(redis, RedisCluster):
+        return redis
+
+    await redis.initialize()
+    node = redis.get_node_from_key(key)
+    assert node is not None
+
+    return _get_cluster_node_client(node)
+
+
+async def get_primary_clients(redis: RedisClient) -> List[aioredis.Redis]:
+    """Get clients of all nodes storing data, e.g. to receive keyspace events."""
+
+    if not isinstance(redis, RedisCluster):
+        return [redis]
+
+    await redis.initialize()
+    return [_get_cluster_node_client(node) for node in redis.get_primaries()]
+
+
+def _get_cluster_node_client(node: ClusterNode) -> aioredis.Redis:
+    node_client = _cluster_node_clients.get(node.name)
+
+    if node_client is None:
+        # Cluster parser handles redirections, which don't happen with pub/sub
+        connection_kwargs = {
+            kwarg_name: kwarg_value
+            for kwarg_name, kwarg_value in node.connection_kwargs.items()
+            if kwarg_name != "parser_class"
+        }
+        if settings.REDIS_MAX_CONNECTIONS is None:
+            connection_pool = aioredis.ConnectionPool(
+                connection_class=node.connection_class,
+                max_connections=node.max_connections,
+                **connection_kwargs,
+            )
+        else:
+            connection_pool = aioredis.BlockingConnectionPool(
+                connection_class=node.connection_class,
+                max_connections=node.max_connections,
+                timeout=settings.REDIS_POOL_TIMEOUT_SEC,
+                **connection_kwargs,
+            )
+
+        node_client = aioredis.Redis(connection_pool=connection_pool)
+        _cluster_node_clients[node.name] = node_client
+
+    return node_client
+
+
+def _get_pool_kwargs() -> Dict[str, Any]:
+    pool_kwargs: Dict[str, Any] = {
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT_SEC,
+        "socket_connect_timeout": settings.REDIS_SOCKET_CONNECT_TIMEOUT_SEC,
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL_SEC,
+    }
+
+    # Clients have their own defaults for unlimited pool
+    if settings.REDIS_MAX_CONNECTIONS is not None:
+        pool_kwargs["max_connections"] = settings.REDIS_MAX_CONNECTIONS
+
+    return pool_kwargs
+
+
+def _get_pool_name(pool: aioredis.ConnectionPool) -> str:
+    if isinstance(pool, SentinelConnectionPool):
+        return f"sentinel:{pool.service_name}"
+
+    connection_kwargs = pool.connection_kwargs
+    if "path" in connection_kwargs:
+        return f"unix:{connection_kwargs['path']}"
+
+    return f"{connection_kwargs.get('host')}:{connection_kwargs.get('port')}"
+
+
+def _get_pool_stats(pool: aioredis.ConnectionPool) -> Dict[str, Any]:
+    if isinstance(pool, aioredis.BlockingConnectionPool):
+        # Free slots of blocking pool are kept as None until connection is made
+        created_count = len(pool._connections)  # noqa: WPS437
+        available_count = sum(
+            connection is not None
+            for connection in pool.pool._queue  # type: ignore  # noqa: WPS437
+        )
+        return {
+            "created": created_count,
+            "in_use": created_count - available_count,
+            "available": available_count,
+            "max": pool.max_connections,
+        }
+
+    return {
+        "created": pool._created_connections,  # noqa: WPS437
+        "in_use": len(pool._in_use_connections),  # noqa: WPS437
+        "available": len(pool._available_connections),  # noqa: WPS437
+        "max": pool.max_connections,
+    }
+
+
+def _build_sentinel_client(
+    scheme: str, location: str, pool_timeout: float | None, **kwargs: Any
+) -> RedisClient:
+    password, hosts, path = _parse_location(location, DEFAULT_SENTINEL_PORT)
+
+    service_name, _, db = path.partition("/")
+    if not service_name:
+        raise InvalidRedisDSNError("Sentinel DSN must contain service name")
+
+    if scheme.startswith("rediss"):
+        kwargs["ssl"] = True
+
+    sentinel = Sentinel(hosts, sentinel_kwargs=kwargs.copy(), **kwargs)
+
+    pool_kwargs: Dict[str, Any] = {}
+    if "max_connections" in kwargs:
+        pool_kwargs["connection_pool_class"] = BlockingSentinelConnectionPool
+        pool_kwargs["timeout"] = pool_timeout
+
+    return sentinel.master_for(
+        service_name,
+        redis_class=aioredis.Redis,
+        password=password,
+        db=int(db or 0),
+        **pool_kwargs,
+    )
+
+
+def _build_cluster_client(scheme: str, location: str, **kwargs: Any) -> RedisClient:
+    password, hosts, path = _parse_location(location, DEFAULT_REDIS_PORT)
+
+    if path:
+        raise InvalidRedisDSNError("Redis cluster doesn't support databases")
+
+    if scheme.startswith("rediss"):
+        kwargs["ssl"] = True
+
+    return RedisCluster(
+        startup_nodes=[ClusterNode(host, port) for host, port in hosts],
+        password=password,
+        **kwargs,
+    )
+
+
+def _parse_location(
+    location: str, default_port: int
+) -> Tuple[str | None, List[Tuple[str, int]], str]:
+    netloc, _, path = location.partition("/")
+    credentials, _, hosts_str = netloc.rpartition("@")
+    password = unquote(credentials.partition(":")[2]) or None
+
+    hosts = []
+    for host_str in hosts_str.split(","):
+        host, _, port = host_str.partition(":")
+        if not host:
+            raise InvalidRedisDSNError(f"Invalid host `{host_str}` in redis DSN")
+
+        hosts.append((host, int(port or default_port)))
+
+    return password, hosts, path.strip("/")
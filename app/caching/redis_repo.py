@@ -1,23 +1,270 @@
 """Repository for work with redis."""
 
+import dataclasses
 import hashlib
+import json
 import pickle  # noqa: S403
-from typing import Any, Hashable, Optional
+import zlib
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, Hashable, List, Optional, Protocol, Type
+from uuid import UUID
 
-from redis import asyncio as aioredis
+from pydantic import BaseModel
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ResponseError
 
+from app.caching.redis_client import RedisClient
+
+SCHEMA_CODEC_VERSION = 1
+# Pickle dumps start with PROTO opcode (0x80), so header can't be confused with it
+SCHEMA_CODEC_HEADER = bytes([SCHEMA_CODEC_VERSION])
+
+# Neither pickle nor schema codec dumps start with this byte
+COMPRESSION_HEADER = bytes([0xFF])
+
+TYPE_TAG = "$"
+VALUE_TAG = "v"
+
+KEY_DELIMITER = ":"
+HASHED_KEY_TAG = "#"
+EXPIRATION_NOTICE_SUFFIX = ":expiring"
+
+# GETDEL is available since redis 6.2
+GETDEL_SCRIPT = """
+local value = redis.call("GET", KEYS[1])
+redis.call("DEL", KEYS[1])
+return value
+"""
+UNKNOWN_COMMAND_ERROR = "unknown command"
+
+
+class RedisCodecProto(Protocol):
+    def dumps(self, storage_value: Any) -> bytes:
+        """Serialize value to store it in redis."""
+
+    def loads(self, dump: bytes) -> Any:
+        """Deserialize value stored in redis."""
+
+
+class PickleCodec:
+    def dumps(self, storage_value: Any) -> bytes:
+        return pickle.dumps(storage_value)
+
+    def loads(self, dump: bytes) -> Any:
+        return pickle.loads(dump)  # noqa: S301
+
+
+class UnregisteredTypeError(Exception):
+    """Error for raising when value type isn't registered in schema codec."""
+
+
+class SchemaCodec:
+    """Codec to store registered schemas as tagged JSON.
+
+    Types are tagged by registered names instead of import paths, so stored values
+    survive modules moving. Values of unregistered types and dumps without schema
+    codec header (e.g. old pickled entries) are handled by fallback codec.
+
+    Schema codec is several times slower than pickle, so with `dumps_schemas`
+    unset all values are dumped by fallback codec, while values dumped by schema
+    codec before are still read.
+    """
+
+    def __init__(
+        self, fallback: Optional[RedisCodecProto] = None, dumps_schemas: bool = True
+    ) -> None:
+        self._fallback = fallback or PickleCodec()
+        self._dumps_schemas = dumps_schemas
+        self._types: Dict[str, Type] = {}
+        self._names: Dict[Type, str] = {}
+
+    def register(self, *types: Type) -> None:
+        for registered_type in types:
+            type_name = registered_type.__name__
+            assert type_name not in self._types, f"`{type_name}` already registered"
+
+            self._types[type_name] = registered_type
+            self._names[registered_type] = type_name
+
+    def dumps(self, storage_value: Any) -> bytes:
+        if not self._dumps_schemas:
+            return self._fallback.dumps(storage_value)
+
+        try:
+            encoded_value = self._encode(storage_value)
+        except UnregisteredTypeError:
+            return self._fallback.dumps(storage_value)
+
+        dump = json.dumps(encoded_value, ensure_ascii=False, separators=(",", ":"))
+        return SCHEMA_CODEC_HEADER + dump.encode()
+
+    def loads(self, dump: bytes) -> Any:
+        if not dump.startswith(SCHEMA_CODEC_HEADER):
+            return self._fallback.loads(dump)
+
+        return self._decode(json.loads(dump[len(SCHEMA_CODEC_HEADER) :]))
+
+    def _encode(self, storage_value: Any) -> Any:  # noqa: WPS212, WPS231
+        type_name = self._names.get(type(storage_value))
+        if type_name is not None:
+            return self._encode_registered(type_name, storage_value)
+
+        if storage_value is None or isinstance(storage_value, (bool, int, float, str)):
+            return storage_value
+
+        if isinstance(storage_value, list):
+            return [self._encode(list_value) for list_value in storage_value]
+
+        if isinstance(storage_value, tuple):
+            return self._tag("tuple", self._encode(list(storage_value)))
+
+        if isinstance(storage_value, dict):
+            return self._tag("dict", self._encode_fields(storage_value))
+
+        if isinstance(storage_value, SimpleNamespace):
+            return self._tag("namespace", self._encode_fields(vars(storage_value)))
+
+        if isinstance(storage_value, UUID):
+            return self._tag("uuid", str(storage_value))
+
+        if isinstance(storage_value, datetime):
+            return self._tag("datetime", storage_value.isoformat())
+
+        raise UnregisteredTypeError(type(storage_value))
+
+    def _encode_registered(self, type_name: str, storage_value: Any) -> Any:
+        if isinstance(storage_value, Enum):
+            return self._tag(type_name, storage_value.name)
+
+        if isinstance(storage_value, BaseModel):
+            fields = {
+                field_name: getattr(storage_value, field_name)
+                for field_name in storage_value.__fields__
+            }
+        else:
+            fields = {
+                field.name: getattr(storage_value, field.name)
+                for field in dataclasses.fields(storage_value)
+            }
+
+        return self._tag(type_name, self._encode_fields(fields))
+
+    def _encode_fields(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        if not all(isinstance(field_name, str) for field_name in fields):
+            raise UnregisteredTypeError(dict)
+
+        return {
+            field_name: self._encode(field_value)
+            for field_name, field_value in fields.items()
+        }
+
+    def _decode(self, encoded_value: Any) -> Any:  # noqa: WPS212
+        if isinstance(encoded_value, list):
+            return [self._decode(list_value) for list_value in encoded_value]
+
+        if not isinstance(encoded_value, dict):
+            return encoded_value
+
+        type_name = encoded_value[TYPE_TAG]
+        tagged_value = encoded_value[VALUE_TAG]
+
+        if type_name == "tuple":
+            return tuple(self._decode(tagged_value))
+        if type_name == "dict":
+            return self._decode_fields(tagged_value)
+        if type_name == "namespace":
+            return SimpleNamespace(**self._decode_fields(tagged_value))
+        if type_name == "uuid":
+            return UUID(tagged_value)
+        if type_name == "datetime":
+            return datetime.fromisoformat(tagged_value)
+
+        registered_type = self._types[type_name]
+        if issubclass(registered_type, Enum):
+            return registered_type[tagged_value]
+
+        return registered_type(**self._decode_fields(tagged_value))
+
+    def _decode_fields(self, encoded_fields: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            field_name: self._decode(field_value)
+            for field_name, field_value in encoded_fields.items()
+        }
+
+    @classmethod
+    def _tag(cls, type_name: str, tagged_value: Any) -> Dict[str, Any]:
+        return {TYPE_TAG: type_name, VALUE_TAG: tagged_value}
+
+
+class CompressionCodec:
+    """Codec to compress large dumps of wrapped codec with zlib.
+
+    Dumps shorter than `threshold` bytes are stored as is, since compression
+    doesn't pay off for them. Uncompressed dumps are read without changes.
+    """
 
-class RedisRepo:
     def __init__(
         self,
-        redis: aioredis.Redis,
+        codec: RedisCodecProto,
+        threshold: int,
+        level: int = zlib.Z_DEFAULT_COMPRESSION,
+    ) -> None:
+        self._codec = codec
+        self._threshold = threshold
+        self._level = level
+
+    def dumps(self, storage_value: Any) -> bytes:
+        dump = self._codec.dumps(storage_value)
+        if len(dump) < self._threshold:
+            return dump
+
+        compressed_dump = COMPRESSION_HEADER + zlib.compress(dump, self._level)
+        if len(compressed_dump) >= len(dump):
+            return dump
+
+        return compressed_dump
+
+    def loads(self, dump: bytes) -> Any:
+        if dump.startswith(COMPRESSION_HEADER):
+            dump = zlib.decompress(dump[len(COMPRESSION_HEADER) :])
+
+        return self._codec.loads(dump)
+
+
+class RedisRepo:
+    def __init__(  # noqa: WPS211
+        self,
+        redis: RedisClient,
         prefix: Optional[str] = None,
         expire: Optional[int] = None,
+        codec: Optional[RedisCodecProto] = None,
+        read_legacy_keys: bool = False,
+        expiration_notice: Optional[int] = None,
+        hash_tag_keys: bool = False,
     ) -> None:
+        """Create repository.
+
+        If `expiration_notice` is set, each value with expiration is accompanied by
+        notice key, which expires `expiration_notice` seconds before the value.
+        Its expiration can be caught with keyspace notifications.
+
+        If `hash_tag_keys` is set, keys are wrapped into hash tags, so in redis
+        cluster the value and keys accompanying it are stored on the same node.
+        """
+
         self._redis = redis
         self._prefix = prefix
         self._expire = expire
+        self._expiration_notice = expiration_notice
+        self._codec = codec or PickleCodec()
+        self._read_legacy_keys = read_legacy_keys
+        self._hash_tag_keys = hash_tag_keys
         self._delimiter = "_"
+        self._is_getdel_supported = True
+        self._getdel_script = self._redis.register_script(GETDEL_SCRIPT)
 
     async def ping(self) -> Optional[str]:
         try:
@@ -28,11 +275,11 @@ class RedisRepo:
         return None
 
     async def get(self, key: Hashable, default: Any = None) -> Any:
-        cached_data = await self._redis.get(self._key(key))
+        cached_data = await self._get_dump(key)
         if cached_data is None:
             return default
 
-        return pickle.loads(cached_data)  # noqa: S301
+        return self._codec.loads(cached_data)
 
     async def set(
         self, key: Hashable, storage_value: Any, expire: Optional[int] = None
@@ -40,21 +287,145 @@ class RedisRepo:
         if expire is None:
             expire = self._expire
 
-        dumps = pickle.dumps(storage_value)
-        await self._redis.set(self._key(key), dumps, ex=expire)
+        await self._set_dump(key, self._codec.dumps(storage_value), expire)
 
     async def delete(self, key: Hashable) -> None:
-        await self._redis.delete(self._key(key))
+        await self._redis.delete(*self._redis_keys(key))
 
     async def rget(self, key: Hashable, default: Any = None) -> Any:
-        storage_value = await self.get(key, default)
-        await self.delete(key)
-        return storage_value
+        redis_key = self._key(key)
+        cached_data = await self._getdel(redis_key)
+
+        if cached_data is None and self._read_legacy_keys:
+            cached_data = await self._getdel(self._legacy_key(key))
+
+        if self._expiration_notice is not None:
+            await self._redis.delete(redis_key + EXPIRATION_NOTICE_SUFFIX)
+
+        if cached_data is None:
+            return default
+
+        return self._codec.loads(cached_data)
 
     def _key(self, arg: Hashable) -> str:
+        key = build_key(arg)
+        if self._hash_tag_keys:
+            key = "{" + key + "}"
+
+        if self._prefix is not None:
+            return self._prefix + KEY_DELIMITER + key
+
+        return key
+
+    def _legacy_key(self, arg: Hashable) -> str:
         if self._prefix is not None:
             prefix = self._prefix + self._delimiter
         else:
             prefix = ""
 
         return prefix + hashlib.md5(pickle.dumps(arg)).hexdigest()  # noqa: S303
+
+    def _redis_keys(self, key: Hashable) -> List[str]:
+        """Get all redis keys which could store value or accompany it."""
+
+        redis_key = self._key(key)
+        redis_keys = [redis_key]
+
+        if self._expiration_notice is not None:
+            redis_keys.append(redis_key + EXPIRATION_NOTICE_SUFFIX)
+
+        if self._read_legacy_keys:
+            redis_keys.append(self._legacy_key(key))
+
+        return redis_keys
+
+    async def _get_dump(self, key: Hashable) -> Optional[bytes]:
+        redis_key = self._key(key)
+        cached_data = await self._redis.get(redis_key)
+
+        if cached_data is None and self._read_legacy_keys:
+            cached_data = await self._migrate_legacy_key(key, redis_key)
+
+        return cached_data
+
+    async def _set_dump(
+        self, key: Hashable, dump: bytes, expire: Optional[int]
+    ) -> None:
+        redis_key = self._key(key)
+
+        if self._expiration_notice is None:
+            await self._redis.set(redis_key, dump, ex=expire)
+            return
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            self._add_set_commands(pipe, redis_key, dump, expire)
+            await pipe.execute()
+
+    def _add_set_commands(
+        self, pipe: Pipeline, redis_key: str, dump: bytes, expire: Optional[int]
+    ) -> None:
+        pipe.set(redis_key, dump, ex=expire)
+
+        if self._expiration_notice is None:
+            return
+
+        notice_key = redis_key + EXPIRATION_NOTICE_SUFFIX
+        if expire is not None and expire > self._expiration_notice:
+            pipe.set(notice_key, b"", ex=expire - self._expiration_notice)
+        else:
+            # Previous notice would be sent at the wrong time
+            pipe.delete(notice_key)
+
+    async def _migrate_legacy_key(
+        self, key: Hashable, redis_key: str
+    ) -> Optional[bytes]:
+        """Read value stored under md5 hashed key and move it to the new key."""
+
+        legacy_key = self._legacy_key(key)
+        cached_data = await self._redis.get(legacy_key)
+
+        if cached_data is not None:
+            # Doesn't overwrite value if it was set with the new key meanwhile
+            await self._redis.renamenx(legacy_key, redis_key)
+
+        return cached_data
+
+    async def _getdel(self, redis_key: str) -> Optional[bytes]:
+        if self._is_getdel_supported:
+            try:
+                return await self._redis.getdel(redis_key)
+            except ResponseError as exc:
+                # Redis older than 6.2 doesn't know GETDEL command
+                if UNKNOWN_COMMAND_ERROR not in str(exc).lower():
+                    raise
+
+                self._is_getdel_supported = False
+
+        return await self._getdel_script(keys=[redis_key])
+
+
+def build_key(arg: Hashable) -> str:
+    """Build human-readable key, unusual key types are hashed.
+
+    Readable key is the same for values with the same string form, so `5` and
+    `"5"`, UUID and its string, `("a", "b")` and `"a:b"` share one key. Keys of
+    different types must not be mixed in one repository.
+    """
+
+    if isinstance(arg, str):
+        return arg
+
+    if isinstance(arg, UUID) or (isinstance(arg, int) and not isinstance(arg, bool)):
+        return str(arg)
+
+    if isinstance(arg, tuple) and all(
+        isinstance(key_part, (str, UUID)) for key_part in arg
+    ):
+        return KEY_DELIMITER.join(str(key_part) for key_part in arg)
+
+    return HASHED_KEY_TAG + _hash_key(arg)
+
+
+@lru_cache(maxsize=1024)
+def _hash_key(arg: Hashable) -> str:
+    return hashlib.md5(pickle.dumps(arg)).hexdigest()  # noqa: S303
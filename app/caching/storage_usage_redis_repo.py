@@ -0,0 +1,82 @@
+"""Repository for accounting attachments storage usage with redis."""
+
+from typing import Optional
+
+from app.caching.redis_client import RedisClient
+
+# Usage can't become negative even if some files were removed without accounting
+RELEASE_SCRIPT = """
+local usage = redis.call("DECRBY", KEYS[1], ARGV[1])
+if usage < 0 then
+    redis.call("SET", KEYS[1], 0)
+    usage = 0
+end
+return usage
+"""
+
+# Usage is checked against watermarks and increased in one step, so concurrent
+# uploads can't overflow storage together
+RESERVE_SCRIPT = """
+local usage = tonumber(redis.call("GET", KEYS[1]) or "0")
+local size = tonumber(ARGV[1])
+if usage + size >= tonumber(ARGV[2]) then
+    redis.call("SET", KEYS[2], 1)
+    return 0
+end
+if redis.call("EXISTS", KEYS[2]) == 1 then
+    if usage > tonumber(ARGV[3]) then
+        return 0
+    end
+    redis.call("DEL", KEYS[2])
+end
+redis.call("INCRBY", KEYS[1], size)
+return 1
+"""
+
+
+class StorageUsageRedisRepo:
+    def __init__(
+        self,
+        redis: RedisClient,
+        high_watermark: int,
+        low_watermark: int,
+        prefix: Optional[str] = None,
+    ) -> None:
+        self._redis = redis
+        self._high_watermark = high_watermark
+        self._low_watermark = low_watermark
+
+        # Hash tag keeps keys of the script in one slot of redis cluster
+        key_prefix = f"{prefix}:" if prefix else ""
+        self._usage_key = f"{key_prefix}{{attachments_storage}}:usage"
+        self._overloaded_key = f"{key_prefix}{{attachments_storage}}:overloaded"
+
+        self._release_script = self._redis.register_script(RELEASE_SCRIPT)
+        self._reserve_script = self._redis.register_script(RESERVE_SCRIPT)
+
+    async def get_usage(self) -> int:
+        usage = await self._redis.get(self._usage_key)
+        return int(usage or 0)
+
+    async def set_usage(self, size: int) -> None:
+        await self._redis.set(self._usage_key, size)
+
+    async def release(self, size: int) -> None:
+        if size:
+            await self._release_script(keys=[self._usage_key], args=[size])
+
+    async def is_overloaded(self) -> bool:
+        return bool(await self._redis.exists(self._overloaded_key))
+
+    async def reserve(self, size: int) -> bool:
+        """Count `size` bytes more as used, if they can be stored.
+
+        Storage becomes overloaded when usage reaches high watermark and stays
+        overloaded until usage drops to low watermark.
+        """
+
+        is_reserved = await self._reserve_script(
+            keys=[self._usage_key, self._overloaded_key],
+            args=[size, self._high_watermark, self._low_watermark],
+        )
+        return bool(is_reserved)
@@ -0,0 +1,89 @@
+"""Repository for caching users found on cts with redis."""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from pybotx import UserFromSearch, UserKinds
+
+from app.caching.redis_client import RedisClient
+from app.caching.redis_repo import SchemaCodec
+
+
+@dataclass
+class CachedUserSearch:
+    """Result of user search, `user` is None if user wasn't found or is bot."""
+
+    user: Optional[UserFromSearch]
+    bot_id: Optional[UUID]
+    is_bot: bool
+    fresh_until: float
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() >= self.fresh_until
+
+
+class UserSearchRedisRepo:
+    """Cache of users found on cts.
+
+    Found users are fresh for `ttl` and are kept stale for `stale_ttl` more, so
+    they can be returned while being refreshed. Users which weren't found or are
+    bots are cached for `negative_ttl` and never become stale.
+    """
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        ttl: int,
+        stale_ttl: int,
+        negative_ttl: int,
+        prefix: Optional[str] = None,
+    ) -> None:
+        self._redis = redis
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._negative_ttl = negative_ttl
+        self._key_prefix = f"{prefix}:user_search" if prefix else "user_search"
+
+        self._codec = SchemaCodec()
+        self._codec.register(CachedUserSearch, UserFromSearch, UserKinds)
+
+    async def get(self, huid: UUID) -> Optional[CachedUserSearch]:
+        dump = await self._redis.get(self._key(huid))
+        if dump is None:
+            return None
+
+        return self._codec.loads(dump)
+
+    async def set_found(self, user: UserFromSearch, bot_id: UUID) -> None:
+        cached_search = CachedUserSearch(
+            user=user, bot_id=bot_id, is_bot=False, fresh_until=time.time() + self._ttl
+        )
+        await self._set(user.huid, cached_search, self._ttl + self._stale_ttl)
+
+    async def set_not_found(self, huid: UUID) -> None:
+        await self._set_negative(huid, is_bot=False)
+
+    async def set_bot(self, huid: UUID) -> None:
+        await self._set_negative(huid, is_bot=True)
+
+    async def _set_negative(self, huid: UUID, is_bot: bool) -> None:
+        cached_search = CachedUserSearch(
+            user=None,
+            bot_id=None,
+            is_bot=is_bot,
+            fresh_until=time.time() + self._negative_ttl,
+        )
+        await self._set(huid, cached_search, self._negative_ttl)
+
+    async def _set(self, huid: UUID, cached_search: CachedUserSearch, ex: int) -> None:
+        # Zero TTL disables caching
+        if ex:
+            await self._redis.set(
+                self._key(huid), self._codec.dumps(cached_search), ex=ex
+            )
+
+    def _key(self, huid: UUID) -> str:
+        return f"{self._key_prefix}:{huid}"
@@ -1,49 +1,94 @@
 """Service Desk repo."""
 
+import asyncio
 import itertools
+import time
 from contextlib import suppress
 from pathlib import Path
-from uuid import UUID
+from typing import Collection, Set
+from uuid import UUID, uuid4
 
 import aiofiles
 from aiofiles import os as aioos
 from pybotx import AttachmentDocument
 
+from app.caching.storage_usage_redis_repo import StorageUsageRedisRepo
+from app.logger import logger
 from app.schemas.support_request import RequestAttachment
+from app.services.decorators import async_wrap
 from app.settings import settings
 
+DELETED_DIR_SUFFIX = ".deleted"
+
+_deletion_tasks: Set["asyncio.Task[None]"] = set()
+
 
 class ServiceDeskRepo:  # noqa: WPS338
-    def __init__(self, sender_huid: UUID, attachment: AttachmentDocument | None):
+    def __init__(
+        self,
+        sender_huid: UUID,
+        attachment: AttachmentDocument | None,
+        storage_usage_repo: StorageUsageRedisRepo | None = None,
+    ):
         self._sender_huid = str(sender_huid)
         self._attachment = attachment
+        self._storage_usage_repo = storage_usage_repo
 
     async def delete_user_attachments(self) -> None:
         """Delete all user attachments by user_huid from local storage."""
 
         user_dir = settings.USERS_ATTACHMENTS_DIR.joinpath(self._sender_huid)
+        await self._delete_dir(user_dir)
 
-        with suppress(FileNotFoundError):
-            for user_path_file in user_dir.iterdir():
-                await aioos.remove(user_path_file)
-
-            await aioos.rmdir(user_dir)
+    async def delete_user_attachments_in_background(self) -> None:
+        """Detach all user attachments and delete them in background.
 
-    def add_user_attachment(
-        self, user_attachment: AttachmentDocument  # type: ignore
-    ) -> None:
-        """Add user attachment by user_huid to local storage."""
+        Directory is renamed at once, so new attachments of the user don't get
+        into it. Directories which failed to be deleted are deleted by
+        attachments cleanup job of the worker, which shares attachments volume
+        with the bot.
+        """
 
         user_dir = settings.USERS_ATTACHMENTS_DIR.joinpath(self._sender_huid)
-        user_path_attachment = user_dir.joinpath(user_attachment.filename)
+        deleted_dir = user_dir.with_name(
+            f"{user_dir.name}.{uuid4().hex}{DELETED_DIR_SUFFIX}"
+        )
+
+        try:
+            await aioos.rename(user_dir, deleted_dir)
+        except FileNotFoundError:
+            return
 
+        deletion_task = asyncio.create_task(self._delete_dir_safely(deleted_dir))
+        _deletion_tasks.add(deletion_task)
+        deletion_task.add_done_callback(_deletion_tasks.discard)
+
+    async def add_user_attachment(
+        self,
+        user_attachment: AttachmentDocument,  # type: ignore
+        attachments_names: list[str] | None = None,
+    ) -> str:
+        """Add user attachment by user_huid to local storage.
+
+        `attachments_names` is the manifest of already stored attachments (kept in
+        FSM state), it is used to resolve name collisions without filesystem probes.
+        Return name under which attachment was stored.
+        """
+
+        user_dir = settings.USERS_ATTACHMENTS_DIR.joinpath(self._sender_huid)
         user_dir.mkdir(exist_ok=True)
 
-        if user_path_attachment.exists():
-            user_path_attachment = self._get_new_attachment_name(user_path_attachment)
+        if attachments_names is None:
+            attachments_names = self.get_user_attachments_names()
+
+        attachment_name = self._get_new_attachment_name(
+            user_attachment.filename, attachments_names
+        )
+
+        async with aiofiles.open(user_dir.joinpath(attachment_name), "wb") as file_w:
+            await file_w.write(user_attachment.content)
 
-        with user_path_attachment.open("wb") as file_w:
-            file_w.write(user_attachment.content)
+        return attachment_name
 
     async def get_user_attachments(self) -> list[RequestAttachment]:
         """Return all user attachments by user_huid from local storage."""
@@ -72,19 +117,33 @@ class ServiceDeskRepo:  # noqa: WPS338
             return []
 
     def _get_new_attachment_name(  # type: ignore
-        self, user_path_attachment: Path
-    ) -> Path:
-        """Return new attachment name."""
+        self, attachment_name: str, attachments_names: list[str]
+    ) -> str:
+        """Return attachment name that doesn't collide with stored ones."""
+
+        taken_names = set(attachments_names)
+        if attachment_name not in taken_names:
+            return attachment_name
+
+        attachment_path = Path(attachment_name)
         for index in itertools.count(1):
             new_attachment_name = (
-                f"{user_path_attachment.stem} ({index}){user_path_attachment.suffix}"
-            )
-            user_path_attachment = user_path_attachment.parent.joinpath(
-                new_attachment_name
+                f"{attachment_path.stem} ({index}){attachment_path.suffix}"
             )
+            if new_attachment_name not in taken_names:
+                return new_attachment_name
+
+    async def _delete_dir(self, user_dir: Path) -> None:
+        released_size = await _delete_user_dir(user_dir)
 
-            if not user_path_attachment.exists():
-                return user_path_attachment
+        if self._storage_usage_repo is not None:
+            await self._storage_usage_repo.release(released_size)
+
+    async def _delete_dir_safely(self, user_dir: Path) -> None:
+        try:
+            await self._delete_dir(user_dir)
+        except Exception:
+            logger.exception(f"Failed to delete attachments directory {user_dir}")
 
     def _get_user_attachments_count(self) -> int:
         """Return user attachments count."""
@@ -118,3 +177,101 @@ class ServiceDeskRepo:  # noqa: WPS338
         is_valid_file_size = file_size <= settings.MAX_ATTACHMENT_SIZE
 
         return all((is_valid_total_count, is_valid_total_size, is_valid_file_size))
+
+    async def reserve_storage(self) -> bool:
+        """Reserve attachments storage for the attachment, if it isn't overloaded.
+
+        Reserved size stays counted even if attachment isn't saved after all,
+        it is corrected by attachments cleanup job.
+        """
+
+        if self._storage_usage_repo is None:
+            return True
+
+        return await self._storage_usage_repo.reserve(
+            self._attachment.size  # type: ignore
+        )
+
+
+async def wait_attachments_deletions(timeout: float) -> bool:
+    """Wait for background deletions of attachments, e.g. before shutdown.
+
+    Return False if some deletions are still in progress after `timeout`.
+    """
+
+    if not _deletion_tasks:
+        return True
+
+    _, pending_deletions = await asyncio.wait(set(_deletion_tasks), timeout=timeout)
+
+    return not pending_deletions
+
+
+async def delete_expired_attachments(
+    max_age_sec: float,
+    storage_usage_repo: StorageUsageRedisRepo | None = None,
+    users_in_progress: Collection[str] = (),
+) -> None:
+    """Delete attachments of users which directories weren't modified for a while.
+
+    Attachments of `users_in_progress` are kept whatever their age, as their
+    requests aren't sent yet. Storage usage is set to the size of attachments
+    left, so it doesn't drift because of files which weren't accounted.
+    """
+
+    stored_size = await _delete_expired_users_dirs(max_age_sec, users_in_progress)
+
+    if storage_usage_repo is not None:
+        await storage_usage_repo.set_usage(stored_size)
+
+
+@async_wrap
+def _delete_expired_users_dirs(
+    max_age_sec: float, users_in_progress: Collection[str]
+) -> int:
+    expiration_time = time.time() - max_age_sec
+    stored_size = 0
+
+    with suppress(FileNotFoundError):
+        for user_dir in settings.USERS_ATTACHMENTS_DIR.iterdir():
+            # Detached directories are left only if their deletion failed
+            is_detached = user_dir.name.endswith(DELETED_DIR_SUFFIX)
+            is_in_progress = user_dir.name in users_in_progress
+
+            # Directory could be removed by handler at the same time
+            with suppress(FileNotFoundError):
+                if is_detached or (
+                    not is_in_progress and user_dir.stat().st_mtime <= expiration_time
+                ):
+                    _delete_user_dir_sync(user_dir)
+                else:
+                    stored_size += _get_dir_size_sync(user_dir)
+
+    return stored_size
+
+
+def _get_dir_size_sync(user_dir: Path) -> int:
+    dir_size = 0
+
+    for user_path_file in user_dir.iterdir():
+        with suppress(FileNotFoundError):
+            dir_size += user_path_file.stat().st_size
+
+    return dir_size
+
+
+def _delete_user_dir_sync(user_dir: Path) -> int:
+    released_size = 0
+
+    with suppress(FileNotFoundError):
+        for user_path_file in user_dir.iterdir():
+            file_size = user_path_file.stat().st_size
+            user_path_file.unlink()
+            released_size += file_size
+
+        user_dir.rmdir()
+
+    return released_size
+
+
+_delete_user_dir = async_wrap(_delete_user_dir_sync)
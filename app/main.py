@@ -1,52 +1,202 @@
 """Application with configuration for events, routers and middleware."""
 
+import asyncio
+import signal
+import time
+from contextlib import suppress
 from functools import partial
 
 from fastapi import FastAPI
 from pybotx import Bot
-from redis import asyncio as aioredis
 
 from app.api.routers import router
-from app.bot.bot import get_bot
-from app.caching.callback_redis_repo import CallbackRedisRepo
-from app.caching.redis_repo import RedisRepo
+from app.bot.bot import build_callback_repo, get_bot, get_state_codec
+from app.caching.near_cache_redis_repo import NearCacheRedisRepo
+from app.caching.redis_client import (
+    RedisClient,
+    close_redis_clients,
+    get_redis_client,
+    is_cluster,
+)
+from app.caching.redis_repo import CompressionCodec, RedisCodecProto, RedisRepo
+from app.caching.storage_usage_redis_repo import StorageUsageRedisRepo
+from app.caching.user_search_redis_repo import UserSearchRedisRepo
 from app.db.sqlalchemy import build_db_session_factory, close_db_connections
+from app.logger import logger
 from app.resources import strings
+from app.services.background_tasks import wait_background_tasks
+from app.services.command_admission import CommandAdmission
+from app.services.user_locks import UserLocks
 from app.settings import settings
 
 
-async def startup(application: FastAPI, raise_bot_exceptions: bool) -> None:
+def build_redis_codec() -> RedisCodecProto:
+    state_codec = get_state_codec(dumps_schemas=settings.REDIS_STATE_CODEC == "schema")
+    if not settings.REDIS_COMPRESSION_THRESHOLD:
+        return state_codec
+
+    return CompressionCodec(
+        state_codec,
+        threshold=settings.REDIS_COMPRESSION_THRESHOLD,
+        level=settings.REDIS_COMPRESSION_LEVEL,
+    )
+
+
+async def build_redis_repo(redis_client: RedisClient) -> RedisRepo:
+    if not settings.REDIS_NEAR_CACHE_ENABLED:
+        return RedisRepo(
+            redis=redis_client,
+            prefix=strings.BOT_PROJECT_NAME,
+            expire=settings.FSM_STATE_TTL_SEC,
+            codec=build_redis_codec(),
+            read_legacy_keys=settings.REDIS_READ_LEGACY_KEYS,
+            expiration_notice=settings.FSM_STATE_EXPIRATION_NOTICE_SEC,
+            hash_tag_keys=is_cluster(redis_client),
+        )
+
+    near_cache_redis_repo = NearCacheRedisRepo(
+        redis=redis_client,
+        prefix=strings.BOT_PROJECT_NAME,
+        expire=settings.FSM_STATE_TTL_SEC,
+        codec=build_redis_codec(),
+        read_legacy_keys=settings.REDIS_READ_LEGACY_KEYS,
+        expiration_notice=settings.FSM_STATE_EXPIRATION_NOTICE_SEC,
+        hash_tag_keys=is_cluster(redis_client),
+        max_size=settings.REDIS_NEAR_CACHE_MAX_SIZE,
+        ttl=settings.REDIS_NEAR_CACHE_TTL_SEC,
+    )
+    await near_cache_redis_repo.start()
+
+    return near_cache_redis_repo
+
+
+async def setup_bot_state(bot: Bot, redis_client: RedisClient) -> None:
+    """Set up resources used by bot handlers in web server and worker."""
+
     # -- Database --
-    db_session_factory = await build_db_session_factory()
+    bot.state.db_session_factory = await build_db_session_factory()
 
     # -- Redis --
-    redis_client = aioredis.from_url(settings.REDIS_DSN)
-    redis_repo = RedisRepo(redis=redis_client, prefix=strings.BOT_PROJECT_NAME)
+    bot.state.redis_repo = await build_redis_repo(redis_client)
+    bot.state.storage_usage_repo = StorageUsageRedisRepo(
+        redis=redis_client,
+        high_watermark=settings.ATTACHMENTS_STORAGE_HIGH_WATERMARK,
+        low_watermark=settings.ATTACHMENTS_STORAGE_LOW_WATERMARK,
+        prefix=strings.BOT_PROJECT_NAME,
+    )
+    bot.state.user_search_repo = UserSearchRedisRepo(
+        redis=redis_client,
+        ttl=settings.CTS_USER_CACHE_TTL_SEC,
+        stale_ttl=settings.CTS_USER_CACHE_STALE_TTL_SEC,
+        negative_ttl=settings.CTS_USER_CACHE_NEGATIVE_TTL_SEC,
+        prefix=strings.BOT_PROJECT_NAME,
+    )
+    bot.state.user_locks = UserLocks(
+        redis=redis_client,
+        ttl=settings.USER_LOCK_TTL_SEC,
+        wait_timeout=settings.USER_LOCK_WAIT_TIMEOUT_SEC,
+        prefix=strings.BOT_PROJECT_NAME,
+    )
+
+
+async def teardown_bot_state(bot: Bot) -> None:
+    # -- Redis --
+    if isinstance(bot.state.redis_repo, NearCacheRedisRepo):
+        await bot.state.redis_repo.stop()
+
+    # -- Database --
+    await close_db_connections()
+
+
+async def startup(application: FastAPI, raise_bot_exceptions: bool) -> None:
+    redis_client = get_redis_client()
 
     # -- Bot --
-    callback_repo = CallbackRedisRepo(redis_client)
+    callback_repo = build_callback_repo(redis_client)
+    # Callbacks are listened before bot sends anything
+    await callback_repo.start_callbacks_waiting()
     bot = get_bot(callback_repo, raise_exceptions=raise_bot_exceptions)
 
     await bot.startup()
+    await setup_bot_state(bot, redis_client)
 
-    bot.state.db_session_factory = db_session_factory
-    bot.state.redis_repo = redis_repo
+    bot.state.command_admission = CommandAdmission(
+        max_in_flight=settings.BOTX_COMMANDS_MAX_IN_FLIGHT,
+        max_waiting=settings.BOTX_COMMANDS_MAX_WAITING,
+        wait_timeout=settings.BOTX_COMMANDS_WAIT_TIMEOUT_SEC,
+    )
 
     application.state.bot = bot
-    application.state.redis = redis_client
+
+    install_drain_on_sigterm(bot)
+
+
+def install_drain_on_sigterm(bot: Bot) -> None:
+    """Drain commands on SIGTERM while server still accepts connections.
+
+    Server stops listening as soon as it gets the signal and only then runs
+    shutdown, so BotX couldn't get 503 for new commands and callbacks for
+    commands in progress couldn't be delivered. Handler replaces the server one,
+    drains commands and then passes SIGINT to the server to shut down as usual.
+    """
+
+    bot.state.drain_task = None
+
+    try:
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, partial(_handle_sigterm, bot)
+        )
+    except (RuntimeError, NotImplementedError):
+        # Signals are handled only in main thread and not on every platform
+        logger.warning("Commands won't be drained before server stops listening")
+
+
+def start_draining(bot: Bot) -> "asyncio.Task[None]":
+    if bot.state.drain_task is None:
+        bot.state.drain_task = asyncio.create_task(drain_bot_commands(bot))
+
+    return bot.state.drain_task
+
+
+def _handle_sigterm(bot: Bot) -> None:
+    if bot.state.drain_task is not None:
+        # Repeated signal stops server without waiting for drain
+        signal.raise_signal(signal.SIGINT)
+        return
+
+    logger.info("Draining commands before shutdown")
+    start_draining(bot).add_done_callback(lambda _: signal.raise_signal(signal.SIGINT))
+
+
+async def drain_bot_commands(bot: Bot) -> None:
+    """Let commands in progress finish before shutdown, but no longer than timeout."""
+
+    drain_deadline = time.monotonic() + settings.BOTX_COMMANDS_DRAIN_TIMEOUT_SEC
+
+    command_admission: CommandAdmission = bot.state.command_admission
+    is_drained = await command_admission.drain(
+        timeout=settings.BOTX_COMMANDS_DRAIN_TIMEOUT_SEC
+    )
+
+    is_drained &= await wait_background_tasks(
+        timeout=max(drain_deadline - time.monotonic(), 0)
+    )
+
+    if not is_drained:
+        logger.warning("Shutting down before all commands were handled")
 
 
 async def shutdown(application: FastAPI) -> None:
     # -- Bot --
     bot: Bot = application.state.bot
+    await start_draining(bot)
     await bot.shutdown()
 
-    # -- Redis --
-    redis_client: aioredis.Redis = application.state.redis
-    await redis_client.close()
+    with suppress(RuntimeError, NotImplementedError):
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGTERM)
 
-    # -- Database --
-    await close_db_connections()
+    await teardown_bot_state(bot)
+    await close_redis_clients()
 
 
 def get_application(raise_bot_exceptions: bool = False) -> FastAPI:
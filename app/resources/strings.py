@@ -1,4 +1,5 @@
 """Text and templates for messages and api responses."""
+import math
 from typing import Any, Protocol, cast
 
 from mako.lookup import TemplateLookup
@@ -112,12 +113,31 @@ CONFIRM_CANCEL_MESSAGE = "".join(
     )
 )
 CANCEL_MESSAGE = "Действие отменено.\nЖелаете отправить новое обращение в адрес технической поддержки?"
+PREVIOUS_MESSAGE_IN_PROGRESS_MESSAGE = (
+    "Ваше предыдущее сообщение еще обрабатывается.\n"
+    "Пожалуйста, отправьте это сообщение повторно немного позже."
+)
 INVALID_ATTACHMENT_MESSAGE = (
     "Вы пытаетесь загрузить файл(ы) размер или количество которых превышает допустимое.\n"
     "Пожалуйста, уменьшите размер файла(ов) и загрузите снова.\n"
     "Также Вы можете нажать кнопку **«Отмена»** для отмены оформления обращения "
     "или **«Отправить обращение»** для регистрации запроса без файлов."
 )
+STORAGE_OVERLOADED_MESSAGE = (
+    "Сейчас загрузка файлов временно недоступна, пожалуйста, попробуйте позже.\n"
+    "Также Вы можете нажать кнопку **«Отмена»** для отмены оформления обращения "
+    "или **«Отправить обращение»** для регистрации запроса без файлов."
+)
+ATTACHMENTS_NOT_FOUND_MESSAGE = (
+    "Не удалось отправить обращение: прикрепленные файлы были удалены.\n"
+    "Пожалуйста, оформите обращение заново."
+)
+REQUEST_EXPIRING_MESSAGE = (
+    "Вы не завершили оформление обращения.\n"
+    "Если не продолжить его в течение "
+    f"{math.ceil(settings.FSM_STATE_EXPIRATION_NOTICE_SEC / 60)} мин., "
+    "введенные данные и файлы будут удалены."
+)
 CONFIRM_ATTACHMENT_ADDITION_MESSAGE = (
     "Хотели бы Вы прикрепить фото или медиафайл? "
     "Скриншот возникшей проблемы поможет ускорить обработку Вашего обращения."
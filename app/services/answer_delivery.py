@@ -0,0 +1,87 @@
+"""Delivery policy of bot answers."""
+
+import asyncio
+from dataclasses import dataclass, fields
+from functools import wraps
+from typing import Callable, Set, TypeVar
+from uuid import UUID
+
+from pybotx import Bot, CallbackNotReceivedError, OutgoingMessage
+from pybotx.bot.exceptions import BotShuttingDownError
+
+from app.logger import logger
+
+BuilderT = TypeVar("BuilderT", bound=Callable[..., OutgoingMessage])
+
+_delivery_checks: Set["asyncio.Task[None]"] = set()
+
+
+@dataclass
+class FireAndForgetMessage(OutgoingMessage):
+    """Message which delivery isn't waited by handler."""
+
+
+def fire_and_forget(builder: BuilderT) -> BuilderT:
+    """Mark messages built by `builder` as not worth waiting for delivery.
+
+    Suits prompts and hints, which are sent again on the next user message.
+    """
+
+    @wraps(builder)
+    def build(*args, **kwargs):  # type: ignore  # noqa: WPS430
+        outgoing_message = builder(*args, **kwargs)
+
+        return FireAndForgetMessage(
+            **{
+                message_field.name: getattr(outgoing_message, message_field.name)
+                for message_field in fields(outgoing_message)
+            }
+        )
+
+    return build  # type: ignore
+
+
+async def send_answer(bot: Bot, message: OutgoingMessage) -> None:
+    """Send message, waiting for its delivery unless it's fire-and-forget."""
+
+    if not isinstance(message, FireAndForgetMessage):
+        await bot.send(message=message)
+        return
+
+    sync_id = await bot.send(message=message, wait_callback=False)
+
+    # Loop keeps only weak references to tasks
+    delivery_check = asyncio.create_task(_check_delivery(bot, sync_id))
+    _delivery_checks.add(delivery_check)
+    delivery_check.add_done_callback(_delivery_checks.discard)
+
+
+async def wait_delivery_checks(timeout: float) -> bool:
+    """Wait for delivery checks in progress, e.g. before shutdown.
+
+    Return False if some checks are still waiting for callbacks after `timeout`.
+    """
+
+    if not _delivery_checks:
+        return True
+
+    _, pending_checks = await asyncio.wait(set(_delivery_checks), timeout=timeout)
+
+    return not pending_checks
+
+
+async def _check_delivery(bot: Bot, sync_id: UUID) -> None:
+    try:
+        callback = await bot.wait_botx_method_callback(sync_id)
+    except (CallbackNotReceivedError, BotShuttingDownError):
+        logger.warning(f"Delivery of message `{sync_id}` wasn't confirmed")
+        return
+    except Exception:
+        logger.exception(f"Failed to check delivery of message `{sync_id}`")
+        return
+
+    if callback.status == "error":
+        logger.error(
+            f"Message `{sync_id}` wasn't delivered: "
+            f"{callback.reason} {callback.errors} {callback.error_data}"
+        )
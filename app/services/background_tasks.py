@@ -0,0 +1,24 @@
+"""Waiting for tasks which handlers leave running in background."""
+
+import asyncio
+
+from app.db.repositories.service_desk import wait_attachments_deletions
+from app.services.answer_delivery import wait_delivery_checks
+from app.services.botx_user_search import wait_user_searches
+
+
+async def wait_background_tasks(timeout: float) -> bool:
+    """Wait for background tasks of handlers, e.g. before shutdown.
+
+    Handlers don't wait for delivery of fire-and-forget messages, deletion of
+    sent attachments and prefetch of users. Return False if some tasks are still
+    in progress after `timeout`.
+    """
+
+    are_waited = await asyncio.gather(
+        wait_delivery_checks(timeout=timeout),
+        wait_attachments_deletions(timeout=timeout),
+        wait_user_searches(timeout=timeout),
+    )
+
+    return all(are_waited)
@@ -0,0 +1,52 @@
+"""Processing of BotX commands out of web server."""
+
+from typing import Any, Dict, Mapping, Optional
+
+from pybotx import Bot, UnknownBotAccountError
+from pybotx.logger import log_incoming_request
+from pybotx.models.commands import BotAPICommand, BotCommand
+from pydantic import ValidationError, parse_obj_as
+
+
+def validate_raw_bot_command(
+    bot: Bot,
+    raw_bot_command: Dict[str, Any],
+    verify_request: bool,
+    request_headers: Optional[Mapping[str, str]] = None,
+) -> BotCommand:
+    """Validate command like `Bot.async_execute_raw_bot_command`, but don't run it.
+
+    Raises the same errors, so they are handled the same way.
+    """
+
+    log_incoming_request(raw_bot_command, message="Got command: ")
+
+    # pybotx has no public verification without execution, so its version is
+    # pinned and tests check the private API
+    if verify_request:
+        bot._verify_request(request_headers)  # noqa: WPS437
+
+    try:
+        bot_api_command: BotAPICommand = parse_obj_as(
+            # Same ignore as in pybotx
+            BotAPICommand,  # type: ignore[arg-type]
+            raw_bot_command,
+        )
+    except ValidationError as validation_exc:
+        raise ValueError("Bot command validation error") from validation_exc
+
+    bot_command = bot_api_command.to_domain(raw_bot_command)
+
+    if not any(
+        bot_account.id == bot_command.bot.id for bot_account in bot.bot_accounts
+    ):
+        raise UnknownBotAccountError(bot_command.bot.id)
+
+    return bot_command
+
+
+async def execute_raw_bot_command(bot: Bot, raw_bot_command: Dict[str, Any]) -> None:
+    """Execute command validated before enqueuing and wait for its handler."""
+
+    bot_command = validate_raw_bot_command(bot, raw_bot_command, verify_request=False)
+    await bot.async_execute_bot_command(bot_command)
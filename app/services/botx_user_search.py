@@ -1,6 +1,8 @@
 """Module for user searching on cts."""
 
-from typing import Optional, Tuple
+import asyncio
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
 from pybotx import (
@@ -11,28 +13,235 @@ from pybotx import (
     UserNotFoundError,
 )
 
+from app.caching.user_search_redis_repo import CachedUserSearch, UserSearchRedisRepo
+from app.logger import logger
+from app.settings import settings
+
+SearchResult = Optional[Tuple[UserFromSearch, BotAccountWithSecret]]
+
+# Searches in progress are shared by all their callers
+_search_tasks: Dict[UUID, "asyncio.Task[SearchResult]"] = {}
+
 
 class UserIsBotError(Exception):
     """Error for raising when found user is bot."""
 
 
+async def search_user_with_cache(
+    bot: Bot,
+    huid: UUID,
+    user_search_repo: UserSearchRedisRepo,
+    origin_bot_id: Optional[UUID] = None,
+) -> SearchResult:
+    """Search user like `search_user_on_each_cts`, but through cache.
+
+    Stale user is returned at once and refreshed in background. If user is
+    already being searched, e.g. by prefetch, that search is awaited.
+    """
+
+    cached_search = await user_search_repo.get(huid)
+    if cached_search is None:
+        return await asyncio.shield(
+            _get_search_task(bot, huid, user_search_repo, origin_bot_id)
+        )
+
+    if cached_search.is_bot:
+        raise UserIsBotError
+
+    if cached_search.user is None:
+        return None
+
+    bot_account = _find_bot_account(bot, cached_search)
+    if bot_account is None:
+        return await asyncio.shield(
+            _get_search_task(bot, huid, user_search_repo, origin_bot_id)
+        )
+
+    if cached_search.is_stale:
+        _get_search_task(bot, huid, user_search_repo, origin_bot_id)
+
+    return cached_search.user, bot_account
+
+
+async def prefetch_user(
+    bot: Bot,
+    huid: UUID,
+    user_search_repo: UserSearchRedisRepo,
+    origin_bot_id: Optional[UUID] = None,
+) -> None:
+    """Start searching user in background unless the user is already cached.
+
+    Search result is cached, so it's ready by the time the user is needed.
+    """
+
+    cached_search = await user_search_repo.get(huid)
+    if cached_search is None or cached_search.is_stale:
+        _get_search_task(bot, huid, user_search_repo, origin_bot_id)
+
+
 async def search_user_on_each_cts(
-    bot: Bot, huid: UUID
-) -> Optional[Tuple[UserFromSearch, BotAccountWithSecret]]:
+    bot: Bot, huid: UUID, origin_bot_id: Optional[UUID] = None
+) -> SearchResult:
     """Search user by huid on all cts on which bot is registered.
 
+    Cts of `origin_bot_id`, which the user came from, is requested first, so
+    one request is usually enough. On a miss other cts are requested
+    concurrently, the first found user is returned and other requests are
+    cancelled. Cts which failed or didn't answer in time are skipped, their
+    error is raised only if user isn't found on other cts.
+
     return type: tuple of UserFromSearch instance and host.
     """
 
+    origin_accounts = []
+    other_accounts = []
     for bot_account in bot.bot_accounts:
-        try:
-            user = await bot.search_user_by_huid(bot_id=bot_account.id, huid=huid)
-        except UserNotFoundError:
-            continue
+        if bot_account.id == origin_bot_id:
+            origin_accounts.append(bot_account)
+        else:
+            other_accounts.append(bot_account)
+
+    search_errors: List[Exception] = []
+    for bot_accounts in (origin_accounts, other_accounts):
+        search_result = await _search_user_concurrently(
+            bot, bot_accounts, huid, search_errors
+        )
+        if search_result is not None:
+            return search_result
+
+    if search_errors:
+        raise search_errors[0]
+
+    return None
+
+
+async def _search_user_concurrently(
+    bot: Bot,
+    bot_accounts: List[BotAccountWithSecret],
+    huid: UUID,
+    search_errors: List[Exception],
+) -> SearchResult:
+    search_tasks: Dict["asyncio.Task[UserFromSearch]", BotAccountWithSecret] = {
+        asyncio.create_task(_search_user(bot, bot_account, huid)): bot_account
+        for bot_account in bot_accounts
+    }
+
+    try:
+        pending_tasks = set(search_tasks)
+        while pending_tasks:
+            done_tasks, pending_tasks = await asyncio.wait(
+                pending_tasks, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            # Tasks completed together are checked in configured order
+            for search_task, bot_account in search_tasks.items():
+                if search_task not in done_tasks:
+                    continue
+
+                try:
+                    user = search_task.result()
+                except UserNotFoundError:
+                    continue
+                except Exception as exc:
+                    logger.warning(f"Failed to search user on {bot_account.host}")
+                    search_errors.append(exc)
+                    continue
 
-        if user.user_kind == UserKinds.BOT:
-            raise UserIsBotError
+                if user.user_kind == UserKinds.BOT:
+                    raise UserIsBotError
 
-        return user, bot_account
+                return user, bot_account
+    finally:
+        for search_task in search_tasks:
+            search_task.cancel()
+
+        await asyncio.gather(*search_tasks, return_exceptions=True)
+
+    return None
+
+
+async def _search_user(
+    bot: Bot, bot_account: BotAccountWithSecret, huid: UUID
+) -> UserFromSearch:
+    return await asyncio.wait_for(
+        bot.search_user_by_huid(bot_id=bot_account.id, huid=huid),
+        timeout=settings.CTS_USER_SEARCH_TIMEOUT_SEC,
+    )
+
+
+async def _search_and_cache(
+    bot: Bot,
+    huid: UUID,
+    user_search_repo: UserSearchRedisRepo,
+    origin_bot_id: Optional[UUID],
+) -> SearchResult:
+    try:
+        search_result = await search_user_on_each_cts(bot, huid, origin_bot_id)
+    except UserIsBotError:
+        await user_search_repo.set_bot(huid)
+        raise
+
+    if search_result is None:
+        await user_search_repo.set_not_found(huid)
+    else:
+        user, bot_account = search_result
+        await user_search_repo.set_found(user, bot_account.id)
+
+    return search_result
+
+
+def _get_search_task(
+    bot: Bot,
+    huid: UUID,
+    user_search_repo: UserSearchRedisRepo,
+    origin_bot_id: Optional[UUID],
+) -> "asyncio.Task[SearchResult]":
+    search_task = _search_tasks.get(huid)
+
+    if search_task is None:
+        search_task = asyncio.create_task(
+            _search_and_cache(bot, huid, user_search_repo, origin_bot_id)
+        )
+        search_task.add_done_callback(partial(_forget_search_task, huid))
+        _search_tasks[huid] = search_task
+
+    return search_task
+
+
+async def wait_user_searches(timeout: float) -> bool:
+    """Wait for user searches in progress, e.g. before shutdown.
+
+    Return False if some searches are still in progress after `timeout`.
+    """
+
+    if not _search_tasks:
+        return True
+
+    _, pending_searches = await asyncio.wait(
+        set(_search_tasks.values()), timeout=timeout
+    )
+
+    return not pending_searches
+
+
+def _forget_search_task(huid: UUID, search_task: "asyncio.Task[SearchResult]") -> None:
+    _search_tasks.pop(huid, None)
+
+    # Background searches have no callers to get their errors
+    if search_task.cancelled():
+        return
+
+    search_error = search_task.exception()
+    if search_error is not None and not isinstance(search_error, UserIsBotError):
+        logger.warning(f"Failed to search user {huid}: {search_error!r}")
+
+
+def _find_bot_account(
+    bot: Bot, cached_search: CachedUserSearch
+) -> Optional[BotAccountWithSecret]:
+    # Bot account could be removed from configuration since user was cached
+    for bot_account in bot.bot_accounts:
+        if bot_account.id == cached_search.bot_id:
+            return bot_account
 
     return None
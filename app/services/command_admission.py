@@ -0,0 +1,103 @@
+"""Admission control for BotX commands handled by the process."""
+
+import asyncio
+from typing import Any, Dict
+
+
+class CommandAdmission:
+    """Limit of commands handled concurrently by the process.
+
+    Commands over `max_in_flight` wait for a free slot for `wait_timeout`, but
+    no more than `max_waiting` of them, others are rejected at once. Zero
+    `max_in_flight` disables the limit. All commands are rejected while the
+    process drains before shutdown.
+    """
+
+    def __init__(
+        self, max_in_flight: int, max_waiting: int, wait_timeout: float
+    ) -> None:
+        self._max_in_flight = max_in_flight
+        self._max_waiting = max_waiting
+        self._wait_timeout = wait_timeout
+
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._in_flight = 0
+        self._waiting = 0
+        self._rejected = 0
+
+        self._is_draining = False
+        self._no_in_flight = asyncio.Event()
+        self._no_in_flight.set()
+
+    async def acquire(self) -> bool:
+        """Take slot for command, return False if command should be rejected."""
+
+        if self._is_draining:
+            self._rejected += 1
+            return False
+
+        if not self._max_in_flight:
+            self._take_slot()
+            return True
+
+        if self._slots.locked() and self._waiting >= self._max_waiting:
+            self._rejected += 1
+            return False
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self._wait_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            return False
+        finally:
+            self._waiting -= 1
+
+        # Slot could be released to waiting command after draining started
+        if self._is_draining:
+            self._slots.release()
+            self._rejected += 1
+            return False
+
+        self._take_slot()
+        return True
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        if not self._in_flight:
+            self._no_in_flight.set()
+
+        if self._max_in_flight:
+            self._slots.release()
+
+    async def drain(self, timeout: float) -> bool:
+        """Stop admitting commands and wait for admitted ones to finish.
+
+        Return False if some commands are still in flight after `timeout`.
+        """
+
+        self._is_draining = True
+
+        try:
+            await asyncio.wait_for(self._no_in_flight.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        return True
+
+    @property
+    def is_draining(self) -> bool:
+        return self._is_draining
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "rejected": self._rejected,
+            "max_in_flight": self._max_in_flight,
+        }
+
+    def _take_slot(self) -> None:
+        self._in_flight += 1
+        self._no_in_flight.clear()
@@ -0,0 +1,184 @@
+"""Handling of expired FSM states through redis keyspace notifications."""
+
+import asyncio
+from typing import List, Set
+from uuid import UUID
+
+from pybotx import Bot
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from app.bot.answers.messages.support_request import build_request_expiring_message
+from app.caching.redis_client import RedisClient, get_primary_clients
+from app.caching.redis_repo import EXPIRATION_NOTICE_SUFFIX, KEY_DELIMITER
+from app.caching.storage_usage_redis_repo import StorageUsageRedisRepo
+from app.db.repositories.service_desk import ServiceDeskRepo
+from app.logger import logger
+from app.services.user_locks import UserLocks, UserLockTimeoutError
+
+NOTIFY_KEYSPACE_EVENTS = "notify-keyspace-events"
+EXPIRED_EVENTS_FLAGS = "Ex"
+EXPIRED_EVENTS_CHANNEL_TEMPLATE = "__keyevent@{db}__:expired"
+
+# Expiration is handled by one of the workers
+HANDLED_KEY_TTL_SEC = 60
+STATE_KEYS_SCAN_COUNT = 1000
+RESUBSCRIBE_DELAY_SEC = 1
+
+
+class FSMExpirationListener:
+    """Listener of FSM keys expiration.
+
+    User is notified when expiration notice key of the user state expires, and
+    user attachments are removed when the state itself expires. Expiration is
+    handled under user lock, so it doesn't race with messages of the user.
+    Notifications are delivered only to connected clients, so attachments missed
+    here are removed by attachments cleanup job. In redis cluster each primary
+    node notifies about its own keys, so all of them are listened.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        redis: RedisClient,
+        storage_usage_repo: StorageUsageRedisRepo,
+        user_locks: UserLocks,
+        prefix: str,
+    ) -> None:
+        self._bot = bot
+        self._redis = redis
+        self._storage_usage_repo = storage_usage_repo
+        self._user_locks = user_locks
+        self._prefix = prefix
+        self._fsm_keys_prefix = f"{prefix}{KEY_DELIMITER}fsm{KEY_DELIMITER}"
+        self._listener_tasks: List["asyncio.Task[None]"] = []
+
+    async def start(self) -> None:
+        for node_redis in await get_primary_clients(self._redis):
+            await self._enable_expired_events(node_redis)
+            self._listener_tasks.append(
+                asyncio.create_task(self._listen_expired_keys(node_redis))
+            )
+
+    async def stop(self) -> None:
+        for listener_task in self._listener_tasks:
+            listener_task.cancel()
+
+        await asyncio.gather(*self._listener_tasks, return_exceptions=True)
+        self._listener_tasks = []
+
+    async def get_users_with_state(self) -> Set[str]:
+        """Return huids of users which have FSM state, e.g. request in progress."""
+
+        users_huids = set()
+        # Keys could be wrapped into hash tags, so they are filtered after scan
+        keys_pattern = f"{self._prefix}{KEY_DELIMITER}*fsm{KEY_DELIMITER}*"
+
+        for node_redis in await get_primary_clients(self._redis):
+            async for raw_key in node_redis.scan_iter(
+                match=keys_pattern, count=STATE_KEYS_SCAN_COUNT
+            ):
+                redis_key = _to_str(raw_key).replace("{", "").replace("}", "")
+                if redis_key.startswith(self._fsm_keys_prefix):
+                    redis_key = redis_key.removesuffix(EXPIRATION_NOTICE_SUFFIX)
+                    users_huids.add(redis_key.rsplit(KEY_DELIMITER, 1)[-1])
+
+        return users_huids
+
+    async def handle_expired_key(self, expired_key: str) -> None:
+        # Hash tags are added to keys in redis cluster
+        redis_key = expired_key.replace("{", "").replace("}", "")
+        if not redis_key.startswith(self._fsm_keys_prefix):
+            return
+
+        is_acquired = await self._redis.set(
+            f"{self._prefix}{KEY_DELIMITER}fsm-expiration-handled{KEY_DELIMITER}"
+            + redis_key,
+            1,
+            nx=True,
+            ex=HANDLED_KEY_TTL_SEC,
+        )
+        if not is_acquired:
+            return
+
+        is_notice = redis_key.endswith(EXPIRATION_NOTICE_SUFFIX)
+        if is_notice:
+            redis_key = redis_key[: -len(EXPIRATION_NOTICE_SUFFIX)]
+
+        # Host could contain port, so key is parsed from the end
+        _, bot_id, chat_id, user_huid = redis_key.rsplit(KEY_DELIMITER, 3)
+
+        try:
+            async with self._user_locks.lock(UUID(user_huid)):
+                if is_notice:
+                    await self._notify_user(UUID(bot_id), UUID(chat_id))
+                else:
+                    await self._delete_user_attachments(UUID(user_huid), expired_key)
+        except UserLockTimeoutError:
+            # Attachments left here are removed by attachments cleanup job
+            logger.warning(f"User of `{redis_key}` is busy, expiration is skipped")
+
+    async def _notify_user(self, bot_id: UUID, chat_id: UUID) -> None:
+        await self._bot.send(
+            message=build_request_expiring_message(bot_id=bot_id, chat_id=chat_id),
+            wait_callback=False,
+        )
+
+    async def _delete_user_attachments(self, user_huid: UUID, state_key: str) -> None:
+        # User could start new request while expiration was waiting for the lock
+        if await self._redis.exists(state_key):
+            return
+
+        await ServiceDeskRepo(
+            sender_huid=user_huid,
+            attachment=None,
+            storage_usage_repo=self._storage_usage_repo,
+        ).delete_user_attachments()
+
+    async def _enable_expired_events(self, node_redis: aioredis.Redis) -> None:
+        try:
+            config = await node_redis.config_get(NOTIFY_KEYSPACE_EVENTS)
+            flags = _to_str(next(iter(config.values()), ""))
+
+            if "E" not in flags or not {"x", "A"} & set(flags):
+                await node_redis.config_set(
+                    NOTIFY_KEYSPACE_EVENTS, flags + EXPIRED_EVENTS_FLAGS
+                )
+        except ResponseError:
+            logger.warning(
+                "Can't enable keyspace notifications, "
+                f"set `{NOTIFY_KEYSPACE_EVENTS} {EXPIRED_EVENTS_FLAGS}` "
+                "in redis config"
+            )
+
+    async def _listen_expired_keys(self, node_redis: aioredis.Redis) -> None:
+        db = node_redis.connection_pool.connection_kwargs.get("db", 0)
+        channel = EXPIRED_EVENTS_CHANNEL_TEMPLATE.format(db=db)
+
+        while True:  # noqa: WPS457
+            pubsub = node_redis.pubsub()
+            try:
+                await pubsub.subscribe(channel)
+
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        await self._handle_expired_key_safely(_to_str(message["data"]))
+            except Exception:
+                logger.exception("FSM expiration listener failed")
+            finally:
+                await pubsub.reset()
+
+            await asyncio.sleep(RESUBSCRIBE_DELAY_SEC)
+
+    async def _handle_expired_key_safely(self, redis_key: str) -> None:
+        try:
+            await self.handle_expired_key(redis_key)
+        except Exception:
+            logger.exception(f"Failed to handle expiration of `{redis_key}`")
+
+
+def _to_str(raw_value: bytes | str) -> str:
+    if isinstance(raw_value, bytes):
+        return raw_value.decode()
+
+    return raw_value
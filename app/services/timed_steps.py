@@ -0,0 +1,49 @@
+"""Concurrent steps of command handling with timings."""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, List, TypeVar
+
+from app.logger import logger
+
+T = TypeVar("T")  # noqa: WPS111
+
+
+async def gather_cancelling(*awaitables: Awaitable[Any]) -> List[Any]:
+    """Run awaitables concurrently, cancelling the rest when one of them fails."""
+
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class TimedSteps:
+    """Timings of steps, which are logged together to find the slowest one."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._started_at = time.perf_counter()
+        self._timings: Dict[str, float] = {}
+
+    async def run(self, step_name: str, awaitable: Awaitable[T]) -> T:
+        step_started_at = time.perf_counter()
+
+        try:
+            return await awaitable
+        finally:
+            self._timings[step_name] = time.perf_counter() - step_started_at
+
+    def log_timings(self) -> None:
+        total_time = time.perf_counter() - self._started_at
+        steps_timings = ", ".join(
+            f"{step_name}={step_time:.3f}s"
+            for step_name, step_time in self._timings.items()
+        )
+
+        logger.info(f"{self._name} took {total_time:.3f}s: {steps_timings}")
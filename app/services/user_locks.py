@@ -0,0 +1,122 @@
+"""Locks serializing handling of messages from the same user."""
+
+import asyncio
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Dict, Optional
+from uuid import UUID
+
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError, RedisError
+
+from app.caching.redis_client import RedisClient
+from app.logger import logger
+
+
+class UserLockTimeoutError(Exception):
+    """Error for raising when user lock isn't acquired in time."""
+
+
+class UserLocks:
+    """Per-user locks, so messages of one user are handled one by one.
+
+    Messages handled by the process wait for in-process lock in order of arrival.
+    Then redis lock is acquired to exclude messages of the same user handled by
+    other processes. Both locks are waited for `wait_timeout` in total. Redis
+    lock expires after `ttl` if its holder dies, holder keeps prolonging it.
+    """
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        ttl: float,
+        wait_timeout: float,
+        prefix: Optional[str] = None,
+    ) -> None:
+        self._redis = redis
+        self._ttl = ttl
+        self._wait_timeout = wait_timeout
+        self._key_prefix = f"{prefix}:user_lock" if prefix else "user_lock"
+
+        self._local_locks: Dict[UUID, asyncio.Lock] = {}
+        self._local_lock_users: Counter[UUID] = Counter()
+
+    @asynccontextmanager
+    async def lock(self, huid: UUID) -> AsyncIterator[None]:
+        wait_deadline = time.monotonic() + self._wait_timeout
+
+        async with self._lock_locally(huid, wait_deadline):
+            async with self._lock_in_redis(huid, wait_deadline):
+                yield
+
+    @asynccontextmanager
+    async def _lock_locally(
+        self, huid: UUID, wait_deadline: float
+    ) -> AsyncIterator[None]:
+        local_lock = self._local_locks.setdefault(huid, asyncio.Lock())
+        self._local_lock_users[huid] += 1
+
+        try:
+            try:
+                await asyncio.wait_for(
+                    local_lock.acquire(), timeout=_get_remaining_time(wait_deadline)
+                )
+            except asyncio.TimeoutError as exc:
+                raise UserLockTimeoutError from exc
+
+            try:
+                yield
+            finally:
+                local_lock.release()
+        finally:
+            # Locks of users without messages in progress aren't kept
+            self._local_lock_users[huid] -= 1
+            if not self._local_lock_users[huid]:
+                del self._local_lock_users[huid]  # noqa: WPS420
+                del self._local_locks[huid]  # noqa: WPS420
+
+    @asynccontextmanager
+    async def _lock_in_redis(
+        self, huid: UUID, wait_deadline: float
+    ) -> AsyncIterator[None]:
+        redis_lock = self._redis.lock(
+            f"{self._key_prefix}:{huid}",
+            timeout=self._ttl,
+            sleep=0.05,
+            blocking_timeout=_get_remaining_time(wait_deadline),
+        )
+        if not await redis_lock.acquire():
+            raise UserLockTimeoutError
+
+        prolongation = asyncio.create_task(self._prolong(redis_lock))
+        try:
+            yield
+        finally:
+            prolongation.cancel()
+            with suppress(asyncio.CancelledError):
+                await prolongation
+
+            try:
+                await redis_lock.release()
+            except LockError:
+                logger.warning(f"User lock {huid} expired before release")
+            except RedisError:
+                # Lock will expire by itself
+                logger.warning(f"Failed to release user lock {huid}")
+
+    async def _prolong(self, redis_lock: Lock) -> None:
+        while True:  # noqa: WPS457
+            await asyncio.sleep(self._ttl / 3)
+
+            try:
+                await redis_lock.reacquire()
+            except LockError:
+                logger.warning(f"User lock {redis_lock.name} was lost")
+                return
+            except RedisError:
+                logger.warning(f"Failed to prolong user lock {redis_lock.name}")
+
+
+def _get_remaining_time(deadline: float) -> float:
+    return max(deadline - time.monotonic(), 0)
@@ -39,7 +39,77 @@ class AppSettings(BaseSettings):  # noqa: WPS338
     SQL_DEBUG: bool = False
 
     # redis:
+    # `redis+sentinel://` and `redis+cluster://` DSNs are supported too
     REDIS_DSN: str
+    # tasks queue doesn't support redis cluster, so it can use another redis
+    REDIS_QUEUE_DSN: str | None = None
+    # connections of each pool are unlimited by default. Listeners hold their
+    # connections all the time, so the limit must leave room for them: BotX
+    # callbacks (pub/sub or stream read) and near cache invalidations take one
+    # connection each, worker takes one more for FSM expiration events and one
+    # for each job slot waiting for the tasks queue (WORKER_CONCURRENCY), which
+    # shares the pool unless REDIS_QUEUE_DSN is set
+    REDIS_MAX_CONNECTIONS: int | None = None
+    # time to wait for free connection of limited pool, redis cluster doesn't
+    # wait and fails at once
+    REDIS_POOL_TIMEOUT_SEC: float | None = 5
+    # blocking reads (pub/sub, tasks queue) are limited by socket timeout too
+    REDIS_SOCKET_TIMEOUT_SEC: float | None = None
+    REDIS_SOCKET_CONNECT_TIMEOUT_SEC: float | None = 5
+    REDIS_HEALTH_CHECK_INTERVAL_SEC: int = 30
+    # read FSM states stored with md5 hashed keys by previous versions, every
+    # miss costs one more read, so it's enabled only after upgrade until old
+    # states expire (FSM_STATE_TTL_SEC)
+    REDIS_READ_LEGACY_KEYS: bool = False
+    # in-process cache for FSM states
+    REDIS_NEAR_CACHE_ENABLED: bool = False
+    REDIS_NEAR_CACHE_MAX_SIZE: int = 10000
+    REDIS_NEAR_CACHE_TTL_SEC: float = 10
+    # FSM states are stored with pickle, schema codec (tagged JSON) survives
+    # moving state classes, but is 2-4 times slower; states stored with either
+    # codec are read whatever is chosen
+    REDIS_STATE_CODEC: Literal["pickle", "schema"] = "pickle"
+    # FSM states larger than threshold are compressed with zlib, 0 disables it
+    REDIS_COMPRESSION_THRESHOLD: int = 1024
+    REDIS_COMPRESSION_LEVEL: int = 6
+    # stream keeps BotX callbacks for retention, so callbacks published while
+    # listener reconnects aren't lost, all processes must use the same delivery
+    BOTX_CALLBACKS_DELIVERY: Literal["pubsub", "stream"] = "pubsub"
+    BOTX_CALLBACKS_RETENTION_SEC: float = 60
+    # web server only validates commands and enqueues them, worker handles them
+    BOTX_COMMANDS_QUEUE_ENABLED: bool = False
+    # commands over the limit wait for a free slot a bit, then are rejected
+    # with 503 to let BotX retry them, zero disables the limit
+    BOTX_COMMANDS_MAX_IN_FLIGHT: int = 200
+    BOTX_COMMANDS_MAX_WAITING: int = 100
+    BOTX_COMMANDS_WAIT_TIMEOUT_SEC: float = 1
+    BOTX_COMMANDS_RETRY_AFTER_SEC: int = 5
+    # on shutdown new commands are rejected and handlers in progress and
+    # delivery callbacks are waited for this time
+    BOTX_COMMANDS_DRAIN_TIMEOUT_SEC: float = 25
+
+    # cts:
+    # user is searched on all cts concurrently, slow cts are skipped by timeout
+    CTS_USER_SEARCH_TIMEOUT_SEC: float = 10
+    # found users are cached, stale ones are returned while being refreshed,
+    # zero TTLs disable caching
+    CTS_USER_CACHE_TTL_SEC: int = 60 * 60
+    CTS_USER_CACHE_STALE_TTL_SEC: int = 7 * 24 * 60 * 60
+    # users which weren't found or are bots
+    CTS_USER_CACHE_NEGATIVE_TTL_SEC: int = 60
+
+    # fsm:
+    # messages of one user are handled one by one across all processes,
+    # lock of died process expires after TTL
+    USER_LOCK_TTL_SEC: float = 30
+    # total wait for in-process and redis locks, it's shorter than
+    # BOTX_COMMANDS_DRAIN_TIMEOUT_SEC, so waiting commands don't hold shutdown
+    # and admission slots
+    USER_LOCK_WAIT_TIMEOUT_SEC: float = 20
+    # abandoned requests expire, TTL is refreshed on every state change
+    FSM_STATE_TTL_SEC: int = 24 * 60 * 60
+    # user is notified this time before the request expires
+    FSM_STATE_EXPIRATION_NOTICE_SEC: int = 60 * 60
 
     # healthcheck:
     WORKER_TIMEOUT_SEC: float = 4
@@ -52,6 +122,11 @@ class AppSettings(BaseSettings):  # noqa: WPS338
 
     # storage:
     USERS_ATTACHMENTS_DIR = Path("./attachments")
+    ATTACHMENTS_STORAGE_HIGH_WATERMARK: ByteSize = "5GiB"  # type: ignore
+    ATTACHMENTS_STORAGE_LOW_WATERMARK: ByteSize = "4GiB"  # type: ignore
+    # attachments of abandoned requests are removed by worker
+    ATTACHMENTS_TTL_SEC: int = 24 * 60 * 60
+    ATTACHMENTS_OVERLOADED_TTL_SEC: int = 60 * 60
 
     # templates:
     SHOW_SENDER_NAME_IN_EMAIL_TITLE: bool | None = True
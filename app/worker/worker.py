@@ -1,37 +1,101 @@
 """Tasks worker configuration."""
 
-from typing import Any, Dict, Literal
+import asyncio
+import time
+from typing import Any, Dict, Literal, Set
 
 from pybotx import Bot
-from redis import asyncio as aioredis
-from saq import Queue
+from saq import CronJob, Queue
 
-from app.caching.callback_redis_repo import CallbackRedisRepo
+from app.caching.redis_client import get_redis_client, is_cluster
+from app.caching.storage_usage_redis_repo import StorageUsageRedisRepo
+from app.db.repositories.service_desk import delete_expired_attachments
 from app.logger import logger
+from app.resources import strings
+from app.services.background_tasks import wait_background_tasks
+from app.services.bot_commands import execute_raw_bot_command
+from app.services.fsm_expiration import FSMExpirationListener
+from app.services.user_locks import UserLocks
 
 # `saq` import its own settings and hides our module
 from app.settings import settings as app_settings
 
 SaqCtx = Dict[str, Any]
 
+# Sending support request could take long with big attachments
+BOT_COMMAND_JOB_TIMEOUT_SEC = 10 * 60
+# Jobs cancelled on shutdown are retried by saq, retry mustn't repeat command
+HANDLED_BOT_COMMAND_TTL_SEC = 60 * 60
+
+QUEUE_NAME = "service-desk-bot"
+# Each job slot holds redis connection while waiting for the tasks queue
+WORKER_CONCURRENCY = 8
+
+_queues: Dict[str, Queue] = {}
+
 
 async def startup(ctx: SaqCtx) -> None:
-    from app.bot.bot import get_bot  # noqa: WPS433
+    from app.bot.bot import build_callback_repo, get_bot  # noqa: WPS433
 
-    callback_repo = CallbackRedisRepo(aioredis.from_url(app_settings.REDIS_DSN))
+    redis_client = get_redis_client()
+    callback_repo = build_callback_repo(redis_client)
+    # Callbacks are listened before bot sends anything
+    await callback_repo.start_callbacks_waiting()
     bot = get_bot(callback_repo, raise_exceptions=False)
 
     await bot.startup(fetch_tokens=False)
 
+    if app_settings.BOTX_COMMANDS_QUEUE_ENABLED:
+        from app.main import setup_bot_state  # noqa: WPS433
+
+        await setup_bot_state(bot, redis_client)
+        user_locks = bot.state.user_locks
+    else:
+        user_locks = UserLocks(
+            redis=redis_client,
+            ttl=app_settings.USER_LOCK_TTL_SEC,
+            wait_timeout=app_settings.USER_LOCK_WAIT_TIMEOUT_SEC,
+            prefix=strings.BOT_PROJECT_NAME,
+        )
+
+    storage_usage_repo = StorageUsageRedisRepo(
+        redis=redis_client,
+        high_watermark=app_settings.ATTACHMENTS_STORAGE_HIGH_WATERMARK,
+        low_watermark=app_settings.ATTACHMENTS_STORAGE_LOW_WATERMARK,
+        prefix=strings.BOT_PROJECT_NAME,
+    )
+    fsm_expiration_listener = FSMExpirationListener(
+        bot=bot,
+        redis=redis_client,
+        storage_usage_repo=storage_usage_repo,
+        user_locks=user_locks,
+        prefix=strings.BOT_PROJECT_NAME,
+    )
+    await fsm_expiration_listener.start()
+
     ctx["bot"] = bot
+    ctx["bot_command_tasks"] = set()
+    ctx["storage_usage_repo"] = storage_usage_repo
+    ctx["fsm_expiration_listener"] = fsm_expiration_listener
 
     logger.info("Worker started")
 
 
 async def shutdown(ctx: SaqCtx) -> None:
+    # saq cancels running jobs only after shutdown, so they are waited here
+    await drain_bot_commands(ctx, timeout=app_settings.BOTX_COMMANDS_DRAIN_TIMEOUT_SEC)
+
+    fsm_expiration_listener: FSMExpirationListener = ctx["fsm_expiration_listener"]
+    await fsm_expiration_listener.stop()
+
     bot: Bot = ctx["bot"]
     await bot.shutdown()
 
+    if app_settings.BOTX_COMMANDS_QUEUE_ENABLED:
+        from app.main import teardown_bot_state  # noqa: WPS433
+
+        await teardown_bot_state(bot)
+
     logger.info("Worker stopped")
 
 
@@ -39,13 +103,124 @@ async def healthcheck(_: SaqCtx) -> Literal[True]:
     return True
 
 
-queue = Queue(aioredis.from_url(app_settings.REDIS_DSN), name="service-desk-bot")
+async def cleanup_expired_attachments(ctx: SaqCtx) -> None:
+    storage_usage_repo: StorageUsageRedisRepo = ctx["storage_usage_repo"]
+
+    if await storage_usage_repo.is_overloaded():
+        max_age_sec = app_settings.ATTACHMENTS_OVERLOADED_TTL_SEC
+    else:
+        max_age_sec = app_settings.ATTACHMENTS_TTL_SEC
+
+    # Attachments of requests in progress are kept, even if they are old
+    fsm_expiration_listener: FSMExpirationListener = ctx["fsm_expiration_listener"]
+    users_in_progress = await fsm_expiration_listener.get_users_with_state()
+
+    await delete_expired_attachments(
+        max_age_sec, storage_usage_repo, users_in_progress=users_in_progress
+    )
+
+
+async def drain_bot_commands(ctx: SaqCtx, timeout: float) -> None:
+    """Wait for bot commands in progress, but no longer than timeout."""
+
+    drain_deadline = time.monotonic() + timeout
+    bot_command_tasks: Set["asyncio.Task[Any]"] = ctx["bot_command_tasks"]
+
+    # Jobs could be dequeued while others are waited
+    while bot_command_tasks and time.monotonic() < drain_deadline:
+        await asyncio.wait(
+            set(bot_command_tasks), timeout=drain_deadline - time.monotonic()
+        )
+
+    is_drained = not bot_command_tasks
+    is_drained &= await wait_background_tasks(
+        timeout=max(drain_deadline - time.monotonic(), 0)
+    )
+
+    if not is_drained:
+        logger.warning("Shutting down before all commands were handled")
+
+
+async def execute_bot_command(ctx: SaqCtx, *, raw_bot_command: Dict[str, Any]) -> None:
+    is_first_attempt = await get_redis_client().set(
+        f"{strings.BOT_PROJECT_NAME}:bot-command-handled:"
+        + str(raw_bot_command["sync_id"]),
+        1,
+        nx=True,
+        ex=HANDLED_BOT_COMMAND_TTL_SEC,
+    )
+    if not is_first_attempt:
+        # Command could be partially handled, e.g. request could be already sent
+        logger.warning(f"Command `{raw_bot_command['sync_id']}` isn't handled again")
+        return
+
+    bot_command_tasks: Set["asyncio.Task[Any]"] = ctx["bot_command_tasks"]
+    bot_command_task = asyncio.current_task()
+    assert bot_command_task is not None
+
+    bot_command_tasks.add(bot_command_task)
+    try:
+        await execute_raw_bot_command(ctx["bot"], raw_bot_command)
+    finally:
+        bot_command_tasks.discard(bot_command_task)
+
+
+def get_queue() -> Queue:
+    """Get tasks queue shared by the whole process.
+
+    Queue is created on the first call, so its scripts are loaded once. It's
+    created again only if shared redis client of the process was closed.
+    """
+
+    queue_redis_client = get_redis_client(app_settings.REDIS_QUEUE_DSN)
+
+    queue = _queues.get(QUEUE_NAME)
+    if queue is None or queue.redis is not queue_redis_client:
+        assert not is_cluster(queue_redis_client), (
+            "Tasks queue doesn't support redis cluster, "
+            "set `REDIS_QUEUE_DSN` to standalone or sentinel redis"
+        )
+
+        queue = Queue(queue_redis_client, name=QUEUE_NAME)
+        _queues[QUEUE_NAME] = queue
+
+    return queue
+
+
+async def enqueue_attachments_cleanup() -> None:
+    """Run attachments cleanup right now instead of waiting for cron."""
+
+    # Job with the same key isn't enqueued twice while it's incomplete
+    await get_queue().enqueue(
+        cleanup_expired_attachments.__name__, key=cleanup_expired_attachments.__name__
+    )
+
+
+async def enqueue_bot_command(raw_bot_command: Dict[str, Any]) -> None:
+    """Enqueue command validated by web server to be handled by worker."""
+
+    await get_queue().enqueue(
+        execute_bot_command.__name__,
+        raw_bot_command=raw_bot_command,
+        timeout=BOT_COMMAND_JOB_TIMEOUT_SEC,
+    )
+
+
+def get_worker_settings() -> Dict[str, Any]:
+    return {
+        "queue": get_queue(),
+        "functions": [healthcheck, cleanup_expired_attachments, execute_bot_command],
+        "cron_jobs": [CronJob(cleanup_expired_attachments, cron="*/15 * * * *")],
+        "concurrency": WORKER_CONCURRENCY,
+        "startup": startup,
+        "shutdown": shutdown,
+    }
+
+
+def __getattr__(name: str) -> Any:  # noqa: WPS413
+    # `saq app.worker.worker.settings` gets settings only in the worker, so web
+    # server importing this module doesn't build queue on import
+    if name == "settings":
+        return get_worker_settings()
 
-settings = {
-    "queue": queue,
-    "functions": [healthcheck],
-    "cron_jobs": [],
-    "concurrency": 8,
-    "startup": startup,
-    "shutdown": shutdown,
-}
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,100 @@
+"""Compare redis repo codecs on typical FSM states.
+
+Run with `python -m benchmarks.redis_codecs`.
+"""
+
+import timeit
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from pybotx_fsm.fsm import FSMStateData
+
+from app.bot.states.support_request import (
+    CreateSupportRequestStates,
+    UpdateSupportRequestStates,
+)
+from app.caching.redis_repo import PickleCodec, RedisCodecProto, SchemaCodec
+from app.schemas.support_request import (
+    SupportRequestInCreation,
+    SupportRequestInUpdating,
+)
+
+ROUNDS = 10000
+
+DESCRIPTION = (
+    "Не открывается вложение в чате, приложение закрывается после нажатия. "
+    "Проблема воспроизводится на телефоне и на планшете. "
+)
+
+
+def build_fsm_states() -> Dict[str, FSMStateData]:
+    return {
+        "enter_description": FSMStateData(
+            CreateSupportRequestStates.ENTER_DESCRIPTION,
+            SimpleNamespace(
+                support_request=SupportRequestInCreation(subject="Обращение по eXpress")
+            ),
+        ),
+        "add_attachment": FSMStateData(
+            CreateSupportRequestStates.ADD_ATTACHMENT,
+            SimpleNamespace(
+                support_request=SupportRequestInCreation(
+                    subject="Обращение по eXpress",
+                    description=DESCRIPTION * 5,
+                    attachments_names=[f"image ({index}).jpg" for index in range(10)],
+                )
+            ),
+        ),
+        "select_attribute": FSMStateData(
+            UpdateSupportRequestStates.SELECT_ATTRIBUTE,
+            SimpleNamespace(
+                support_request=SupportRequestInUpdating(
+                    subject="Обращение по eXpress",
+                    description=DESCRIPTION * 30,
+                    attachments_names=["screenshot.png"],
+                )
+            ),
+        ),
+    }
+
+
+def build_codecs() -> Dict[str, RedisCodecProto]:
+    schema_codec = SchemaCodec()
+    schema_codec.register(
+        FSMStateData,
+        CreateSupportRequestStates,
+        UpdateSupportRequestStates,
+        SupportRequestInCreation,
+        SupportRequestInUpdating,
+    )
+
+    return {"pickle": PickleCodec(), "schema": schema_codec}
+
+
+def measure(codec: RedisCodecProto, storage_value: Any) -> Dict[str, float]:
+    dump = codec.dumps(storage_value)
+    encode_time = timeit.timeit(lambda: codec.dumps(storage_value), number=ROUNDS)
+    decode_time = timeit.timeit(lambda: codec.loads(dump), number=ROUNDS)
+
+    return {
+        "bytes": len(dump),
+        "encode_us": encode_time / ROUNDS * 1e6,
+        "decode_us": decode_time / ROUNDS * 1e6,
+    }
+
+
+def main() -> None:
+    codecs = build_codecs()
+
+    print(f"{'state':<20}{'codec':<10}{'bytes':>8}{'encode, us':>14}{'decode, us':>14}")
+    for state_name, fsm_state in build_fsm_states().items():
+        for codec_name, codec in codecs.items():
+            result = measure(codec, fsm_state)
+            print(
+                f"{state_name:<20}{codec_name:<10}{result['bytes']:>8}"
+                f"{result['encode_us']:>14.1f}{result['decode_us']:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
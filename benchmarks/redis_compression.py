@@ -0,0 +1,97 @@
+"""Measure savings of FSM states compression in redis repo.
+
+Run with `python -m benchmarks.redis_compression`.
+"""
+
+import timeit
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from pybotx_fsm.fsm import FSMStateData
+
+from app.bot.bot import get_state_codec
+from app.bot.states.support_request import CreateSupportRequestStates
+from app.caching.redis_repo import CompressionCodec, RedisCodecProto
+from app.schemas.support_request import SupportRequestInCreation
+from app.settings import settings
+from benchmarks.redis_codecs import build_fsm_states
+
+ROUNDS = 10000
+
+LONG_DESCRIPTION = (
+    "После обновления приложения до последней версии перестали приходить "
+    "уведомления о новых сообщениях в групповых чатах. В личных чатах "
+    "уведомления приходят, но с задержкой около пяти минут. Пробовал "
+    "переустановить приложение, очистить кэш и заново выдать разрешения в "
+    "настройках телефона — не помогло. На рабочем компьютере уведомления "
+    "приходят без задержек. Коллеги из нашего отдела с такими же телефонами "
+    "сталкиваются с той же проблемой начиная со вторника. Модель телефона: "
+    "Samsung Galaxy A52, Android 13, версия приложения 3.18.1. Режим "
+    "энергосбережения выключен, фоновая передача данных разрешена. "
+    "Во вложении скриншоты настроек уведомлений и журнал приложения."
+)
+
+
+def build_realistic_fsm_states() -> Dict[str, FSMStateData]:
+    fsm_states = build_fsm_states()
+    fsm_states["long_description"] = FSMStateData(
+        CreateSupportRequestStates.ADD_ATTACHMENT,
+        SimpleNamespace(
+            support_request=SupportRequestInCreation(
+                subject="Обращение по eXpress",
+                description=LONG_DESCRIPTION,
+                attachments_names=[
+                    f"Screenshot_2023-03-{day:02}-14-{day:02}-31.jpg"
+                    for day in range(1, settings.MAX_ATTACHMENTS_COUNT + 1)
+                ],
+            )
+        ),
+    )
+
+    # Other states repeat description, so they are compressed better than usual
+    return fsm_states
+
+
+def build_codecs() -> Dict[str, RedisCodecProto]:
+    state_codec = get_state_codec()
+
+    return {
+        "plain": state_codec,
+        "zlib-1": CompressionCodec(state_codec, threshold=0, level=1),
+        "zlib-6": CompressionCodec(state_codec, threshold=0, level=6),
+    }
+
+
+def measure(codec: RedisCodecProto, storage_value: Any) -> Dict[str, float]:
+    dump = codec.dumps(storage_value)
+    encode_time = timeit.timeit(lambda: codec.dumps(storage_value), number=ROUNDS)
+    decode_time = timeit.timeit(lambda: codec.loads(dump), number=ROUNDS)
+
+    return {
+        "bytes": len(dump),
+        "encode_us": encode_time / ROUNDS * 1e6,
+        "decode_us": decode_time / ROUNDS * 1e6,
+    }
+
+
+def main() -> None:
+    codecs = build_codecs()
+
+    print(
+        f"{'state':<20}{'codec':<10}{'bytes':>8}{'saved':>8}"
+        f"{'encode, us':>14}{'decode, us':>14}"
+    )
+    for state_name, fsm_state in build_realistic_fsm_states().items():
+        plain_size = len(codecs["plain"].dumps(fsm_state))
+
+        for codec_name, codec in codecs.items():
+            result = measure(codec, fsm_state)
+            saved = 1 - result["bytes"] / plain_size
+            print(
+                f"{state_name:<20}{codec_name:<10}{result['bytes']:>8}{saved:>8.0%}"
+                f"{result['encode_us']:>14.1f}{result['decode_us']:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from typing import AsyncGenerator
+from uuid import uuid4
+
+import pytest
+from redis import asyncio as aioredis
+
+from app.caching.storage_usage_redis_repo import StorageUsageRedisRepo
+from app.caching.user_search_redis_repo import UserSearchRedisRepo
+from app.settings import settings
+
+
+@pytest.fixture
+def redis_prefix() -> str:
+    return f"test-{uuid4()}"
+
+
+@pytest.fixture
+async def redis_client(redis_prefix: str) -> AsyncGenerator[aioredis.Redis, None]:
+    redis_client = aioredis.from_url(settings.REDIS_DSN)
+
+    yield redis_client
+
+    async for key in redis_client.scan_iter(f"{redis_prefix}*"):
+        await redis_client.delete(key)
+
+    await redis_client.close()
+
+
+@pytest.fixture
+def storage_usage_repo(
+    redis_client: aioredis.Redis, redis_prefix: str
+) -> StorageUsageRedisRepo:
+    return StorageUsageRedisRepo(
+        redis=redis_client,
+        high_watermark=100,
+        low_watermark=50,
+        prefix=redis_prefix,
+    )
+
+
+@pytest.fixture
+def user_search_repo(
+    redis_client: aioredis.Redis, redis_prefix: str
+) -> UserSearchRedisRepo:
+    return UserSearchRedisRepo(
+        redis=redis_client,
+        ttl=60,
+        stale_ttl=60,
+        negative_ttl=10,
+        prefix=redis_prefix,
+    )
@@ -0,0 +1,270 @@
+import asyncio
+import tracemalloc
+from typing import AsyncGenerator
+from unittest.mock import AsyncMock, Mock, patch
+from uuid import UUID, uuid4
+
+import pytest
+from pybotx import CallbackNotReceivedError
+from pybotx.bot.exceptions import BotXMethodCallbackNotFoundError
+from pybotx.models.method_callbacks import BotAPIMethodSuccessfulCallback
+from redis import asyncio as aioredis
+
+from app.caching import callback_redis_repo
+from app.caching.callback_redis_repo import CallbackRedisRepo
+
+SOAK_MESSAGES_COUNT = 100_000
+SOAK_BATCH_SIZE = 1000
+
+
+@pytest.fixture
+async def callback_repo(
+    redis_client: aioredis.Redis, redis_prefix: str
+) -> AsyncGenerator[CallbackRedisRepo, None]:
+    callback_repo = CallbackRedisRepo(redis_client, prefix=redis_prefix)
+    await callback_repo.start_callbacks_waiting()
+
+    yield callback_repo
+
+    await callback_repo.stop_callbacks_waiting()
+
+
+def get_repo_memory_usage() -> int:
+    # Claimed callbacks are kept by redis, which is run in the same process in tests
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, callback_redis_repo.__file__)]
+    )
+    return sum(trace.size for trace in snapshot.traces)
+
+
+@pytest.fixture
+def sync_id() -> UUID:
+    return UUID("21a9ec9e-f21f-4406-ac44-1a78d2ccf9e3")
+
+
+async def test__callback_redis_repo__callback_from_other_process(
+    callback_repo: CallbackRedisRepo,
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+    sync_id: UUID,
+) -> None:
+    # - Arrange -
+    other_process_callback_repo = CallbackRedisRepo(redis_client, prefix=redis_prefix)
+    callback = BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+
+    await callback_repo.create_botx_method_callback(sync_id)
+
+    # - Act -
+    await other_process_callback_repo.set_botx_method_callback_result(callback)
+
+    # - Assert -
+    assert await callback_repo.wait_botx_method_callback(sync_id, 1) == callback
+
+
+async def test__callback_redis_repo__subscribed_on_start(
+    callback_repo: CallbackRedisRepo,
+    redis_client: aioredis.Redis,
+) -> None:
+    # - Arrange -
+    channel = callback_repo._channel  # noqa: WPS437
+
+    # - Act -
+    channels = await redis_client.pubsub_numsub(channel)
+
+    # - Assert -
+    assert channels == [(channel.encode(), 1)]
+
+
+async def test__callback_redis_repo__callback_not_sent_to_other_processes(
+    callback_repo: CallbackRedisRepo,
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+    sync_id: UUID,
+) -> None:
+    # - Arrange -
+    waiting_callback_repo = CallbackRedisRepo(redis_client, prefix=redis_prefix)
+    await waiting_callback_repo.start_callbacks_waiting()
+    other_process_callback_repo = CallbackRedisRepo(redis_client, prefix=redis_prefix)
+    callback = BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+
+    await waiting_callback_repo.create_botx_method_callback(sync_id)
+
+    # - Act -
+    with patch.object(callback_repo, "_resolve_callback") as resolve_callback:
+        await other_process_callback_repo.set_botx_method_callback_result(callback)
+        received_callback = await waiting_callback_repo.wait_botx_method_callback(
+            sync_id, 1
+        )
+
+    # - Assert -
+    assert received_callback == callback
+    resolve_callback.assert_not_called()
+
+    await waiting_callback_repo.stop_callbacks_waiting()
+
+
+async def test__callback_redis_repo__resubscribed_after_failure(
+    callback_repo: CallbackRedisRepo,
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+    sync_id: UUID,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    logger = Mock()
+    monkeypatch.setattr(callback_redis_repo, "logger", logger)
+
+    other_process_callback_repo = CallbackRedisRepo(redis_client, prefix=redis_prefix)
+    callback = BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+    await callback_repo.create_botx_method_callback(sync_id)
+
+    # - Act -
+    await redis_client.publish(
+        callback_repo._channel, b"not a callback"  # noqa: WPS437
+    )
+    while not logger.warning.called:
+        await asyncio.sleep(0.01)
+
+    await other_process_callback_repo.set_botx_method_callback_result(callback)
+
+    # - Assert -
+    logger.warning.assert_called_once_with(
+        "Resubscribing to BotX callbacks, 1 callbacks are pending"
+    )
+    assert await callback_repo.wait_botx_method_callback(sync_id, 1) == callback
+
+
+async def test__callback_redis_repo__callback_from_same_process(
+    callback_repo: CallbackRedisRepo,
+    redis_client: aioredis.Redis,
+    sync_id: UUID,
+) -> None:
+    # - Arrange -
+    callback = BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+    await callback_repo.create_botx_method_callback(sync_id)
+
+    # - Act -
+    with patch.object(redis_client, "publish", new_callable=AsyncMock) as publish:
+        await callback_repo.set_botx_method_callback_result(callback)
+
+    # - Assert -
+    publish.assert_not_awaited()
+    assert await callback_repo.wait_botx_method_callback(sync_id, 1) == callback
+
+
+async def test__callback_redis_repo__no_listeners(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+    sync_id: UUID,
+) -> None:
+    # - Arrange -
+    callback_repo = CallbackRedisRepo(redis_client, prefix=redis_prefix)
+    callback = BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+
+    # - Act -
+    with pytest.raises(BotXMethodCallbackNotFoundError):
+        await callback_repo.set_botx_method_callback_result(callback)
+
+
+async def test__callback_redis_repo__waiting_process_not_listening(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+    sync_id: UUID,
+) -> None:
+    # - Arrange -
+    callback_repo = CallbackRedisRepo(redis_client, prefix=redis_prefix)
+    await callback_repo.create_botx_method_callback(sync_id)
+
+    other_process_callback_repo = CallbackRedisRepo(redis_client, prefix=redis_prefix)
+    callback = BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+
+    # - Act -
+    with pytest.raises(BotXMethodCallbackNotFoundError):
+        await other_process_callback_repo.set_botx_method_callback_result(callback)
+
+
+async def test__callback_redis_repo__callback_timeout(
+    callback_repo: CallbackRedisRepo,
+    sync_id: UUID,
+) -> None:
+    # - Arrange -
+    await callback_repo.create_botx_method_callback(sync_id)
+
+    # - Act -
+    with pytest.raises(CallbackNotReceivedError):
+        await callback_repo.wait_botx_method_callback(sync_id, 0.01)
+
+
+async def test__callback_redis_repo__expired_callbacks_swept(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+    sync_id: UUID,
+) -> None:
+    # - Arrange -
+    callback_repo = CallbackRedisRepo(
+        redis_client, prefix=redis_prefix, max_callback_age=0
+    )
+    await callback_repo.create_botx_method_callback(sync_id)
+
+    # - Act -
+    callback_repo.sweep_expired_callbacks()
+
+    # - Assert -
+    with pytest.raises(BotXMethodCallbackNotFoundError):
+        await callback_repo.pop_botx_method_callback(sync_id)
+
+    await callback_repo.stop_callbacks_waiting()
+
+
+@pytest.mark.soak
+async def test__callback_redis_repo__soak(
+    callback_repo: CallbackRedisRepo,
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    other_process_callback_repo = CallbackRedisRepo(redis_client, prefix=redis_prefix)
+
+    async def send_message(index: int) -> None:
+        sync_id = uuid4()
+        await callback_repo.create_botx_method_callback(sync_id)
+
+        if index % 2:
+            # Callback isn't waited, so it's popped by timeout alarm
+            await callback_repo.pop_botx_method_callback(sync_id)
+            return
+
+        callback = BotAPIMethodSuccessfulCallback(
+            sync_id=sync_id, status="ok", result={}
+        )
+        await other_process_callback_repo.set_botx_method_callback_result(callback)
+        await callback_repo.wait_botx_method_callback(sync_id, 5)
+
+    async def send_messages(messages_count: int) -> None:
+        for batch_start in range(0, messages_count, SOAK_BATCH_SIZE):
+            await asyncio.gather(
+                *(
+                    send_message(index)
+                    for index in range(batch_start, batch_start + SOAK_BATCH_SIZE)
+                )
+            )
+
+    await callback_repo.create_botx_method_callback(uuid4())
+    await send_messages(SOAK_BATCH_SIZE)
+
+    connection_pool = redis_client.connection_pool
+    connections_count = connection_pool._created_connections  # noqa: WPS437
+    tracemalloc.start()
+
+    # - Act -
+    await send_messages(SOAK_MESSAGES_COUNT // 2)
+    half_memory_usage = get_repo_memory_usage()
+    await send_messages(SOAK_MESSAGES_COUNT // 2)
+    memory_usage = get_repo_memory_usage()
+
+    tracemalloc.stop()
+
+    # - Assert -
+    assert memory_usage - half_memory_usage < 256 * 1024
+    assert connection_pool._created_connections == connections_count  # noqa: WPS437
+    assert len(callback_repo._futures) == 1  # noqa: WPS437
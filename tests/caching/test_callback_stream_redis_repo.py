@@ -0,0 +1,87 @@
+from typing import AsyncGenerator
+from uuid import UUID
+
+import pytest
+from pybotx.models.method_callbacks import BotAPIMethodSuccessfulCallback
+from redis import asyncio as aioredis
+
+from app.caching.callback_stream_redis_repo import CallbackStreamRedisRepo
+
+
+@pytest.fixture
+async def callback_repo(
+    redis_client: aioredis.Redis, redis_prefix: str
+) -> AsyncGenerator[CallbackStreamRedisRepo, None]:
+    callback_repo = CallbackStreamRedisRepo(redis_client, prefix=redis_prefix)
+    await callback_repo.start_callbacks_waiting()
+
+    yield callback_repo
+
+    await callback_repo.stop_callbacks_waiting()
+
+
+@pytest.fixture
+def other_process_callback_repo(
+    redis_client: aioredis.Redis, redis_prefix: str
+) -> CallbackStreamRedisRepo:
+    return CallbackStreamRedisRepo(redis_client, prefix=redis_prefix)
+
+
+@pytest.fixture
+def sync_id() -> UUID:
+    return UUID("21a9ec9e-f21f-4406-ac44-1a78d2ccf9e3")
+
+
+async def test__callback_stream_redis_repo__callback_from_other_process(
+    callback_repo: CallbackStreamRedisRepo,
+    other_process_callback_repo: CallbackStreamRedisRepo,
+    sync_id: UUID,
+) -> None:
+    # - Arrange -
+    callback = BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+    await callback_repo.create_botx_method_callback(sync_id)
+
+    # - Act -
+    await other_process_callback_repo.set_botx_method_callback_result(callback)
+
+    # - Assert -
+    assert await callback_repo.wait_botx_method_callback(sync_id, 1) == callback
+
+
+async def test__callback_stream_redis_repo__callback_published_before_creation(
+    callback_repo: CallbackStreamRedisRepo,
+    other_process_callback_repo: CallbackStreamRedisRepo,
+    sync_id: UUID,
+) -> None:
+    # - Arrange -
+    callback = BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+
+    # - Act -
+    await other_process_callback_repo.set_botx_method_callback_result(callback)
+    await callback_repo.create_botx_method_callback(sync_id)
+
+    # - Assert -
+    assert await callback_repo.wait_botx_method_callback(sync_id, 1) == callback
+
+
+async def test__callback_stream_redis_repo__early_callbacks_swept(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+    sync_id: UUID,
+) -> None:
+    # - Arrange -
+    callback_repo = CallbackStreamRedisRepo(
+        redis_client, prefix=redis_prefix, retention=0
+    )
+    callback = BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+    callback_repo._receive_callback(callback)  # noqa: WPS437
+
+    # - Act -
+    callback_repo.sweep_expired_callbacks()
+
+    # - Assert -
+    await callback_repo.create_botx_method_callback(sync_id)
+    future = await callback_repo.pop_botx_method_callback(sync_id)
+    assert not future.done()
+
+    await callback_repo.stop_callbacks_waiting()
@@ -0,0 +1,138 @@
+import asyncio
+from typing import AsyncGenerator, Callable
+from unittest.mock import Mock
+
+import pytest
+from redis import asyncio as aioredis
+
+from app.caching.near_cache_redis_repo import NearCache, NearCacheRedisRepo
+
+
+@pytest.fixture
+async def near_cache_redis_repo_factory(
+    redis_client: aioredis.Redis, redis_prefix: str
+) -> AsyncGenerator[Callable[[], NearCacheRedisRepo], None]:
+    started_repos = []
+
+    def factory() -> NearCacheRedisRepo:
+        near_cache_redis_repo = NearCacheRedisRepo(
+            redis=redis_client, prefix=redis_prefix, max_size=10, ttl=60
+        )
+        started_repos.append(near_cache_redis_repo)
+        return near_cache_redis_repo
+
+    yield factory
+
+    for near_cache_redis_repo in started_repos:
+        await near_cache_redis_repo.stop()
+
+
+async def start_and_wait_subscription(
+    near_cache_redis_repo: NearCacheRedisRepo,
+) -> None:
+    await near_cache_redis_repo.start()
+
+    while not near_cache_redis_repo.stats["is_subscribed"]:
+        await asyncio.sleep(0.01)
+
+
+def test__near_cache__lru_eviction() -> None:
+    # - Arrange -
+    near_cache = NearCache(max_size=2, ttl=60)
+    near_cache.set("first", b"1")
+    near_cache.set("second", b"2")
+
+    # - Act -
+    near_cache.get("first")
+    near_cache.set("third", b"3")
+
+    # - Assert -
+    assert near_cache.get("first") == b"1"
+    assert near_cache.get("second") is None
+    assert near_cache.get("third") == b"3"
+
+
+def test__near_cache__expired_entry() -> None:
+    # - Arrange -
+    near_cache = NearCache(max_size=2, ttl=-1)
+
+    # - Act -
+    near_cache.set("key", b"value")
+
+    # - Assert -
+    assert near_cache.get("key") is None
+
+
+async def test__near_cache_redis_repo__hit(
+    near_cache_redis_repo_factory: Callable[[], NearCacheRedisRepo],
+) -> None:
+    # - Arrange -
+    near_cache_redis_repo = near_cache_redis_repo_factory()
+    await start_and_wait_subscription(near_cache_redis_repo)
+    await near_cache_redis_repo.set("key", "value")
+
+    # - Act -
+    storage_value = await near_cache_redis_repo.get("key")
+
+    # - Assert -
+    assert storage_value == "value"
+    assert near_cache_redis_repo.stats["hits"] == 1
+    assert near_cache_redis_repo.stats["hit_ratio"] == 1
+
+
+async def test__near_cache_redis_repo__invalidated_by_other_process(
+    near_cache_redis_repo_factory: Callable[[], NearCacheRedisRepo],
+) -> None:
+    # - Arrange -
+    near_cache_redis_repo = near_cache_redis_repo_factory()
+    other_near_cache_redis_repo = near_cache_redis_repo_factory()
+    await start_and_wait_subscription(near_cache_redis_repo)
+    await start_and_wait_subscription(other_near_cache_redis_repo)
+
+    await near_cache_redis_repo.set("key", "value")
+
+    # - Act -
+    await other_near_cache_redis_repo.set("key", "new value")
+    while near_cache_redis_repo.stats["size"]:
+        await asyncio.sleep(0.01)
+
+    # - Assert -
+    assert await near_cache_redis_repo.get("key") == "new value"
+    assert near_cache_redis_repo.stats["misses"] == 1
+
+
+async def test__near_cache_redis_repo__invalidation_missed(
+    near_cache_redis_repo_factory: Callable[[], NearCacheRedisRepo],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    near_cache_redis_repo = near_cache_redis_repo_factory()
+    other_near_cache_redis_repo = near_cache_redis_repo_factory()
+    await start_and_wait_subscription(near_cache_redis_repo)
+    await near_cache_redis_repo.set("key", "value")
+    monkeypatch.setattr(near_cache_redis_repo, "_handle_invalidation", Mock())
+
+    # - Act -
+    await other_near_cache_redis_repo.set("key", "new value")
+
+    # - Assert -
+    assert await near_cache_redis_repo.get("key") == "new value"
+    assert near_cache_redis_repo.stats["misses"] == 1
+
+
+async def test__near_cache_redis_repo__version_missing(
+    near_cache_redis_repo_factory: Callable[[], NearCacheRedisRepo],
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    near_cache_redis_repo = near_cache_redis_repo_factory()
+    await start_and_wait_subscription(near_cache_redis_repo)
+    await near_cache_redis_repo.set("key", "value")
+
+    # - Act -
+    await redis_client.delete(f"{redis_prefix}:near-cache-version:{redis_prefix}:key")
+
+    # - Assert -
+    assert await near_cache_redis_repo.get("key") == "value"
+    assert near_cache_redis_repo.stats["misses"] == 1
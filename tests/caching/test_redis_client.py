@@ -0,0 +1,93 @@
+import pytest
+from redis import asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+
+from app.caching.redis_client import (
+    BlockingSentinelConnectionPool,
+    InvalidRedisDSNError,
+    build_redis_client,
+    get_node_client,
+    get_primary_clients,
+    get_redis_client,
+)
+from app.settings import settings
+
+
+def test__build_redis_client__sentinel() -> None:
+    # - Act -
+    redis_client = build_redis_client(
+        "redis+sentinel://:secret@sentinel-1,sentinel-2:26380/service-desk/2"
+    )
+
+    # - Assert -
+    connection_pool = redis_client.connection_pool
+    assert connection_pool.service_name == "service-desk"
+    assert connection_pool.connection_kwargs["password"] == "secret"
+    assert connection_pool.connection_kwargs["db"] == 2
+    assert [
+        sentinel.connection_pool.connection_kwargs["port"]
+        for sentinel in connection_pool.sentinel_manager.sentinels
+    ] == [26379, 26380]
+
+
+def test__build_redis_client__sentinel_max_connections() -> None:
+    # - Act -
+    redis_client = build_redis_client(
+        "redis+sentinel://sentinel-1/service-desk", pool_timeout=3, max_connections=2
+    )
+
+    # - Assert -
+    connection_pool = redis_client.connection_pool
+    assert isinstance(connection_pool, BlockingSentinelConnectionPool)
+    assert connection_pool.max_connections == 2
+    assert connection_pool.timeout == 3
+
+
+def test__build_redis_client__max_connections() -> None:
+    # - Act -
+    redis_client = build_redis_client(
+        "redis://redis-1/1", pool_timeout=3, max_connections=2
+    )
+
+    # - Assert -
+    connection_pool = redis_client.connection_pool
+    assert isinstance(connection_pool, aioredis.BlockingConnectionPool)
+    assert connection_pool.connection_kwargs["host"] == "redis-1"
+    assert connection_pool.max_connections == 2
+    assert connection_pool.timeout == 3
+
+
+def test__build_redis_client__sentinel_without_service_name() -> None:
+    # - Act -
+    with pytest.raises(InvalidRedisDSNError):
+        build_redis_client("redis+sentinel://sentinel-1")
+
+
+def test__build_redis_client__cluster() -> None:
+    # - Act -
+    redis_client = build_redis_client("redis+cluster://:secret@node-1:7000,node-2")
+
+    # - Assert -
+    assert isinstance(redis_client, RedisCluster)
+    assert sorted(redis_client.nodes_manager.startup_nodes) == [
+        "node-1:7000",
+        "node-2:6379",
+    ]
+
+
+async def test__get_node_client__standalone(redis_client: aioredis.Redis) -> None:
+    # - Act -
+    node_client = await get_node_client(redis_client, "channel")
+
+    # - Assert -
+    assert node_client is redis_client
+    assert await get_primary_clients(redis_client) == [redis_client]
+
+
+def test__get_redis_client__shared() -> None:
+    # - Act -
+    redis_client = get_redis_client()
+
+    # - Assert -
+    assert get_redis_client(settings.REDIS_DSN) is redis_client
+    assert get_redis_client(settings.REDIS_QUEUE_DSN) is redis_client
@@ -0,0 +1,330 @@
+import pickle  # noqa: S403
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+import pytest
+from pybotx_fsm.fsm import FSMStateData
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from app.bot.bot import get_state_codec
+from app.bot.states.support_request import CreateSupportRequestStates
+from app.caching.redis_repo import (
+    COMPRESSION_HEADER,
+    CompressionCodec,
+    RedisRepo,
+    SchemaCodec,
+    build_key,
+)
+from app.schemas.support_request import SupportRequestInCreation
+
+
+@pytest.fixture
+def state_codec() -> SchemaCodec:
+    return get_state_codec()
+
+
+@pytest.fixture
+def fsm_state() -> FSMStateData:
+    return FSMStateData(
+        CreateSupportRequestStates.ADD_ATTACHMENT,
+        SimpleNamespace(
+            support_request=SupportRequestInCreation(
+                subject="lorem ipsum",
+                description="dolor sit amet",
+                attachments_names=["attachment.txt"],
+            ),
+        ),
+    )
+
+
+def test__schema_codec__fsm_state(
+    state_codec: SchemaCodec, fsm_state: FSMStateData
+) -> None:
+    # - Act -
+    dump = state_codec.dumps(fsm_state)
+
+    # - Assert -
+    assert b"support_request" in dump
+    assert b"app.schemas" not in dump
+    assert state_codec.loads(dump) == fsm_state
+
+
+def test__schema_codec__builtin_types(state_codec: SchemaCodec) -> None:
+    # - Arrange -
+    storage_value = {
+        "huid": UUID("cd069aaa-46e6-4223-950b-ccea42b89c06"),
+        "pair": (1, "one"),
+        "items": [None, True, 1.5],
+    }
+
+    # - Act -
+    dump = state_codec.dumps(storage_value)
+
+    # - Assert -
+    assert state_codec.loads(dump) == storage_value
+
+
+def test__schema_codec__pickled_entry(
+    state_codec: SchemaCodec, fsm_state: FSMStateData
+) -> None:
+    # - Act -
+    storage_value = state_codec.loads(pickle.dumps(fsm_state))
+
+    # - Assert -
+    assert storage_value == fsm_state
+
+
+def test__schema_codec__schemas_not_dumped(
+    state_codec: SchemaCodec, fsm_state: FSMStateData
+) -> None:
+    # - Arrange -
+    pickle_state_codec = get_state_codec(dumps_schemas=False)
+
+    # - Act -
+    dump = pickle_state_codec.dumps(fsm_state)
+
+    # - Assert -
+    assert pickle.loads(dump) == fsm_state  # noqa: S301
+    assert pickle_state_codec.loads(state_codec.dumps(fsm_state)) == fsm_state
+
+
+def test__schema_codec__unregistered_type(state_codec: SchemaCodec) -> None:
+    # - Arrange -
+    storage_value = {1: frozenset((1, 2))}
+
+    # - Act -
+    dump = state_codec.dumps(storage_value)
+
+    # - Assert -
+    assert state_codec.loads(dump) == storage_value
+
+
+def test__compression_codec__large_value(
+    state_codec: SchemaCodec, fsm_state: FSMStateData
+) -> None:
+    # - Arrange -
+    fsm_state.storage.support_request.description *= 100
+    compression_codec = CompressionCodec(state_codec, threshold=1024)
+
+    # - Act -
+    dump = compression_codec.dumps(fsm_state)
+
+    # - Assert -
+    assert dump.startswith(COMPRESSION_HEADER)
+    assert len(dump) < len(state_codec.dumps(fsm_state))
+    assert compression_codec.loads(dump) == fsm_state
+
+
+def test__compression_codec__small_value(
+    state_codec: SchemaCodec, fsm_state: FSMStateData
+) -> None:
+    # - Arrange -
+    compression_codec = CompressionCodec(state_codec, threshold=1024)
+
+    # - Act -
+    dump = compression_codec.dumps(fsm_state)
+
+    # - Assert -
+    assert dump == state_codec.dumps(fsm_state)
+    assert compression_codec.loads(dump) == fsm_state
+
+
+async def test__redis_repo__set_and_get(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+    state_codec: SchemaCodec,
+    fsm_state: FSMStateData,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(redis=redis_client, prefix=redis_prefix, codec=state_codec)
+
+    # - Act -
+    await redis_repo.set("key", fsm_state)
+
+    # - Assert -
+    assert await redis_repo.get("key") == fsm_state
+
+
+async def test__redis_repo__readable_keys(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(redis=redis_client, prefix=redis_prefix)
+    huid = UUID("cd069aaa-46e6-4223-950b-ccea42b89c06")
+
+    # - Act -
+    await redis_repo.set("fsm:state", 1)
+    await redis_repo.set(huid, 2)
+    await redis_repo.set(("profile", huid), 3)
+
+    # - Assert -
+    assert (
+        await redis_client.exists(
+            f"{redis_prefix}:fsm:state",
+            f"{redis_prefix}:{huid}",
+            f"{redis_prefix}:profile:{huid}",
+        )
+        == 3
+    )
+
+
+def test__build_key__same_string_form() -> None:
+    # - Arrange -
+    huid = UUID("cd069aaa-46e6-4223-950b-ccea42b89c06")
+
+    # - Assert -
+    assert build_key(5) == build_key("5")
+    assert build_key(huid) == build_key(str(huid))
+    assert build_key(("a", "b")) == build_key("a:b")
+
+
+async def test__redis_repo__hash_tag_keys(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(
+        redis=redis_client,
+        prefix=redis_prefix,
+        expire=100,
+        expiration_notice=30,
+        hash_tag_keys=True,
+    )
+
+    # - Act -
+    await redis_repo.set("fsm:state", 1)
+
+    # - Assert -
+    assert (
+        await redis_client.exists(
+            f"{redis_prefix}:{{fsm:state}}", f"{redis_prefix}:{{fsm:state}}:expiring"
+        )
+        == 2
+    )
+    assert await redis_repo.get("fsm:state") == 1
+
+
+async def test__redis_repo__legacy_key(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+    state_codec: SchemaCodec,
+    fsm_state: FSMStateData,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(
+        redis=redis_client,
+        prefix=redis_prefix,
+        codec=state_codec,
+        read_legacy_keys=True,
+    )
+    legacy_key = redis_repo._legacy_key("key")  # noqa: WPS437
+    await redis_client.set(legacy_key, pickle.dumps(fsm_state))
+
+    # - Act -
+    storage_value = await redis_repo.get("key")
+
+    # - Assert -
+    assert storage_value == fsm_state
+    assert not await redis_client.exists(legacy_key)
+    assert await redis_client.exists(f"{redis_prefix}:key")
+
+
+async def test__redis_repo__delete_legacy_key(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(
+        redis=redis_client, prefix=redis_prefix, read_legacy_keys=True
+    )
+    legacy_key = redis_repo._legacy_key("key")  # noqa: WPS437
+    await redis_client.set(legacy_key, pickle.dumps("value"))
+
+    # - Act -
+    await redis_repo.delete("key")
+
+    # - Assert -
+    assert await redis_repo.get("key") is None
+
+
+async def test__redis_repo__rget(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(redis=redis_client, prefix=redis_prefix)
+    await redis_repo.set("key", "value")
+
+    # - Act -
+    storage_value = await redis_repo.rget("key")
+
+    # - Assert -
+    assert storage_value == "value"
+    assert await redis_repo.rget("key", "default") == "default"
+
+
+async def test__redis_repo__rget_without_getdel(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(redis=redis_client, prefix=redis_prefix)
+    await redis_repo.set("key", "value")
+
+    # - Act -
+    with patch.object(
+        redis_client,
+        "getdel",
+        AsyncMock(side_effect=ResponseError("unknown command 'GETDEL'")),
+    ):
+        storage_value = await redis_repo.rget("key")
+
+    # - Assert -
+    assert storage_value == "value"
+    assert await redis_repo.rget("key", "default") == "default"
+
+
+async def test__redis_repo__rget_error_not_hidden(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(redis=redis_client, prefix=redis_prefix)
+    await redis_repo.set("key", "value")
+    getdel_error = ResponseError("OOM command not allowed")
+
+    # - Act -
+    with patch.object(redis_client, "getdel", AsyncMock(side_effect=getdel_error)):
+        with pytest.raises(ResponseError):
+            await redis_repo.rget("key")
+
+    # - Assert -
+    assert redis_repo._is_getdel_supported  # noqa: WPS437
+    assert await redis_repo.rget("key") == "value"
+
+
+async def test__redis_repo__expiration_notice(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    redis_repo = RedisRepo(
+        redis=redis_client, prefix=redis_prefix, expire=100, expiration_notice=30
+    )
+    notice_key = f"{redis_prefix}:key:expiring"
+
+    # - Act -
+    await redis_repo.set("key", "value")
+
+    # - Assert -
+    assert 0 < await redis_client.ttl(notice_key) <= 70
+
+    await redis_repo.set("key", "value", expire=10)
+    assert not await redis_client.exists(notice_key)
+
+    await redis_repo.set("key", "value")
+    await redis_repo.delete("key")
+    assert not await redis_client.exists(notice_key)
@@ -0,0 +1,73 @@
+from app.caching.storage_usage_redis_repo import StorageUsageRedisRepo
+
+
+async def test__storage_usage__reserve_and_release(
+    storage_usage_repo: StorageUsageRedisRepo,
+) -> None:
+    # - Act -
+    is_reserved = await storage_usage_repo.reserve(60)
+    await storage_usage_repo.release(20)
+
+    # - Assert -
+    assert is_reserved
+    assert await storage_usage_repo.get_usage() == 40
+
+
+async def test__storage_usage__release_more_than_reserved(
+    storage_usage_repo: StorageUsageRedisRepo,
+) -> None:
+    # - Arrange -
+    await storage_usage_repo.reserve(10)
+
+    # - Act -
+    await storage_usage_repo.release(20)
+
+    # - Assert -
+    assert await storage_usage_repo.get_usage() == 0
+
+
+async def test__storage_usage__high_watermark_reached(
+    storage_usage_repo: StorageUsageRedisRepo,
+) -> None:
+    # - Arrange -
+    await storage_usage_repo.reserve(60)
+
+    # - Act -
+    is_reserved = await storage_usage_repo.reserve(40)
+
+    # - Assert -
+    assert not is_reserved
+    assert await storage_usage_repo.get_usage() == 60
+    assert await storage_usage_repo.is_overloaded()
+
+
+async def test__storage_usage__overloaded_until_low_watermark(
+    storage_usage_repo: StorageUsageRedisRepo,
+) -> None:
+    # - Arrange -
+    await storage_usage_repo.reserve(60)
+    await storage_usage_repo.reserve(40)
+
+    # - Act -
+    is_reserved_above_low_watermark = await storage_usage_repo.reserve(1)
+    await storage_usage_repo.release(10)
+    is_reserved_at_low_watermark = await storage_usage_repo.reserve(1)
+
+    # - Assert -
+    assert not is_reserved_above_low_watermark
+    assert is_reserved_at_low_watermark
+    assert await storage_usage_repo.get_usage() == 51
+    assert not await storage_usage_repo.is_overloaded()
+
+
+async def test__storage_usage__set_usage(
+    storage_usage_repo: StorageUsageRedisRepo,
+) -> None:
+    # - Arrange -
+    await storage_usage_repo.reserve(60)
+
+    # - Act -
+    await storage_usage_repo.set_usage(10)
+
+    # - Assert -
+    assert await storage_usage_repo.get_usage() == 10
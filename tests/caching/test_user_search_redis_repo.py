@@ -0,0 +1,80 @@
+from uuid import UUID
+
+from pybotx import UserFromSearch, UserKinds
+from redis import asyncio as aioredis
+
+from app.caching.user_search_redis_repo import UserSearchRedisRepo
+
+
+def build_user() -> UserFromSearch:
+    return UserFromSearch(
+        huid=UUID("86c4814b-feee-4ff0-b04d-4b3226318078"),
+        ad_login="test_user",
+        ad_domain="example.com",
+        username="Test User",
+        company="Company",
+        company_position="Engineer",
+        department="Support",
+        emails=["test_user@example.com"],
+        other_id=None,
+        user_kind=UserKinds.CTS_USER,
+        other_phone="+79990000000",
+    )
+
+
+async def test__user_search_redis_repo__found_user(
+    user_search_repo: UserSearchRedisRepo,
+) -> None:
+    # - Arrange -
+    user = build_user()
+    bot_id = UUID("123e4567-e89b-12d3-a456-426655440000")
+
+    # - Act -
+    await user_search_repo.set_found(user, bot_id)
+
+    # - Assert -
+    cached_search = await user_search_repo.get(user.huid)
+    assert cached_search is not None
+    assert cached_search.user == user
+    assert cached_search.bot_id == bot_id
+    assert not cached_search.is_bot
+    assert not cached_search.is_stale
+
+
+async def test__user_search_redis_repo__stale_user(
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    user_search_repo = UserSearchRedisRepo(
+        redis=redis_client, ttl=0, stale_ttl=60, negative_ttl=10, prefix=redis_prefix
+    )
+    user = build_user()
+
+    # - Act -
+    await user_search_repo.set_found(user, UUID("123e4567-e89b-12d3-a456-426655440000"))
+
+    # - Assert -
+    cached_search = await user_search_repo.get(user.huid)
+    assert cached_search is not None
+    assert cached_search.user == user
+    assert cached_search.is_stale
+
+
+async def test__user_search_redis_repo__not_found_user(
+    user_search_repo: UserSearchRedisRepo,
+    redis_client: aioredis.Redis,
+    redis_prefix: str,
+) -> None:
+    # - Arrange -
+    huid = UUID("86c4814b-feee-4ff0-b04d-4b3226318078")
+
+    # - Act -
+    await user_search_repo.set_not_found(huid)
+
+    # - Assert -
+    cached_search = await user_search_repo.get(huid)
+    assert cached_search is not None
+    assert cached_search.user is None
+    assert not cached_search.is_bot
+    assert await redis_client.ttl(f"{redis_prefix}:user_search:{huid}") <= 10
@@ -17,14 +17,20 @@ from app.bot.states.support_request import (
     UpdateSupportRequestStates,
 )
 from app.schemas.support_request import SupportRequestInCreation
+from app.services.answer_delivery import FireAndForgetMessage
 
 
+@patch(
+    "app.bot.commands.support_request.create.prefetch_user",
+    new_callable=AsyncMock,
+)
 @patch(
     "app.bot.commands.support_request.create.ServiceDeskRepo.delete_user_attachments",
     new_callable=AsyncMock,
 )
 async def test__create_support_request_handler(
     mocked_delete_user_attachments: AsyncMock,
+    mocked_prefetch_user: AsyncMock,
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
     fsm_session: FSM,
@@ -37,9 +43,10 @@ async def test__create_support_request_handler(
 
     # - Assert -
     assert mocked_delete_user_attachments.call_count == 1
+    assert mocked_prefetch_user.call_count == 1
     assert await fsm_session.get_state() == CreateSupportRequestStates.ENTER_DESCRIPTION
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -51,6 +58,7 @@ async def test__create_support_request_handler(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -69,7 +77,7 @@ async def test__enter_support_request_description_handler__empty_message(
     # - Assert -
     assert await fsm_session.get_state() == CreateSupportRequestStates.ENTER_DESCRIPTION
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -81,6 +89,7 @@ async def test__enter_support_request_description_handler__empty_message(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -101,7 +110,7 @@ async def test__enter_support_request_description_handler__max_description_lengt
     # - Assert -
     assert await fsm_session.get_state() == CreateSupportRequestStates.ENTER_DESCRIPTION
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -110,6 +119,7 @@ async def test__enter_support_request_description_handler__max_description_lengt
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -136,7 +146,7 @@ async def test__enter_support_request_description_handler__without_attachment(
     )
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -154,6 +164,7 @@ async def test__enter_support_request_description_handler__without_attachment(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -184,7 +195,7 @@ async def test__enter_support_request_description_handler__invalid_attachment(
     assert await fsm_session.get_state() == CreateSupportRequestStates.ENTER_DESCRIPTION
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -202,12 +213,10 @@ async def test__enter_support_request_description_handler__invalid_attachment(
             ),
             silent_response=True,
         ),
+        wait_callback=False,
     )
 
 
-@patch(
-    "app.bot.commands.support_request.create.ServiceDeskRepo.get_user_attachments_names"
-)
 @patch("app.bot.commands.support_request.create.ServiceDeskRepo.add_user_attachment")
 @patch(
     "app.bot.commands.support_request.create.ServiceDeskRepo.is_valid_attachment",
@@ -216,7 +225,6 @@ async def test__enter_support_request_description_handler__invalid_attachment(
 async def test__enter_support_request_description_handler__valid_attachment(  # noqa: WPS218, E501
     mocked_is_valid_attachment: MagicMock,
     mocked_add_user_attachment: MagicMock,
-    mocked_get_user_attachments_names: MagicMock,
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
     incoming_attachment: AttachmentDocument,
@@ -230,7 +238,7 @@ async def test__enter_support_request_description_handler__valid_attachment(  #
         state=CreateSupportRequestStates.ENTER_DESCRIPTION,
         support_request=SupportRequestInCreation(),
     )
-    mocked_get_user_attachments_names.return_value = default_list
+    mocked_add_user_attachment.return_value = default_string
 
     # - Act -
     await bot.async_execute_bot_command(message)
@@ -238,10 +246,11 @@ async def test__enter_support_request_description_handler__valid_attachment(  #
     # - Assert -
     assert mocked_is_valid_attachment.call_count == 1
     assert mocked_add_user_attachment.call_count == 1
-    assert mocked_get_user_attachments_names.call_count == 1
     assert await fsm_session.get_state() == CreateSupportRequestStates.CONFIRM_REQUEST
     assert message.state.fsm_storage.support_request.description == default_string
-    assert message.state.fsm_storage.support_request.attachments_names == default_list
+    assert message.state.fsm_storage.support_request.attachments_names == [
+        default_string
+    ]
     bot.send.assert_awaited_once_with(  # type: ignore
         message=OutgoingMessage(
             bot_id=message.bot.id,
@@ -249,7 +258,7 @@ async def test__enter_support_request_description_handler__valid_attachment(  #
             body=(
                 "**Проверьте правильность ввода:**\n"
                 "**Описание проблемы:** lorem ipsum\n"
-                "**Приложенные файлы:** dolor sit amet, lorem ipsum\n"
+                "**Приложенные файлы:** lorem ipsum\n"
                 "**Всё верно?**"
             ),
             bubbles=BubbleMarkup(
@@ -266,6 +275,62 @@ async def test__enter_support_request_description_handler__valid_attachment(  #
     )
 
 
+@patch(
+    "app.bot.commands.support_request.create.enqueue_attachments_cleanup",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.bot.commands.support_request.create.ServiceDeskRepo.reserve_storage",
+    return_value=False,
+)
+@patch("app.bot.commands.support_request.create.ServiceDeskRepo.add_user_attachment")
+async def test__enter_support_request_description_handler__storage_overloaded(
+    mocked_add_user_attachment: AsyncMock,
+    mocked_reserve_storage: AsyncMock,
+    mocked_enqueue_attachments_cleanup: AsyncMock,
+    bot: Bot,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    incoming_attachment: AttachmentDocument,
+    fsm_session: FSM,
+    default_string: str,
+) -> None:
+    # - Arrange -
+    message = incoming_message_factory(body=default_string, file=incoming_attachment)
+    await fsm_session.change_state(
+        state=CreateSupportRequestStates.ENTER_DESCRIPTION,
+        support_request=SupportRequestInCreation(),
+    )
+
+    # - Act -
+    await bot.async_execute_bot_command(message)
+
+    # - Assert -
+    assert mocked_reserve_storage.call_count == 1
+    assert mocked_enqueue_attachments_cleanup.call_count == 1
+    assert mocked_add_user_attachment.call_count == 0
+    assert await fsm_session.get_state() == CreateSupportRequestStates.ENTER_DESCRIPTION
+    bot.send.assert_awaited_once_with(  # type: ignore
+        message=FireAndForgetMessage(
+            bot_id=message.bot.id,
+            chat_id=message.chat.id,
+            body=(
+                "Сейчас загрузка файлов временно недоступна, пожалуйста, "
+                "попробуйте позже.\nТакже Вы можете нажать кнопку **«Отмена»** "
+                "для отмены оформления обращения или **«Отправить обращение»** "
+                "для регистрации запроса без файлов."
+            ),
+            keyboard=KeyboardMarkup(
+                [
+                    [Button(command="/send-to-confirm", label="ОТПРАВИТЬ ОБРАЩЕНИЕ")],
+                    [Button(command="/cancel", label="ОТМЕНА")],
+                ]
+            ),
+            silent_response=True,
+        ),
+        wait_callback=False,
+    )
+
+
 async def test__wait_decision_on_attachment_handler__empty_message(
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
@@ -291,7 +356,7 @@ async def test__wait_decision_on_attachment_handler__empty_message(
     assert message.state.fsm_storage.support_request.description == default_string
     assert not message.state.fsm_storage.support_request.attachments_names
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -309,6 +374,7 @@ async def test__wait_decision_on_attachment_handler__empty_message(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -337,7 +403,7 @@ async def test__wait_decision_on_attachment_handler__text_instead_command(
     assert message.state.fsm_storage.support_request.description == default_string
     assert not message.state.fsm_storage.support_request.attachments_names
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -355,6 +421,7 @@ async def test__wait_decision_on_attachment_handler__text_instead_command(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -412,11 +479,7 @@ async def test__wait_decision_on_attachment_handler__refuse_command(
     )
 
 
-@patch(
-    "app.bot.commands.support_request.create.ServiceDeskRepo.get_user_attachments_names"
-)
 async def test__wait_decision_on_attachment_handler__confirm_command_with_attachments(
-    mocked_get_user_attachments_names: MagicMock,
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
     fsm_session: FSM,
@@ -425,8 +488,9 @@ async def test__wait_decision_on_attachment_handler__confirm_command_with_attach
 ) -> None:
     # - Arrange -
     message = incoming_message_factory(body="/confirm-attachment-addition")
-    support_request = SupportRequestInCreation(description=default_string)
-    mocked_get_user_attachments_names.return_value = default_list
+    support_request = SupportRequestInCreation(
+        description=default_string, attachments_names=default_list
+    )
     await fsm_session.change_state(
         state=CreateSupportRequestStates.WAIT_DECISION_ON_ATTACHMENT,
         support_request=support_request,
@@ -436,7 +500,6 @@ async def test__wait_decision_on_attachment_handler__confirm_command_with_attach
     await bot.async_execute_bot_command(message)
 
     # - Assert -
-    assert mocked_get_user_attachments_names.call_count == 1
     assert await fsm_session.get_state() == CreateSupportRequestStates.ADD_ATTACHMENT
     assert message.state.fsm_storage.support_request.description == default_string
     assert message.state.fsm_storage.support_request.attachments_names == default_list
@@ -462,11 +525,7 @@ async def test__wait_decision_on_attachment_handler__confirm_command_with_attach
     )
 
 
-@patch(
-    "app.bot.commands.support_request.create.ServiceDeskRepo.get_user_attachments_names"
-)
 async def test__wait_decision_on_attachment_handler__confirm_command_without_attachments(  # noqa: E501
-    mocked_get_user_attachments_names: MagicMock,
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
     fsm_session: FSM,
@@ -476,7 +535,6 @@ async def test__wait_decision_on_attachment_handler__confirm_command_without_att
     # - Arrange -
     message = incoming_message_factory(body="/confirm-attachment-addition")
     support_request = SupportRequestInCreation(description=default_string)
-    mocked_get_user_attachments_names.return_value = []
     await fsm_session.change_state(
         state=CreateSupportRequestStates.WAIT_DECISION_ON_ATTACHMENT,
         support_request=support_request,
@@ -486,12 +544,11 @@ async def test__wait_decision_on_attachment_handler__confirm_command_without_att
     await bot.async_execute_bot_command(message)
 
     # - Assert -
-    assert mocked_get_user_attachments_names.call_count == 1
     assert await fsm_session.get_state() == CreateSupportRequestStates.ADD_ATTACHMENT
     assert message.state.fsm_storage.support_request.description == default_string
     assert not message.state.fsm_storage.support_request.attachments_names
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -505,6 +562,7 @@ async def test__wait_decision_on_attachment_handler__confirm_command_without_att
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
             silent_response=True,
         ),
+        wait_callback=False,
     )
 
 
@@ -529,7 +587,7 @@ async def test__add_attachment_handler__text_instead_attachment(
     assert message.state.fsm_storage.support_request.description == default_string
     assert not message.state.fsm_storage.support_request.attachments_names
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -541,6 +599,7 @@ async def test__add_attachment_handler__text_instead_attachment(
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
             silent_response=True,
         ),
+        wait_callback=False,
     )
 
 
@@ -572,7 +631,7 @@ async def test__add_attachment_handler__invalid_attachment(
     assert message.state.fsm_storage.support_request.description == default_string
     assert not message.state.fsm_storage.support_request.attachments_names
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -590,12 +649,10 @@ async def test__add_attachment_handler__invalid_attachment(
             ),
             silent_response=True,
         ),
+        wait_callback=False,
     )
 
 
-@patch(
-    "app.bot.commands.support_request.create.ServiceDeskRepo.get_user_attachments_names"
-)
 @patch("app.bot.commands.support_request.create.ServiceDeskRepo.add_user_attachment")
 @patch(
     "app.bot.commands.support_request.create.ServiceDeskRepo.is_valid_attachment",
@@ -604,7 +661,6 @@ async def test__add_attachment_handler__invalid_attachment(
 async def test__add_attachment_handler__valid_attachment(  # noqa: WPS218
     mocked_is_valid_attachment: MagicMock,
     mocked_add_user_attachment: MagicMock,
-    mocked_get_user_attachments_names: MagicMock,
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
     incoming_attachment: AttachmentDocument,
@@ -614,8 +670,10 @@ async def test__add_attachment_handler__valid_attachment(  # noqa: WPS218
 ) -> None:
     # - Arrange -
     message = incoming_message_factory(body="", file=incoming_attachment)
-    support_request = SupportRequestInCreation(description=default_string)
-    mocked_get_user_attachments_names.return_value = default_list
+    support_request = SupportRequestInCreation(
+        description=default_string, attachments_names=[default_list[0]]
+    )
+    mocked_add_user_attachment.return_value = default_list[1]
     await fsm_session.change_state(
         state=CreateSupportRequestStates.ADD_ATTACHMENT, support_request=support_request
     )
@@ -626,18 +684,19 @@ async def test__add_attachment_handler__valid_attachment(  # noqa: WPS218
     # - Assert -
     assert mocked_is_valid_attachment.call_count == 1
     assert mocked_add_user_attachment.call_count == 1
-    assert mocked_get_user_attachments_names.call_count == 1
     assert await fsm_session.get_state() == CreateSupportRequestStates.ADD_ATTACHMENT
     assert message.state.fsm_storage.support_request.description == default_string
-    assert message.state.fsm_storage.support_request.attachments_names == default_list
+    assert message.state.fsm_storage.support_request.attachments_names == sorted(
+        default_list
+    )
     bot.send.assert_awaited_once_with(  # type: ignore
         message=OutgoingMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
                 "**Прикрепленные файл(ы):**\n"
-                "lorem ipsum\n"
-                "dolor sit amet\n\n"
+                "dolor sit amet\n"
+                "lorem ipsum\n\n"
                 "Отправленные Вами файлы для удобства не отображаются в чате. "
                 "Если все необходимые файлы загружены, нажмите кнопку "
                 "**Отправить обращение**. "
@@ -702,11 +761,7 @@ async def test__add_attachment_handler__skip_command(
     )
 
 
-@patch(
-    "app.bot.commands.support_request.create.ServiceDeskRepo.get_user_attachments_names"
-)
 async def test__add_attachment_handler__confirm_request_command(
-    mocked_get_user_attachments_names: MagicMock,
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
     fsm_session: FSM,
@@ -718,7 +773,6 @@ async def test__add_attachment_handler__confirm_request_command(
     support_request = SupportRequestInCreation(
         description=default_string, attachments_names=default_list
     )
-    mocked_get_user_attachments_names.return_value = default_list
     await fsm_session.change_state(
         state=CreateSupportRequestStates.ADD_ATTACHMENT, support_request=support_request
     )
@@ -776,7 +830,7 @@ async def test__add_confirm_request_handler__empty_message(
     assert await fsm_session.get_state() == CreateSupportRequestStates.CONFIRM_REQUEST
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -786,6 +840,7 @@ async def test__add_confirm_request_handler__empty_message(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -811,7 +866,7 @@ async def test__add_confirm_request_handler__undefined_command(
     assert await fsm_session.get_state() == CreateSupportRequestStates.CONFIRM_REQUEST
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -821,6 +876,7 @@ async def test__add_confirm_request_handler__undefined_command(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -875,7 +931,7 @@ async def test__add_confirm_request_handler__update_request_command(
     # - Assert -
     assert await fsm_session.get_state() == UpdateSupportRequestStates.SELECT_ATTRIBUTE
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body="Какое поле в обращении Вы хотите изменить?",
@@ -892,4 +948,5 @@ async def test__add_confirm_request_handler__update_request_command(
                 ]
             ),
         ),
+        wait_callback=False,
     )
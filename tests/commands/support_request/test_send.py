@@ -5,11 +5,12 @@ from pybotx import Bot, BubbleMarkup, Button, IncomingMessage, OutgoingMessage
 from pybotx_fsm import FSM
 
 from app.bot.states.support_request import CreateSupportRequestStates
-from app.schemas.support_request import SupportRequestToSend
+from app.schemas.support_request import RequestAttachment, SupportRequestToSend
 
 
 @patch(
-    "app.bot.commands.support_request.send.ServiceDeskRepo.delete_user_attachments",
+    "app.bot.commands.support_request.send.ServiceDeskRepo."
+    "delete_user_attachments_in_background",
     new_callable=AsyncMock,
 )
 @patch(
@@ -25,11 +26,11 @@ from app.schemas.support_request import SupportRequestToSend
     new_callable=AsyncMock,
 )
 @patch(
-    "app.bot.commands.support_request.send.search_user_on_each_cts",
+    "app.bot.commands.support_request.send.search_user_with_cache",
     new_callable=AsyncMock,
 )
 async def test__send_support_request(
-    mocked_search_user_on_each_cts: AsyncMock,
+    mocked_search_user_with_cache: AsyncMock,
     mocked_get_user_attachments: AsyncMock,
     mocked_send_mail: AsyncMock,
     mocked_get_ews_account: AsyncMock,
@@ -52,13 +53,13 @@ async def test__send_support_request(
     mocked_user = Mock()
     mocked_user.emails = []
     mocked_cts = Mock()
-    mocked_search_user_on_each_cts.return_value = (mocked_user, mocked_cts)
+    mocked_search_user_with_cache.return_value = (mocked_user, mocked_cts)
 
     # - Act -
     await bot.async_execute_bot_command(message)
 
     # - Assert -
-    assert mocked_search_user_on_each_cts.call_count == 1
+    assert mocked_search_user_with_cache.call_count == 1
     assert mocked_get_user_attachments.call_count == 1
     assert mocked_send_mail.call_count == 1
     assert mocked_get_ews_account.call_count == 1
@@ -80,3 +81,117 @@ async def test__send_support_request(
             ),
         ),
     )
+
+
+@patch(
+    "app.bot.commands.support_request.send.ServiceDeskRepo."
+    "delete_user_attachments_in_background",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.bot.commands.support_request.send.get_ews_account",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.bot.commands.support_request.send.ExchangeRepo.send_mail",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.bot.commands.support_request.send.ServiceDeskRepo.get_user_attachments",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.bot.commands.support_request.send.search_user_with_cache",
+    new_callable=AsyncMock,
+)
+async def test__send_support_request__attachments_missing(
+    mocked_search_user_with_cache: AsyncMock,
+    mocked_get_user_attachments: AsyncMock,
+    mocked_send_mail: AsyncMock,
+    mocked_get_ews_account: AsyncMock,
+    mocked_delete_user_attachments: AsyncMock,
+    bot: Bot,
+    fsm_session: FSM,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    default_string: str,
+) -> None:
+    # - Arrange -
+    await fsm_session.change_state(
+        state=CreateSupportRequestStates.CONFIRM_REQUEST,
+        support_request=SupportRequestToSend(
+            subject=default_string,
+            description=default_string,
+            attachments_names=["first.txt", "second.txt"],
+        ),
+    )
+    message = incoming_message_factory(body="/send-request")
+
+    mocked_user = Mock()
+    mocked_user.emails = []
+    mocked_search_user_with_cache.return_value = (mocked_user, Mock())
+    mocked_get_user_attachments.return_value = [
+        RequestAttachment(name="first.txt", data=b"content")
+    ]
+
+    # - Act -
+    await bot.async_execute_bot_command(message)
+
+    # - Assert -
+    assert mocked_send_mail.call_count == 0
+    assert mocked_delete_user_attachments.call_count == 1
+    bot.answer_message.assert_awaited_once()  # type: ignore
+    assert bot.answer_message.call_args.kwargs["body"] == (  # type: ignore
+        "Не удалось отправить обращение: прикрепленные файлы были удалены.\n"
+        "Пожалуйста, оформите обращение заново."
+    )
+
+
+@patch("app.bot.commands.support_request.send.TimedSteps.log_timings")
+@patch(
+    "app.bot.commands.support_request.send.get_ews_account",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.bot.commands.support_request.send.ExchangeRepo.send_mail",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.bot.commands.support_request.send.ServiceDeskRepo.get_user_attachments",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.bot.commands.support_request.send.search_user_with_cache",
+    new_callable=AsyncMock,
+)
+async def test__send_support_request__timings_logged_on_error(
+    mocked_search_user_with_cache: AsyncMock,
+    mocked_get_user_attachments: AsyncMock,
+    mocked_send_mail: AsyncMock,
+    mocked_get_ews_account: AsyncMock,
+    mocked_log_timings: Mock,
+    bot: Bot,
+    fsm_session: FSM,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    default_string: str,
+) -> None:
+    # - Arrange -
+    await fsm_session.change_state(
+        state=CreateSupportRequestStates.CONFIRM_REQUEST,
+        support_request=SupportRequestToSend(
+            subject=default_string,
+            description=default_string,
+        ),
+    )
+    message = incoming_message_factory(body="/send-request")
+
+    mocked_user = Mock()
+    mocked_user.emails = []
+    mocked_search_user_with_cache.return_value = (mocked_user, Mock())
+    mocked_send_mail.side_effect = ConnectionError
+
+    # - Act -
+    await bot.async_execute_bot_command(message)
+
+    # - Assert -
+    assert mocked_send_mail.call_count == 1
+    mocked_log_timings.assert_called_once_with()
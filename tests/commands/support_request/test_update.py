@@ -20,6 +20,7 @@ from app.schemas.support_request import (
     SupportRequestInCreation,
     SupportRequestInUpdating,
 )
+from app.services.answer_delivery import FireAndForgetMessage
 
 
 async def test__update_support_request_handler(
@@ -44,7 +45,7 @@ async def test__update_support_request_handler(
     # - Assert -
     assert await fsm_session.get_state() == UpdateSupportRequestStates.SELECT_ATTRIBUTE
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body="Какое поле в обращении Вы хотите изменить?",
@@ -61,6 +62,7 @@ async def test__update_support_request_handler(
                 ]
             ),
         ),
+        wait_callback=False,
     )
 
 
@@ -86,7 +88,7 @@ async def test__select_updating_attribute_handler__empty_message(
     assert await fsm_session.get_state() == UpdateSupportRequestStates.SELECT_ATTRIBUTE
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body="Какое поле в обращении Вы хотите изменить?",
@@ -103,6 +105,7 @@ async def test__select_updating_attribute_handler__empty_message(
                 ]
             ),
         ),
+        wait_callback=False,
     )
 
 
@@ -131,7 +134,7 @@ async def test__select_updating_attribute_handler__update_description_command(
     )
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -143,6 +146,7 @@ async def test__select_updating_attribute_handler__update_description_command(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -168,7 +172,7 @@ async def test__select_updating_attribute_handler__update_attachment_command(
     assert await fsm_session.get_state() == UpdateSupportRequestStates.ADD_ATTACHMENT
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -182,6 +186,7 @@ async def test__select_updating_attribute_handler__update_attachment_command(
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
             silent_response=True,
         ),
+        wait_callback=False,
     )
 
 
@@ -207,7 +212,7 @@ async def test__select_updating_attribute_handler__text_instead_command(
     assert await fsm_session.get_state() == UpdateSupportRequestStates.SELECT_ATTRIBUTE
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body="Какое поле в обращении Вы хотите изменить?",
@@ -224,6 +229,7 @@ async def test__select_updating_attribute_handler__text_instead_command(
                 ]
             ),
         ),
+        wait_callback=False,
     )
 
 
@@ -252,7 +258,7 @@ async def test__enter_new_description_handler__empty_message(
     )
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -264,6 +270,7 @@ async def test__enter_new_description_handler__empty_message(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -293,7 +300,7 @@ async def test__enter_new_description_handler__max_description_length_exceeded(
     )
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -302,6 +309,7 @@ async def test__enter_new_description_handler__max_description_length_exceeded(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -378,7 +386,7 @@ async def test__add_attachment_handler__text_instead_attachment(
     assert message.state.fsm_storage.support_request.description == default_string
     assert not message.state.fsm_storage.support_request.attachments_names
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -390,6 +398,7 @@ async def test__add_attachment_handler__text_instead_attachment(
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
             silent_response=True,
         ),
+        wait_callback=False,
     )
 
 
@@ -428,7 +437,7 @@ async def test__add_attachment_handler__invalid_attachment(
     assert message.state.fsm_storage.support_request.description == default_string
     assert not message.state.fsm_storage.support_request.attachments_names
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -446,6 +455,7 @@ async def test__add_attachment_handler__invalid_attachment(
             ),
             silent_response=True,
         ),
+        wait_callback=False,
     )
 
 
@@ -453,9 +463,6 @@ async def test__add_attachment_handler__invalid_attachment(
     "app.bot.commands.support_request.update.ServiceDeskRepo.delete_user_attachments",
     new_callable=AsyncMock,
 )
-@patch(
-    "app.bot.commands.support_request.update.ServiceDeskRepo.get_user_attachments_names"
-)
 @patch("app.bot.commands.support_request.update.ServiceDeskRepo.add_user_attachment")
 @patch(
     "app.bot.commands.support_request.update.ServiceDeskRepo.is_valid_attachment",
@@ -464,7 +471,6 @@ async def test__add_attachment_handler__invalid_attachment(
 async def test__add_attachment_handler__valid_attachment(  # noqa: WPS218
     mocked_is_valid_attachment: MagicMock,
     mocked_add_user_attachment: MagicMock,
-    mocked_get_user_attachments_names: MagicMock,
     mocked_delete_user_attachments: AsyncMock,
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
@@ -475,8 +481,10 @@ async def test__add_attachment_handler__valid_attachment(  # noqa: WPS218
 ) -> None:
     # - Arrange -
     message = incoming_message_factory(body="", file=incoming_attachment)
-    support_request = SupportRequestInCreation(description=default_string)
-    mocked_get_user_attachments_names.return_value = default_list
+    support_request = SupportRequestInCreation(
+        description=default_string, attachments_names=[default_list[0]]
+    )
+    mocked_add_user_attachment.return_value = default_list[1]
     await fsm_session.change_state(
         state=UpdateSupportRequestStates.ADD_ATTACHMENT,
         support_request=support_request,
@@ -489,18 +497,19 @@ async def test__add_attachment_handler__valid_attachment(  # noqa: WPS218
     assert mocked_delete_user_attachments.call_count == 0
     assert mocked_is_valid_attachment.call_count == 1
     assert mocked_add_user_attachment.call_count == 1
-    assert mocked_get_user_attachments_names.call_count == 1
     assert await fsm_session.get_state() == UpdateSupportRequestStates.ADD_ATTACHMENT
     assert message.state.fsm_storage.support_request.description == default_string
-    assert message.state.fsm_storage.support_request.attachments_names == default_list
+    assert message.state.fsm_storage.support_request.attachments_names == sorted(
+        default_list
+    )
     bot.send.assert_awaited_once_with(  # type: ignore
         message=OutgoingMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
                 "**Прикрепленные файл(ы):**\n"
-                "lorem ipsum\n"
-                "dolor sit amet\n\n"
+                "dolor sit amet\n"
+                "lorem ipsum\n\n"
                 "Отправленные Вами файлы для удобства не отображаются в чате. "
                 "Если все необходимые файлы загружены, нажмите кнопку "
                 "**Отправить обращение**. "
@@ -570,11 +579,7 @@ async def test__add_attachment_handler__skip_command(
     "app.bot.commands.support_request.update.ServiceDeskRepo.delete_user_attachments",
     new_callable=AsyncMock,
 )
-@patch(
-    "app.bot.commands.support_request.update.ServiceDeskRepo.get_user_attachments_names"
-)
 async def test__add_attachment_handler__confirm_request_command(
-    mocked_get_user_attachments_names: MagicMock,
     mocked_delete_user_attachments: AsyncMock,
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
@@ -587,7 +592,6 @@ async def test__add_attachment_handler__confirm_request_command(
     support_request = SupportRequestInCreation(
         description=default_string, attachments_names=default_list
     )
-    mocked_get_user_attachments_names.return_value = default_list
     await fsm_session.change_state(
         state=UpdateSupportRequestStates.ADD_ATTACHMENT,
         support_request=support_request,
@@ -597,7 +601,6 @@ async def test__add_attachment_handler__confirm_request_command(
     await bot.async_execute_bot_command(message)
 
     # - Assert -
-    assert mocked_get_user_attachments_names.call_count == 1
     assert mocked_delete_user_attachments.call_count == 0
     assert await fsm_session.get_state() == CreateSupportRequestStates.CONFIRM_REQUEST
     assert message.state.fsm_storage.support_request.description == default_string
@@ -1,11 +1,20 @@
+import asyncio
+import signal
 from http import HTTPStatus
-from typing import Dict
+from typing import Any, Dict
+from unittest.mock import AsyncMock, Mock
 from uuid import UUID
 
+import httpx
+import pytest
+from asgi_lifespan import LifespanManager
 from fastapi.testclient import TestClient
 from pybotx import Bot
 
-from app.main import get_application
+from app.api.endpoints import botx
+from app.main import _handle_sigterm, get_application  # noqa: WPS450
+from app.services.command_admission import CommandAdmission
+from app.settings import settings
 
 
 def test__web_app__bot_status_response_ok(
@@ -239,3 +248,179 @@ def test__web_app__unsupported_bot_api_version_service_unavailable(
         "Unsupported Bot API version: `3`. "
         "Set protocol version to `4` in Admin panel."
     )
+
+
+def build_command_payload(bot_id: UUID, host: str) -> Dict[str, Any]:
+    return {
+        "bot_id": str(bot_id),
+        "command": {
+            "body": "/справка",
+            "command_type": "user",
+            "data": {},
+            "metadata": {},
+        },
+        "attachments": [],
+        "async_files": [],
+        "entities": [],
+        "source_sync_id": None,
+        "sync_id": "6f40a492-4b5f-54f3-87ee-77126d825b51",
+        "from": {
+            "ad_domain": None,
+            "ad_login": None,
+            "app_version": None,
+            "chat_type": "chat",
+            "device": None,
+            "device_meta": {
+                "permissions": None,
+                "pushes": False,
+                "timezone": "Europe/Moscow",
+            },
+            "device_software": None,
+            "group_chat_id": "30dc1980-643a-00ad-37fc-7cc10d74e935",
+            "host": host,
+            "is_admin": True,
+            "is_creator": True,
+            "locale": "en",
+            "manufacturer": None,
+            "platform": None,
+            "platform_package_id": None,
+            "user_huid": "f16cdc5f-6366-5552-9ecd-c36290ab3d11",
+            "username": None,
+        },
+        "proto_version": 4,
+    }
+
+
+def test__web_app__queued_bot_command_accepted(
+    bot_id: UUID,
+    host: str,
+    bot: Bot,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    payload = build_command_payload(bot_id, host)
+    enqueue_bot_command = AsyncMock()
+    monkeypatch.setattr(settings, "BOTX_COMMANDS_QUEUE_ENABLED", True)
+    monkeypatch.setattr(botx, "enqueue_bot_command", enqueue_bot_command)
+
+    # - Act -
+    with TestClient(get_application()) as test_client:
+        response = test_client.post(
+            "/command",
+            json=payload,
+        )
+
+    # - Assert -
+    assert response.status_code == HTTPStatus.ACCEPTED
+    enqueue_bot_command.assert_awaited_once_with(payload)
+
+
+def test__web_app__queued_unknown_bot_response_service_unavailable(
+    host: str,
+    bot: Bot,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    payload = build_command_payload(UUID("c755e147-30a5-45df-b46a-c75aa6089c8f"), host)
+    enqueue_bot_command = AsyncMock()
+    monkeypatch.setattr(settings, "BOTX_COMMANDS_QUEUE_ENABLED", True)
+    monkeypatch.setattr(botx, "enqueue_bot_command", enqueue_bot_command)
+
+    # - Act -
+    with TestClient(get_application()) as test_client:
+        response = test_client.post(
+            "/command",
+            json=payload,
+        )
+
+    # - Assert -
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+    status_message = response.json()["error_data"]["status_message"]
+    assert status_message == (
+        "No credentials for bot c755e147-30a5-45df-b46a-c75aa6089c8f"
+    )
+    enqueue_bot_command.assert_not_awaited()
+
+
+def test__web_app__bot_command_over_limit_service_unavailable(
+    bot_id: UUID,
+    host: str,
+    bot: Bot,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    payload = build_command_payload(bot_id, host)
+    monkeypatch.setattr(CommandAdmission, "acquire", AsyncMock(return_value=False))
+
+    # - Act -
+    with TestClient(get_application()) as test_client:
+        response = test_client.post(
+            "/command",
+            json=payload,
+        )
+
+    # - Assert -
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "5"
+
+    status_message = response.json()["error_data"]["status_message"]
+    assert status_message == "Too many commands in progress, retry later"
+
+
+async def test__web_app__sigterm_drains_commands_before_server_stops(
+    bot_id: UUID,
+    host: str,
+    bot: Bot,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    raise_signal = Mock()
+    monkeypatch.setattr(signal, "raise_signal", raise_signal)
+
+    fastapi_app = get_application()
+    async with LifespanManager(fastapi_app):
+        command_admission = fastapi_app.state.bot.state.command_admission
+        assert await command_admission.acquire()
+
+        callbacks_manager = fastapi_app.state.bot._callbacks_manager  # noqa: WPS437
+        await callbacks_manager.create_botx_method_callback(
+            UUID("21a9ec9e-f21f-4406-ac44-1a78d2ccf9e3")
+        )
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=fastapi_app),
+            base_url="http://testserver",
+        ) as client:
+            # - Act -
+            _handle_sigterm(fastapi_app.state.bot)
+
+            command_response = await client.post(
+                "/command", json=build_command_payload(bot_id, host)
+            )
+            callback_response = await client.post(
+                "/notification/callback",
+                json={
+                    "status": "ok",
+                    "sync_id": "21a9ec9e-f21f-4406-ac44-1a78d2ccf9e3",
+                    "result": {},
+                },
+            )
+
+            # - Assert -
+            # Server is still listening, new commands are rejected
+            assert command_response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+            assert command_response.headers["Retry-After"] == "5"
+            status_message = command_response.json()["error_data"]["status_message"]
+            assert status_message == "Bot is shutting down, retry later"
+
+            # Callbacks are still handled by bot
+            assert callback_response.status_code == HTTPStatus.ACCEPTED
+
+            # Server is stopped only after command in progress is handled
+            raise_signal.assert_not_called()
+
+            command_admission.release()
+            await asyncio.sleep(0.1)
+
+            raise_signal.assert_called_once_with(signal.SIGINT)
@@ -0,0 +1,23 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+from pybotx import Bot
+
+from app.main import get_application
+
+
+def test__web_app__metrics(bot: Bot) -> None:
+    # - Act -
+    with TestClient(get_application()) as test_client:
+        response = test_client.get("/metrics")
+
+    # - Assert -
+    assert response.status_code == HTTPStatus.OK
+
+    pools_stats = response.json()["redis_pools"]
+    assert pools_stats
+    assert all(pool_stats["created"] >= 0 for pool_stats in pools_stats.values())
+
+    commands_stats = response.json()["botx_commands"]
+    assert commands_stats["in_flight"] == 0
+    assert commands_stats["rejected"] == 0
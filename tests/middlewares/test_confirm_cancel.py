@@ -1,5 +1,5 @@
 from typing import Callable
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, patch
 
 from pybotx import (
     Bot,
@@ -13,6 +13,7 @@ from pybotx_fsm import FSM
 
 from app.bot.states.support_request import CreateSupportRequestStates
 from app.schemas.support_request import SupportRequestInCreation
+from app.services.answer_delivery import FireAndForgetMessage
 
 
 async def test__confirm_cancel_middleware__cancel_command(
@@ -106,7 +107,7 @@ async def test__confirm_cancel_middleware__other_command(
         == CreateSupportRequestStates.WAIT_DECISION_ON_ATTACHMENT  # noqa: W503
     )
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -124,6 +125,7 @@ async def test__confirm_cancel_middleware__other_command(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
 
 
@@ -172,9 +174,7 @@ async def test__confirm_cancel_middleware__refuse_cancel_command__confirm_reques
     )
 
 
-@patch("app.bot.middlewares.confirm_cancel.ServiceDeskRepo.get_user_attachments_names")
 async def test__confirm_cancel_middleware__refuse_command__add_first_attachment_state(
-    mocked_get_user_attachments_names: MagicMock,
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
     fsm_session: FSM,
@@ -187,20 +187,18 @@ async def test__confirm_cancel_middleware__refuse_command__add_first_attachment_
         state=CreateSupportRequestStates.ADD_ATTACHMENT,
         support_request=SupportRequestInCreation(
             description=default_string,
-            attachments_names=default_list,
+            attachments_names=[],
         ),
     )
-    mocked_get_user_attachments_names.return_value = []
 
     # - Act -
     await bot.async_execute_bot_command(message)
 
     # - Assert -
-    assert mocked_get_user_attachments_names.call_count == 1
     assert await fsm_session.get_state() == CreateSupportRequestStates.ADD_ATTACHMENT
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -214,12 +212,11 @@ async def test__confirm_cancel_middleware__refuse_command__add_first_attachment_
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
             silent_response=True,
         ),
+        wait_callback=False,
     )
 
 
-@patch("app.bot.middlewares.confirm_cancel.ServiceDeskRepo.get_user_attachments_names")
 async def test__confirm_cancel_middleware__refuse_command__add_attachment_state(
-    mocked_get_user_attachments_names: MagicMock,
     bot: Bot,
     incoming_message_factory: Callable[..., IncomingMessage],
     fsm_session: FSM,
@@ -235,13 +232,11 @@ async def test__confirm_cancel_middleware__refuse_command__add_attachment_state(
             attachments_names=default_list,
         ),
     )
-    mocked_get_user_attachments_names.return_value = default_list
 
     # - Act -
     await bot.async_execute_bot_command(message)
 
     # - Assert -
-    assert mocked_get_user_attachments_names.call_count == 1
     assert await fsm_session.get_state() == CreateSupportRequestStates.ADD_ATTACHMENT
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
@@ -291,7 +286,7 @@ async def test__confirm_cancel_middleware__refuse_command__other_state(
     )
     assert message.state.fsm_storage.support_request.description == default_string
     bot.send.assert_awaited_once_with(  # type: ignore
-        message=OutgoingMessage(
+        message=FireAndForgetMessage(
             bot_id=message.bot.id,
             chat_id=message.chat.id,
             body=(
@@ -309,4 +304,5 @@ async def test__confirm_cancel_middleware__refuse_command__other_state(
             ),
             keyboard=KeyboardMarkup([[Button(command="/cancel", label="ОТМЕНА")]]),
         ),
+        wait_callback=False,
     )
@@ -0,0 +1,28 @@
+from typing import Callable
+
+from pybotx import Bot, IncomingMessage
+
+from app.caching.redis_client import get_redis_client
+from app.resources import strings
+from app.services.user_locks import UserLocks
+
+
+async def test__user_lock_middleware__previous_message_in_progress(
+    bot: Bot,
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    message = incoming_message_factory(body="/справка")
+    user_locks = UserLocks(redis=get_redis_client(), ttl=5, wait_timeout=0.1)
+    bot.state.user_locks = user_locks
+
+    # - Act -
+    async with user_locks.lock(message.sender.huid):
+        await bot.async_execute_bot_command(message)
+
+    # - Assert -
+    bot.send.assert_not_awaited()  # type: ignore
+    bot.answer_message.assert_awaited_once()  # type: ignore
+    assert bot.answer_message.call_args.kwargs["body"] == (  # type: ignore
+        strings.PREVIOUS_MESSAGE_IN_PROGRESS_MESSAGE
+    )
@@ -1,9 +1,16 @@
+import asyncio
 import os
 from pathlib import Path
 
+from pybotx import Bot
 from pybotx.models.attachments import AttachmentDocument
 
-from app.db.repositories.service_desk import ServiceDeskRepo
+from app.db.repositories import service_desk
+from app.db.repositories.service_desk import (
+    DELETED_DIR_SUFFIX,
+    ServiceDeskRepo,
+    delete_expired_attachments,
+)
 from app.schemas.support_request import RequestAttachment
 
 
@@ -38,7 +45,7 @@ async def test__add_user_attachments(
     incoming_attachment: AttachmentDocument,
 ) -> None:
     # - Act -
-    service_desk_repo.add_user_attachment(user_attachment=incoming_attachment)
+    await service_desk_repo.add_user_attachment(user_attachment=incoming_attachment)
 
     # - Assert -
     assert service_desk_repo.get_user_attachments_names() == [
@@ -53,10 +60,10 @@ async def test__add_user_attachments__same_names(
     incoming_attachment: AttachmentDocument,
 ) -> None:
     # - Arrange -
-    service_desk_repo.add_user_attachment(user_attachment=incoming_attachment)
+    await service_desk_repo.add_user_attachment(user_attachment=incoming_attachment)
 
     # - Act -
-    service_desk_repo.add_user_attachment(user_attachment=incoming_attachment)
+    await service_desk_repo.add_user_attachment(user_attachment=incoming_attachment)
 
     # - Assert -
     assert service_desk_repo.get_user_attachments_names() == [
@@ -72,7 +79,7 @@ async def test__get_user_attachments_names(
     incoming_attachment: AttachmentDocument,
 ) -> None:
     # - Arrange -
-    service_desk_repo.add_user_attachment(user_attachment=incoming_attachment)
+    await service_desk_repo.add_user_attachment(user_attachment=incoming_attachment)
 
     # - Act -
     received_names = service_desk_repo.get_user_attachments_names()
@@ -197,3 +204,109 @@ async def test__get_user_attachments__empty_directory(
     # - Assert -
     assert isinstance(received_attachments, list)
     assert not received_attachments
+
+
+async def test__add_user_attachments__same_names_from_manifest(
+    service_desk_repo: ServiceDeskRepo,
+    user_attachments_path: Path,
+    incoming_attachment: AttachmentDocument,
+) -> None:
+    # - Arrange -
+    attachments_names = ["attachment.txt", "attachment (1).txt"]
+
+    # - Act -
+    attachment_name = await service_desk_repo.add_user_attachment(
+        user_attachment=incoming_attachment, attachments_names=attachments_names
+    )
+
+    # - Assert -
+    assert attachment_name == "attachment (2).txt"
+    assert service_desk_repo.get_user_attachments_names() == [
+        "attachment (2).txt",
+        "default.txt",
+    ]
+
+
+async def test__delete_expired_attachments(
+    user_attachments_path: Path,
+) -> None:
+    # - Arrange -
+    os.utime(user_attachments_path, (0, 0))
+
+    # - Act -
+    await delete_expired_attachments(max_age_sec=60)
+
+    # - Assert -
+    assert not os.path.exists(user_attachments_path)
+
+
+async def test__delete_expired_attachments__fresh_directory(
+    user_attachments_path: Path,
+) -> None:
+    # - Act -
+    await delete_expired_attachments(max_age_sec=60)
+
+    # - Assert -
+    assert os.path.exists(user_attachments_path)
+
+
+async def test__delete_expired_attachments__request_in_progress(
+    user_attachments_path: Path,
+) -> None:
+    # - Arrange -
+    os.utime(user_attachments_path, (0, 0))
+
+    # - Act -
+    await delete_expired_attachments(
+        max_age_sec=60, users_in_progress={user_attachments_path.name}
+    )
+
+    # - Assert -
+    assert os.path.exists(user_attachments_path)
+
+
+async def test__delete_expired_attachments__storage_usage_set(
+    bot: Bot,
+    user_attachments_path: Path,
+) -> None:
+    # - Arrange -
+    storage_usage_repo = bot.state.storage_usage_repo
+    await storage_usage_repo.set_usage(1000)
+
+    # - Act -
+    await delete_expired_attachments(
+        max_age_sec=60, storage_usage_repo=storage_usage_repo
+    )
+
+    # - Assert -
+    assert await storage_usage_repo.get_usage() == len("some content")
+
+
+async def test__delete_user_attachments_in_background(
+    service_desk_repo: ServiceDeskRepo,
+    user_attachments_path: Path,
+) -> None:
+    # - Act -
+    await service_desk_repo.delete_user_attachments_in_background()
+
+    # - Assert -
+    assert not os.path.exists(user_attachments_path)
+
+    await asyncio.gather(*service_desk._deletion_tasks)  # noqa: WPS437
+    assert not list(user_attachments_path.parent.iterdir())
+
+
+async def test__delete_expired_attachments__detached_directory(
+    user_attachments_path: Path,
+) -> None:
+    # - Arrange -
+    detached_path = user_attachments_path.with_name(
+        f"{user_attachments_path.name}.0123{DELETED_DIR_SUFFIX}"
+    )
+    user_attachments_path.rename(detached_path)
+
+    # - Act -
+    await delete_expired_attachments(max_age_sec=60)
+
+    # - Assert -
+    assert not os.path.exists(detached_path)
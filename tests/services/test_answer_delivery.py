@@ -0,0 +1,102 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+from pybotx import Bot, OutgoingMessage
+from pybotx.models.method_callbacks import (
+    BotAPIMethodFailedCallback,
+    BotAPIMethodSuccessfulCallback,
+)
+
+from app.services import answer_delivery
+from app.services.answer_delivery import (
+    fire_and_forget,
+    send_answer,
+    wait_delivery_checks,
+)
+
+
+@fire_and_forget
+def build_prompt_message(bot_id: UUID) -> OutgoingMessage:
+    return OutgoingMessage(
+        bot_id=bot_id,
+        chat_id=UUID("338dc685-efd7-49ba-ac64-7bcb38fdf099"),
+        body="prompt",
+    )
+
+
+async def test__send_answer__waited_message(
+    bot: Bot,
+    bot_id: UUID,
+) -> None:
+    # - Arrange -
+    message = OutgoingMessage(
+        bot_id=bot_id,
+        chat_id=UUID("338dc685-efd7-49ba-ac64-7bcb38fdf099"),
+        body="result",
+    )
+
+    # - Act -
+    await send_answer(bot, message)
+
+    # - Assert -
+    bot.send.assert_awaited_once_with(message=message)  # type: ignore
+
+
+async def test__send_answer__fire_and_forget_message_failed(
+    bot: Bot,
+    bot_id: UUID,
+) -> None:
+    # - Arrange -
+    message = build_prompt_message(bot_id)
+    callback = BotAPIMethodFailedCallback(
+        sync_id=bot.send.return_value,  # type: ignore
+        status="error",
+        reason="chat_not_found",
+        errors=[],
+        error_data={},
+    )
+
+    # - Act -
+    with patch.object(
+        bot, "wait_botx_method_callback", AsyncMock(return_value=callback)
+    ), patch.object(answer_delivery, "logger") as logger:
+        await send_answer(bot, message)
+        await asyncio.gather(*answer_delivery._delivery_checks)  # noqa: WPS437
+
+    # - Assert -
+    bot.send.assert_awaited_once_with(  # type: ignore
+        message=message,
+        wait_callback=False,
+    )
+    logger.error.assert_called_once()
+    assert f"Message `{callback.sync_id}` wasn't delivered" in (
+        logger.error.call_args.args[0]
+    )
+
+
+async def test__wait_delivery_checks__callback_not_received_in_time(
+    bot: Bot,
+    bot_id: UUID,
+) -> None:
+    # - Arrange -
+    message = build_prompt_message(bot_id)
+    callback_received = asyncio.Event()
+
+    async def wait_botx_method_callback(  # noqa: WPS430
+        sync_id: UUID,
+    ) -> BotAPIMethodSuccessfulCallback:
+        await callback_received.wait()
+        return BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+
+    # - Act -
+    with patch.object(bot, "wait_botx_method_callback", wait_botx_method_callback):
+        await send_answer(bot, message)
+        is_waited = await wait_delivery_checks(timeout=0.01)
+
+        callback_received.set()
+        is_waited_after_callback = await wait_delivery_checks(timeout=1)
+
+    # - Assert -
+    assert not is_waited
+    assert is_waited_after_callback
@@ -0,0 +1,48 @@
+import asyncio
+from uuid import UUID
+
+import pytest
+
+from app.db.repositories import service_desk
+from app.services import botx_user_search
+from app.services.background_tasks import wait_background_tasks
+
+
+async def test__wait_background_tasks__attachments_deletion_in_progress(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    deletion_event = asyncio.Event()
+    deletion_task = asyncio.create_task(deletion_event.wait())
+    monkeypatch.setattr(service_desk, "_deletion_tasks", {deletion_task})
+
+    # - Act -
+    is_waited = await wait_background_tasks(timeout=0.01)
+    deletion_event.set()
+    is_waited_after_deletion = await wait_background_tasks(timeout=1)
+
+    # - Assert -
+    assert not is_waited
+    assert is_waited_after_deletion
+
+
+async def test__wait_background_tasks__user_search_in_progress(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    search_event = asyncio.Event()
+    search_task = asyncio.create_task(search_event.wait())
+    monkeypatch.setattr(
+        botx_user_search,
+        "_search_tasks",
+        {UUID("cd069aaa-46e6-4223-950b-ccea42b89c06"): search_task},
+    )
+
+    # - Act -
+    is_waited = await wait_background_tasks(timeout=0.01)
+    search_event.set()
+    is_waited_after_search = await wait_background_tasks(timeout=1)
+
+    # - Assert -
+    assert not is_waited
+    assert is_waited_after_search
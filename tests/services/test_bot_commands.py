@@ -0,0 +1,108 @@
+import inspect
+from uuid import UUID
+
+import jwt
+import pytest
+from pybotx import (
+    Bot,
+    RequestHeadersNotProvidedError,
+    UnknownBotAccountError,
+    UnverifiedRequestError,
+)
+
+from app.services.bot_commands import execute_raw_bot_command, validate_raw_bot_command
+from tests.endpoints.test_botx import build_command_payload
+
+
+async def test__execute_raw_bot_command__handler_awaited(
+    bot: Bot,
+    bot_id: UUID,
+    host: str,
+) -> None:
+    # - Arrange -
+    raw_bot_command = build_command_payload(bot_id, host)
+
+    # - Act -
+    await execute_raw_bot_command(bot, raw_bot_command)
+
+    # - Assert -
+    bot.send.assert_awaited_once()  # type: ignore
+    assert bot.send.call_args.kwargs["message"].bot_id == bot_id  # type: ignore
+
+
+async def test__execute_raw_bot_command__unknown_bot(
+    bot: Bot,
+    host: str,
+) -> None:
+    # - Arrange -
+    raw_bot_command = build_command_payload(
+        UUID("c755e147-30a5-45df-b46a-c75aa6089c8f"), host
+    )
+
+    # - Act -
+    with pytest.raises(UnknownBotAccountError):
+        await execute_raw_bot_command(bot, raw_bot_command)
+
+    # - Assert -
+    bot.send.assert_not_awaited()  # type: ignore
+
+
+def test__validate_raw_bot_command__verification_api_not_changed() -> None:
+    # Verification is called through private pybotx API, pybotx update must not
+    # silently break it
+    # - Act -
+    parameters = inspect.signature(Bot._verify_request).parameters  # noqa: WPS437
+
+    # - Assert -
+    assert list(parameters) == ["self", "headers", "trusted_issuers"]
+    assert parameters["trusted_issuers"].kind == inspect.Parameter.KEYWORD_ONLY
+    assert parameters["trusted_issuers"].default is None
+
+
+def test__validate_raw_bot_command__verified_request(
+    bot: Bot,
+    bot_id: UUID,
+    host: str,
+) -> None:
+    # - Arrange -
+    raw_bot_command = build_command_payload(bot_id, host)
+    [bot_account] = [
+        bot_account for bot_account in bot.bot_accounts if bot_account.id == bot_id
+    ]
+    token = jwt.encode(
+        {"aud": [str(bot_id)], "iss": host},
+        bot_account.secret_key,
+        algorithm="HS256",
+    )
+
+    # - Act -
+    bot_command = validate_raw_bot_command(
+        bot,
+        raw_bot_command,
+        verify_request=True,
+        request_headers={"authorization": f"Bearer {token}"},
+    )
+
+    # - Assert -
+    assert bot_command.bot.id == bot_id
+
+
+def test__validate_raw_bot_command__unverified_request(
+    bot: Bot,
+    bot_id: UUID,
+    host: str,
+) -> None:
+    # - Arrange -
+    raw_bot_command = build_command_payload(bot_id, host)
+
+    # - Act -
+    with pytest.raises(RequestHeadersNotProvidedError):
+        validate_raw_bot_command(bot, raw_bot_command, verify_request=True)
+
+    with pytest.raises(UnverifiedRequestError):
+        validate_raw_bot_command(
+            bot,
+            raw_bot_command,
+            verify_request=True,
+            request_headers={"authorization": "Bearer invalid"},
+        )
@@ -1,10 +1,27 @@
-from unittest.mock import AsyncMock
-from uuid import UUID
+import asyncio
+import dataclasses
+from typing import List
+from unittest.mock import AsyncMock, PropertyMock, patch
+from uuid import UUID, uuid4
 
 import pytest
-from pybotx import Bot, UserFromSearch, UserKinds, UserNotFoundError
+from pybotx import (
+    Bot,
+    BotAccountWithSecret,
+    UserFromSearch,
+    UserKinds,
+    UserNotFoundError,
+)
 
-from app.services.botx_user_search import UserIsBotError, search_user_on_each_cts
+from app.caching.redis_client import get_redis_client
+from app.caching.user_search_redis_repo import UserSearchRedisRepo
+from app.services import botx_user_search
+from app.services.botx_user_search import (
+    UserIsBotError,
+    prefetch_user,
+    search_user_on_each_cts,
+    search_user_with_cache,
+)
 
 
 async def test__search_user_on_each_cts__user_is_bot_error_raised(
@@ -78,3 +95,246 @@ async def test__search_user_on_each_cts(
     found_user, bot_account = search_result
     assert found_user is user
     assert bot_account is list(bot.bot_accounts)[0]
+
+
+@pytest.fixture
+def bot_accounts() -> List[BotAccountWithSecret]:
+    return [
+        BotAccountWithSecret(
+            id=UUID("b1e6b2f3-1c1f-4a8a-9a57-1b4b1c1f9d4a"),
+            cts_url="https://slow-cts.example.com",  # type: ignore[arg-type]
+            secret_key="secret",
+        ),
+        BotAccountWithSecret(
+            id=UUID("0f5c0b8e-2d6e-4d4f-8f62-5d2c1b6b8c3e"),
+            cts_url="https://cts.example.com",  # type: ignore[arg-type]
+            secret_key="secret",
+        ),
+    ]
+
+
+async def test__search_user_on_each_cts__slow_cts_cancelled(
+    bot: Bot,
+    bot_accounts: List[BotAccountWithSecret],
+) -> None:
+    # - Arrange -
+    slow_account, fast_account = bot_accounts
+    user = UserFromSearch(
+        huid=UUID("86c4814b-feee-4ff0-b04d-4b3226318078"),
+        ad_login=None,
+        ad_domain=None,
+        username="Test User",
+        company=None,
+        company_position=None,
+        department=None,
+        emails=[],
+        other_id=None,
+        user_kind=UserKinds.CTS_USER,
+    )
+    slow_search_cancelled = asyncio.Event()
+
+    async def search_user_by_huid(bot_id: UUID, huid: UUID) -> UserFromSearch:
+        if bot_id == fast_account.id:
+            return user
+
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            slow_search_cancelled.set()
+            raise
+
+        raise UserNotFoundError("not found")
+
+    bot.search_user_by_huid = search_user_by_huid  # type: ignore
+
+    # - Act -
+    with patch.object(
+        Bot, "bot_accounts", new_callable=PropertyMock, return_value=bot_accounts
+    ):
+        search_result = await search_user_on_each_cts(bot, user.huid)
+
+    # - Assert -
+    assert search_result == (user, fast_account)
+    assert slow_search_cancelled.is_set()
+
+
+async def test__search_user_on_each_cts__failed_cts_error_raised(
+    bot: Bot,
+    bot_accounts: List[BotAccountWithSecret],
+) -> None:
+    # - Arrange -
+    failed_account, _ = bot_accounts
+
+    async def search_user_by_huid(bot_id: UUID, huid: UUID) -> UserFromSearch:
+        if bot_id == failed_account.id:
+            raise asyncio.TimeoutError
+
+        raise UserNotFoundError("not found")
+
+    bot.search_user_by_huid = search_user_by_huid  # type: ignore
+
+    # - Act -
+    with patch.object(
+        Bot, "bot_accounts", new_callable=PropertyMock, return_value=bot_accounts
+    ):
+        with pytest.raises(asyncio.TimeoutError):
+            await search_user_on_each_cts(
+                bot, UUID("86c4814b-feee-4ff0-b04d-4b3226318078")
+            )
+
+
+async def test__search_user_on_each_cts__origin_cts_requested_first(
+    bot: Bot,
+    bot_accounts: List[BotAccountWithSecret],
+) -> None:
+    # - Arrange -
+    _, origin_account = bot_accounts
+    user = UserFromSearch(
+        huid=UUID("86c4814b-feee-4ff0-b04d-4b3226318078"),
+        ad_login=None,
+        ad_domain=None,
+        username="Test User",
+        company=None,
+        company_position=None,
+        department=None,
+        emails=[],
+        other_id=None,
+        user_kind=UserKinds.CTS_USER,
+    )
+    bot.search_user_by_huid = AsyncMock(return_value=user)  # type: ignore
+
+    # - Act -
+    with patch.object(
+        Bot, "bot_accounts", new_callable=PropertyMock, return_value=bot_accounts
+    ):
+        search_result = await search_user_on_each_cts(
+            bot, user.huid, origin_bot_id=origin_account.id
+        )
+
+    # - Assert -
+    assert search_result == (user, origin_account)
+    bot.search_user_by_huid.assert_awaited_once_with(  # type: ignore
+        bot_id=origin_account.id, huid=user.huid
+    )
+
+
+async def test__search_user_with_cache__cached_user(
+    bot: Bot,
+) -> None:
+    # - Arrange -
+    bot_account = list(bot.bot_accounts)[0]
+    user = UserFromSearch(
+        huid=uuid4(),
+        ad_login=None,
+        ad_domain=None,
+        username="Test User",
+        company=None,
+        company_position=None,
+        department=None,
+        emails=[],
+        other_id=None,
+        user_kind=UserKinds.CTS_USER,
+    )
+    bot.search_user_by_huid = AsyncMock(return_value=user)  # type: ignore
+
+    # - Act -
+    first_result = await search_user_with_cache(
+        bot, user.huid, bot.state.user_search_repo
+    )
+    second_result = await search_user_with_cache(
+        bot, user.huid, bot.state.user_search_repo
+    )
+
+    # - Assert -
+    assert first_result == second_result == (user, bot_account)
+    bot.search_user_by_huid.assert_awaited_once()  # type: ignore
+
+
+async def test__search_user_with_cache__cached_bot(
+    bot: Bot,
+) -> None:
+    # - Arrange -
+    huid = uuid4()
+    await bot.state.user_search_repo.set_bot(huid)
+    bot.search_user_by_huid = AsyncMock()  # type: ignore
+
+    # - Act -
+    with pytest.raises(UserIsBotError):
+        await search_user_with_cache(bot, huid, bot.state.user_search_repo)
+
+    # - Assert -
+    bot.search_user_by_huid.assert_not_awaited()  # type: ignore
+
+
+async def test__search_user_with_cache__stale_user_refreshed(
+    bot: Bot,
+) -> None:
+    # - Arrange -
+    bot_account = list(bot.bot_accounts)[0]
+    user = UserFromSearch(
+        huid=uuid4(),
+        ad_login=None,
+        ad_domain=None,
+        username="Test User",
+        company=None,
+        company_position=None,
+        department=None,
+        emails=[],
+        other_id=None,
+        user_kind=UserKinds.CTS_USER,
+    )
+    updated_user = dataclasses.replace(user, department="Support")
+    user_search_repo = UserSearchRedisRepo(
+        redis=get_redis_client(), ttl=0, stale_ttl=60, negative_ttl=10
+    )
+    await user_search_repo.set_found(user, bot_account.id)
+    bot.search_user_by_huid = AsyncMock(return_value=updated_user)  # type: ignore
+
+    # - Act -
+    search_result = await search_user_with_cache(bot, user.huid, user_search_repo)
+    await asyncio.gather(*botx_user_search._search_tasks.values())  # noqa: WPS437
+
+    # - Assert -
+    assert search_result == (user, bot_account)
+    cached_search = await user_search_repo.get(user.huid)
+    assert cached_search is not None
+    assert cached_search.user == updated_user
+
+
+async def test__search_user_with_cache__prefetched_search_awaited(
+    bot: Bot,
+) -> None:
+    # - Arrange -
+    bot_account = list(bot.bot_accounts)[0]
+    user = UserFromSearch(
+        huid=uuid4(),
+        ad_login=None,
+        ad_domain=None,
+        username="Test User",
+        company=None,
+        company_position=None,
+        department=None,
+        emails=[],
+        other_id=None,
+        user_kind=UserKinds.CTS_USER,
+    )
+    search_finished = asyncio.Event()
+
+    async def search_user_by_huid(bot_id: UUID, huid: UUID) -> UserFromSearch:
+        await search_finished.wait()
+        return user
+
+    bot.search_user_by_huid = AsyncMock(side_effect=search_user_by_huid)  # type: ignore
+    await prefetch_user(bot, user.huid, bot.state.user_search_repo)
+
+    # - Act -
+    search_task = asyncio.create_task(
+        search_user_with_cache(bot, user.huid, bot.state.user_search_repo)
+    )
+    await asyncio.sleep(0)
+    search_finished.set()
+    search_result = await search_task
+
+    # - Assert -
+    assert search_result == (user, bot_account)
+    bot.search_user_by_huid.assert_awaited_once()  # type: ignore
@@ -0,0 +1,91 @@
+import asyncio
+
+from app.services.command_admission import CommandAdmission
+
+
+async def test__command_admission__waiting_command_gets_released_slot() -> None:
+    # - Arrange -
+    command_admission = CommandAdmission(max_in_flight=1, max_waiting=1, wait_timeout=1)
+    await command_admission.acquire()
+
+    # - Act -
+    waiting_acquire = asyncio.create_task(command_admission.acquire())
+    await asyncio.sleep(0)
+    command_admission.release()
+
+    # - Assert -
+    assert await waiting_acquire
+    assert command_admission.stats["in_flight"] == 1
+    assert command_admission.stats["rejected"] == 0
+
+
+async def test__command_admission__rejected_when_queue_is_full() -> None:
+    # - Arrange -
+    command_admission = CommandAdmission(max_in_flight=1, max_waiting=0, wait_timeout=1)
+    await command_admission.acquire()
+
+    # - Act -
+    is_admitted = await command_admission.acquire()
+
+    # - Assert -
+    assert not is_admitted
+    assert command_admission.stats["in_flight"] == 1
+    assert command_admission.stats["rejected"] == 1
+
+
+async def test__command_admission__rejected_after_wait_timeout() -> None:
+    # - Arrange -
+    command_admission = CommandAdmission(
+        max_in_flight=1, max_waiting=1, wait_timeout=0.01
+    )
+    await command_admission.acquire()
+
+    # - Act -
+    is_admitted = await command_admission.acquire()
+
+    # - Assert -
+    assert not is_admitted
+    assert command_admission.stats["waiting"] == 0
+    assert command_admission.stats["rejected"] == 1
+
+
+async def test__command_admission__disabled_limit() -> None:
+    # - Arrange -
+    command_admission = CommandAdmission(max_in_flight=0, max_waiting=0, wait_timeout=0)
+
+    # - Act -
+    admissions = [await command_admission.acquire() for _ in range(3)]
+
+    # - Assert -
+    assert all(admissions)
+    assert command_admission.stats["in_flight"] == 3
+
+
+async def test__command_admission__drain_waits_commands_in_flight() -> None:
+    # - Arrange -
+    command_admission = CommandAdmission(max_in_flight=1, max_waiting=1, wait_timeout=1)
+    await command_admission.acquire()
+
+    # - Act -
+    drain = asyncio.create_task(command_admission.drain(timeout=1))
+    await asyncio.sleep(0)
+    is_admitted = await command_admission.acquire()
+    command_admission.release()
+
+    # - Assert -
+    assert await drain
+    assert not is_admitted
+    assert command_admission.is_draining
+
+
+async def test__command_admission__drain_timeout() -> None:
+    # - Arrange -
+    command_admission = CommandAdmission(max_in_flight=1, max_waiting=1, wait_timeout=1)
+    await command_admission.acquire()
+
+    # - Act -
+    is_drained = await command_admission.drain(timeout=0.01)
+
+    # - Assert -
+    assert not is_drained
+    assert command_admission.stats["in_flight"] == 1
@@ -0,0 +1,161 @@
+import asyncio
+from pathlib import Path
+from typing import AsyncGenerator
+from uuid import UUID
+
+import pytest
+from pybotx import Bot
+from redis import asyncio as aioredis
+
+from app.resources import strings
+from app.services.fsm_expiration import FSMExpirationListener
+from app.settings import settings
+
+
+@pytest.fixture
+async def fsm_expiration_listener(
+    bot: Bot,
+) -> AsyncGenerator[FSMExpirationListener, None]:
+    redis_client = aioredis.from_url(settings.REDIS_DSN)
+
+    yield FSMExpirationListener(
+        bot=bot,
+        redis=redis_client,
+        storage_usage_repo=bot.state.storage_usage_repo,
+        user_locks=bot.state.user_locks,
+        prefix=strings.BOT_PROJECT_NAME,
+    )
+
+    async for key in redis_client.scan_iter(
+        f"{strings.BOT_PROJECT_NAME}:fsm-expiration-handled:*"
+    ):
+        await redis_client.delete(key)
+
+    await redis_client.close()
+
+
+@pytest.fixture
+def fsm_key(host: str, bot_id: UUID, user_huid: UUID) -> str:
+    chat_id = UUID("dcfa5a7c-7cc4-4c89-b6c0-80325604f9f4")
+    return f"{strings.BOT_PROJECT_NAME}:fsm:{host}:{bot_id}:{chat_id}:{user_huid}"
+
+
+async def test__fsm_expiration_listener__notice_expired(
+    bot: Bot,
+    fsm_expiration_listener: FSMExpirationListener,
+    fsm_key: str,
+) -> None:
+    # - Act -
+    await fsm_expiration_listener.handle_expired_key(f"{fsm_key}:expiring")
+    await fsm_expiration_listener.handle_expired_key(f"{fsm_key}:expiring")
+
+    # - Assert -
+    bot.send.assert_awaited_once()  # type: ignore
+    message = bot.send.call_args.kwargs["message"]  # type: ignore
+    assert message.chat_id == UUID("dcfa5a7c-7cc4-4c89-b6c0-80325604f9f4")
+    assert message.body == strings.REQUEST_EXPIRING_MESSAGE
+
+
+async def test__fsm_expiration_listener__state_expired(
+    bot: Bot,
+    fsm_expiration_listener: FSMExpirationListener,
+    fsm_key: str,
+    user_huid: UUID,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "USERS_ATTACHMENTS_DIR", tmp_path)
+    user_directory = tmp_path / str(user_huid)
+    user_directory.mkdir()
+    user_directory.joinpath("default.txt").write_text("some content")
+
+    # - Act -
+    await fsm_expiration_listener.handle_expired_key(fsm_key)
+
+    # - Assert -
+    assert not user_directory.exists()
+    bot.send.assert_not_awaited()  # type: ignore
+
+
+async def test__fsm_expiration_listener__state_recreated(
+    bot: Bot,
+    fsm_expiration_listener: FSMExpirationListener,
+    fsm_key: str,
+    user_huid: UUID,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "USERS_ATTACHMENTS_DIR", tmp_path)
+    user_directory = tmp_path / str(user_huid)
+    user_directory.mkdir()
+    user_directory.joinpath("default.txt").write_text("some content")
+
+    redis_client = aioredis.from_url(settings.REDIS_DSN)
+    await redis_client.set(fsm_key, "new state")
+
+    # - Act -
+    await fsm_expiration_listener.handle_expired_key(fsm_key)
+
+    # - Assert -
+    assert user_directory.exists()
+
+    await redis_client.delete(fsm_key)
+    await redis_client.close()
+
+
+async def test__fsm_expiration_listener__waits_for_user_lock(
+    bot: Bot,
+    fsm_expiration_listener: FSMExpirationListener,
+    fsm_key: str,
+    user_huid: UUID,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "USERS_ATTACHMENTS_DIR", tmp_path)
+    user_directory = tmp_path / str(user_huid)
+    user_directory.mkdir()
+    user_directory.joinpath("default.txt").write_text("some content")
+
+    # - Act -
+    async with bot.state.user_locks.lock(user_huid):
+        expiration_task = asyncio.create_task(
+            fsm_expiration_listener.handle_expired_key(fsm_key)
+        )
+        await asyncio.sleep(0.1)
+
+        # - Assert -
+        assert user_directory.exists()
+
+    await expiration_task
+    assert not user_directory.exists()
+
+
+async def test__fsm_expiration_listener__hash_tagged_key(
+    bot: Bot,
+    fsm_expiration_listener: FSMExpirationListener,
+    fsm_key: str,
+) -> None:
+    # - Arrange -
+    prefix, fsm_key_body = fsm_key.split(":", 1)
+
+    # - Act -
+    await fsm_expiration_listener.handle_expired_key(
+        f"{prefix}:{{{fsm_key_body}}}:expiring"
+    )
+
+    # - Assert -
+    bot.send.assert_awaited_once()  # type: ignore
+
+
+async def test__fsm_expiration_listener__foreign_key_ignored(
+    bot: Bot,
+    fsm_expiration_listener: FSMExpirationListener,
+) -> None:
+    # - Act -
+    await fsm_expiration_listener.handle_expired_key("saq:job:expiring")
+
+    # - Assert -
+    bot.send.assert_not_awaited()  # type: ignore
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from app.services.timed_steps import TimedSteps, gather_cancelling
+
+
+async def test__gather_cancelling__rest_cancelled_on_failure() -> None:
+    # - Arrange -
+    slow_step_cancelled = asyncio.Event()
+
+    async def slow_step() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            slow_step_cancelled.set()
+            raise
+
+    async def failed_step() -> None:
+        raise ValueError
+
+    # - Act -
+    with pytest.raises(ValueError):
+        await gather_cancelling(slow_step(), failed_step())
+
+    # - Assert -
+    assert slow_step_cancelled.is_set()
+
+
+async def test__timed_steps__steps_results() -> None:
+    # - Arrange -
+    steps = TimedSteps("Test")
+
+    async def step(step_result: int) -> int:
+        await asyncio.sleep(0)
+        return step_result
+
+    # - Act -
+    steps_results = await gather_cancelling(
+        steps.run("first", step(1)), steps.run("second", step(2))
+    )
+
+    # - Assert -
+    assert steps_results == [1, 2]
+    assert list(steps._timings) == ["first", "second"]  # noqa: WPS437
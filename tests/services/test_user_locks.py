@@ -0,0 +1,133 @@
+import asyncio
+import time
+from typing import List
+from uuid import UUID, uuid4
+
+import pytest
+from pybotx import Bot
+
+from app.caching.redis_client import get_redis_client
+from app.services.user_locks import UserLocks, UserLockTimeoutError
+
+
+@pytest.fixture
+def redis_prefix() -> str:
+    return f"test-{uuid4()}"
+
+
+def build_user_locks(
+    redis_prefix: str, ttl: float = 5, wait_timeout: float = 1
+) -> UserLocks:
+    return UserLocks(
+        redis=get_redis_client(),
+        ttl=ttl,
+        wait_timeout=wait_timeout,
+        prefix=redis_prefix,
+    )
+
+
+async def handle_message(
+    user_locks: UserLocks, huid: UUID, message: str, handled_messages: List[str]
+) -> None:
+    async with user_locks.lock(huid):
+        await asyncio.sleep(0.01)
+        handled_messages.append(message)
+
+
+async def test__user_locks__messages_of_user_handled_in_order(
+    bot: Bot, redis_prefix: str
+) -> None:
+    # - Arrange -
+    user_locks = build_user_locks(redis_prefix)
+    huid = uuid4()
+    handled_messages: List[str] = []
+
+    # - Act -
+    await asyncio.gather(
+        *(
+            handle_message(user_locks, huid, message, handled_messages)
+            for message in ("first", "second", "third")
+        )
+    )
+
+    # - Assert -
+    assert handled_messages == ["first", "second", "third"]
+    assert not user_locks._local_locks  # noqa: WPS437
+
+
+async def test__user_locks__different_users_handled_concurrently(
+    bot: Bot, redis_prefix: str
+) -> None:
+    # - Arrange -
+    user_locks = build_user_locks(redis_prefix)
+    other_user_handled = asyncio.Event()
+
+    # - Act -
+    async with user_locks.lock(uuid4()):
+        async with user_locks.lock(uuid4()):
+            other_user_handled.set()
+
+    # - Assert -
+    assert other_user_handled.is_set()
+
+
+async def test__user_locks__user_locked_by_other_process(
+    bot: Bot, redis_prefix: str
+) -> None:
+    # - Arrange -
+    user_locks = build_user_locks(redis_prefix, wait_timeout=0.1)
+    other_process_user_locks = build_user_locks(redis_prefix, wait_timeout=0.1)
+    huid = uuid4()
+
+    # - Act -
+    async with other_process_user_locks.lock(huid):
+        with pytest.raises(UserLockTimeoutError):
+            async with user_locks.lock(huid):
+                pass  # noqa: WPS420
+
+    # - Assert -
+    async with user_locks.lock(huid):
+        pass  # noqa: WPS420
+
+
+async def test__user_locks__one_wait_timeout_for_both_locks(
+    bot: Bot, redis_prefix: str
+) -> None:
+    # - Arrange -
+    user_locks = build_user_locks(redis_prefix, wait_timeout=0.3)
+    other_process_user_locks = build_user_locks(redis_prefix)
+    huid = uuid4()
+
+    async def wait_lock() -> float:  # noqa: WPS430
+        waiting_start = time.monotonic()
+        with pytest.raises(UserLockTimeoutError):
+            async with user_locks.lock(huid):
+                pass  # noqa: WPS420
+
+        return time.monotonic() - waiting_start
+
+    # - Act -
+    async with other_process_user_locks.lock(huid):
+        # Second message waits for local lock, while the first one waits for redis
+        waiting_times = await asyncio.gather(wait_lock(), wait_lock())
+
+    # - Assert -
+    assert max(waiting_times) < 0.45
+
+
+async def test__user_locks__lock_prolonged_while_held(
+    bot: Bot, redis_prefix: str
+) -> None:
+    # - Arrange -
+    user_locks = build_user_locks(redis_prefix, ttl=0.3)
+    other_process_user_locks = build_user_locks(redis_prefix, wait_timeout=0.1)
+    huid = uuid4()
+
+    # - Act -
+    async with user_locks.lock(huid):
+        await asyncio.sleep(0.5)
+
+        # - Assert -
+        with pytest.raises(UserLockTimeoutError):
+            async with other_process_user_locks.lock(huid):
+                pass  # noqa: WPS420
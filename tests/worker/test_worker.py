@@ -0,0 +1,241 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+from pybotx import Bot
+from pybotx.models.attachments import AttachmentDocument
+from pybotx_fsm import FSM
+
+from app.bot.states.support_request import CreateSupportRequestStates
+from app.caching.redis_client import get_redis_client
+from app.db.repositories import service_desk
+from app.db.repositories.service_desk import ServiceDeskRepo
+from app.resources import strings
+from app.services.fsm_expiration import FSMExpirationListener
+from app.settings import settings
+from app.worker import worker
+from app.worker.worker import (
+    cleanup_expired_attachments,
+    drain_bot_commands,
+    execute_bot_command,
+    get_queue,
+)
+from tests.endpoints.test_botx import build_command_payload
+
+
+@pytest.fixture
+def users_attachments_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # Bot and worker see the same directory, as they share attachments volume
+    monkeypatch.setattr(settings, "USERS_ATTACHMENTS_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def cleanup_ctx(bot: Bot) -> worker.SaqCtx:
+    return {
+        "storage_usage_repo": bot.state.storage_usage_repo,
+        "fsm_expiration_listener": FSMExpirationListener(
+            bot=bot,
+            redis=get_redis_client(),
+            storage_usage_repo=bot.state.storage_usage_repo,
+            user_locks=bot.state.user_locks,
+            prefix=strings.BOT_PROJECT_NAME,
+        ),
+    }
+
+
+async def test__cleanup_expired_attachments__saved_by_bot(
+    bot: Bot,
+    incoming_attachment: AttachmentDocument,
+    user_huid: UUID,
+    users_attachments_dir: Path,
+    cleanup_ctx: worker.SaqCtx,
+) -> None:
+    # - Arrange -
+    storage_usage_repo = bot.state.storage_usage_repo
+    service_desk_repo = ServiceDeskRepo(
+        sender_huid=user_huid,
+        attachment=incoming_attachment,
+        storage_usage_repo=storage_usage_repo,
+    )
+    await service_desk_repo.reserve_storage()
+    await service_desk_repo.add_user_attachment(incoming_attachment, [])
+
+    user_dir = users_attachments_dir / str(user_huid)
+    os.utime(user_dir, (0, 0))
+
+    # - Act -
+    await cleanup_expired_attachments(cleanup_ctx)
+
+    # - Assert -
+    assert not user_dir.exists()
+    assert await storage_usage_repo.get_usage() == 0
+
+
+async def test__cleanup_expired_attachments__fresh_attachments_kept(
+    bot: Bot,
+    incoming_attachment: AttachmentDocument,
+    user_huid: UUID,
+    users_attachments_dir: Path,
+    cleanup_ctx: worker.SaqCtx,
+) -> None:
+    # - Arrange -
+    storage_usage_repo = bot.state.storage_usage_repo
+    service_desk_repo = ServiceDeskRepo(
+        sender_huid=user_huid,
+        attachment=incoming_attachment,
+        storage_usage_repo=storage_usage_repo,
+    )
+    await service_desk_repo.reserve_storage()
+    await service_desk_repo.add_user_attachment(incoming_attachment, [])
+
+    # - Act -
+    await cleanup_expired_attachments(cleanup_ctx)
+
+    # - Assert -
+    assert (users_attachments_dir / str(user_huid) / "attachment.txt").exists()
+    assert await storage_usage_repo.get_usage() == len(incoming_attachment.content)
+
+
+async def test__cleanup_expired_attachments__request_in_progress_kept(
+    bot: Bot,
+    fsm_session: FSM,
+    incoming_attachment: AttachmentDocument,
+    user_huid: UUID,
+    users_attachments_dir: Path,
+    cleanup_ctx: worker.SaqCtx,
+) -> None:
+    # - Arrange -
+    await fsm_session.change_state(CreateSupportRequestStates.CONFIRM_REQUEST)
+    service_desk_repo = ServiceDeskRepo(
+        sender_huid=user_huid,
+        attachment=incoming_attachment,
+        storage_usage_repo=bot.state.storage_usage_repo,
+    )
+    await service_desk_repo.add_user_attachment(incoming_attachment, [])
+
+    user_dir = users_attachments_dir / str(user_huid)
+    os.utime(user_dir, (0, 0))
+
+    # - Act -
+    await cleanup_expired_attachments(cleanup_ctx)
+
+    # - Assert -
+    assert (user_dir / "attachment.txt").exists()
+
+
+async def test__cleanup_expired_attachments__detached_by_bot(
+    bot: Bot,
+    incoming_attachment: AttachmentDocument,
+    user_huid: UUID,
+    users_attachments_dir: Path,
+    cleanup_ctx: worker.SaqCtx,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    storage_usage_repo = bot.state.storage_usage_repo
+    service_desk_repo = ServiceDeskRepo(
+        sender_huid=user_huid,
+        attachment=incoming_attachment,
+        storage_usage_repo=storage_usage_repo,
+    )
+    await service_desk_repo.reserve_storage()
+    await service_desk_repo.add_user_attachment(incoming_attachment, [])
+
+    monkeypatch.setattr(ServiceDeskRepo, "_delete_dir", AsyncMock(side_effect=OSError))
+    await service_desk_repo.delete_user_attachments_in_background()
+    await asyncio.gather(*service_desk._deletion_tasks)  # noqa: WPS437
+    assert list(users_attachments_dir.iterdir())
+
+    # - Act -
+    await cleanup_expired_attachments(cleanup_ctx)
+
+    # - Assert -
+    assert not list(users_attachments_dir.iterdir())
+    assert await storage_usage_repo.get_usage() == 0
+
+
+def test__get_queue__shared_by_process() -> None:
+    # - Act -
+    queue = get_queue()
+
+    # - Assert -
+    assert get_queue() is queue
+
+
+def test__worker_settings__use_shared_queue() -> None:
+    # - Act -
+    worker_settings = worker.settings
+
+    # - Assert -
+    assert worker_settings["queue"] is get_queue()
+
+
+async def test__execute_bot_command__retry_not_handled_again(
+    bot: Bot,
+    bot_id: UUID,
+    host: str,
+) -> None:
+    # - Arrange -
+    raw_bot_command = build_command_payload(bot_id, host)
+    raw_bot_command["sync_id"] = str(uuid4())
+    ctx = {"bot": bot, "bot_command_tasks": set()}
+
+    # - Act -
+    await execute_bot_command(ctx, raw_bot_command=raw_bot_command)
+    await execute_bot_command(ctx, raw_bot_command=raw_bot_command)
+
+    # - Assert -
+    bot.send.assert_awaited_once()  # type: ignore
+    assert not ctx["bot_command_tasks"]
+
+
+async def test__drain_bot_commands__running_command_waited(
+    bot: Bot,
+    bot_id: UUID,
+    host: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    raw_bot_command = build_command_payload(bot_id, host)
+    raw_bot_command["sync_id"] = str(uuid4())
+    ctx = {"bot": bot, "bot_command_tasks": set()}
+
+    command_release = asyncio.Event()
+
+    async def execute_slowly(*_: Any) -> None:  # noqa: WPS430
+        await command_release.wait()
+
+    monkeypatch.setattr(worker, "execute_raw_bot_command", execute_slowly)
+    command_task = asyncio.create_task(
+        execute_bot_command(ctx, raw_bot_command=raw_bot_command)
+    )
+    await asyncio.sleep(0.01)
+
+    # - Act -
+    drain_task = asyncio.create_task(drain_bot_commands(ctx, timeout=1))
+    await asyncio.sleep(0.01)
+
+    # - Assert -
+    assert not drain_task.done()
+
+    command_release.set()
+    await drain_task
+    assert command_task.done()
+
+
+async def test__drain_bot_commands__timeout(bot: Bot) -> None:
+    # - Arrange -
+    never_finished_task = asyncio.create_task(asyncio.Event().wait())
+    ctx = {"bot": bot, "bot_command_tasks": {never_finished_task}}
+
+    # - Act -
+    await drain_bot_commands(ctx, timeout=0.01)
+
+    # - Assert -
+    assert not never_finished_task.done()
+    never_finished_task.cancel()